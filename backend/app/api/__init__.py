@@ -1,8 +1,13 @@
 from fastapi import APIRouter
 
-from .health_routes import router as health_router
+from .health_routes import router as health_router, probe_router
 from .risk_routes import router as risk_router
 from .file_upload import router as file_upload_router
+from .history_routes import router as history_router
+from .metrics_routes import router as metrics_router
+from .usage_routes import router as usage_router
+from .profile_routes import router as profile_router
+from .memory_routes import router as memory_router
 
 # Create main API router
 api_router = APIRouter()
@@ -11,6 +16,11 @@ api_router = APIRouter()
 api_router.include_router(health_router)
 api_router.include_router(risk_router)
 api_router.include_router(file_upload_router)
+api_router.include_router(history_router)
+api_router.include_router(metrics_router)
+api_router.include_router(usage_router)
+api_router.include_router(profile_router)
+api_router.include_router(memory_router)
 
 # Export the main router
-__all__ = ["api_router"]
+__all__ = ["api_router", "probe_router"]
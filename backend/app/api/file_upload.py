@@ -1,14 +1,17 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field, validator
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from enum import Enum
+import asyncio
 import base64
 import time
 from loguru import logger
 
 # Assuming you have the FileProcessorService from previous code
 from app.services.openai_service import FileProcessorService
+from app.services.admission_service import admission_service, AdmissionRejectedError
+from app.services.memory_service import memory_service
 
 router = APIRouter(prefix="/api/v1/file-processor", tags=["File Processor"])
 
@@ -20,12 +23,26 @@ class FileType(str, Enum):
     DOC = "doc"
 
 
+class ResponseFields(str, Enum):
+    STATS = "stats"
+    RANGE = "range"
+    FULL = "full"
+
+
 class FileProcessRequest(BaseModel):
     """Request model for file processing via base64"""
 
     file_data: str = Field(..., description="Base64 encoded file content")
     file_type: FileType = Field(..., description="Type of the uploaded file")
     filename: Optional[str] = Field(None, description="Original filename (optional)")
+    fields: ResponseFields = Field(
+        ResponseFields.FULL,
+        description="stats: counts only, range: a slice of the text, full: all text",
+    )
+    text_offset: int = Field(0, ge=0, description="First character returned for range")
+    text_limit: Optional[int] = Field(
+        None, ge=1, description="Most characters returned for range (default: to the end)"
+    )
 
     @validator("file_data")
     def validate_base64(cls, v):
@@ -45,13 +62,26 @@ class FileProcessResponse(BaseModel):
     file_type: str
     file_size_mb: float
     processing_time_ms: int
-    extracted_text: str
+    extracted_text: Optional[str] = None
+    text_offset: Optional[int] = None
     text_length: int
     word_count: int
     line_count: int
     error_message: Optional[str] = None
 
 
+def _select_text(
+    text: str, fields: ResponseFields, offset: int, limit: Optional[int]
+) -> Tuple[Optional[str], Optional[int]]:
+    """Return the part of the extracted text the client asked for, with its offset"""
+    if fields == ResponseFields.STATS:
+        return None, None
+    if fields == ResponseFields.RANGE:
+        end = None if limit is None else offset + limit
+        return text[offset:end], offset
+    return text, None
+
+
 @router.post("/process-base64", response_model=FileProcessResponse)
 async def process_file_base64(request: FileProcessRequest):
     """
@@ -78,20 +108,24 @@ async def process_file_base64(request: FileProcessRequest):
         file_size_bytes = len(request.file_data) * 3 / 4
         file_size_mb = file_size_bytes / (1024 * 1024)
 
-        # Extract text from file
-        extracted_text = file_processor.extract_text_from_base64(
-            request.file_data, request.file_type.value, request.filename
-        )
+        # Extract text from file, counting words and lines in the same pass
+        async with admission_service.extraction_slot():
+            extracted = await asyncio.to_thread(
+                file_processor.extract_with_stats,
+                request.file_data,
+                request.file_type.value,
+                request.filename,
+            )
 
         # Calculate processing time
         processing_time = int((time.time() - start_time) * 1000)
 
-        # Calculate text statistics
-        word_count = len(extracted_text.split())
-        line_count = len(extracted_text.splitlines())
-
         logger.info(
-            f"Successfully processed file: {len(extracted_text)} characters extracted"
+            f"Successfully processed file: {len(extracted.text)} characters extracted"
+        )
+
+        selected_text, text_offset = _select_text(
+            extracted.text, request.fields, request.text_offset, request.text_limit
         )
 
         return FileProcessResponse(
@@ -100,10 +134,19 @@ async def process_file_base64(request: FileProcessRequest):
             file_type=request.file_type.value,
             file_size_mb=round(file_size_mb, 2),
             processing_time_ms=processing_time,
-            extracted_text=extracted_text,
-            text_length=len(extracted_text),
-            word_count=word_count,
-            line_count=line_count,
+            extracted_text=selected_text,
+            text_offset=text_offset,
+            text_length=len(extracted.text),
+            word_count=extracted.word_count,
+            line_count=extracted.line_count,
+        )
+
+    except HTTPException:
+        raise
+
+    except AdmissionRejectedError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)}
         )
 
     except ValueError as e:
@@ -130,10 +173,17 @@ async def process_file_base64(request: FileProcessRequest):
 
 @router.post("/process-upload", response_model=FileProcessResponse)
 async def process_file_upload(
-    file: UploadFile = File(...), max_size_mb: Optional[int] = Form(10)
+    file: UploadFile = File(...),
+    max_size_mb: Optional[int] = Form(10),
+    fields: ResponseFields = Form(ResponseFields.FULL),
+    text_offset: int = Form(0, ge=0),
+    text_limit: Optional[int] = Form(None, ge=1),
 ):
     """
     Process uploaded file directly
+
+    Use fields=stats to get only the counts, or fields=range with
+    text_offset/text_limit to page through large documents.
     """
     start_time = time.time()
 
@@ -146,39 +196,48 @@ async def process_file_upload(
                 detail=f"Unsupported file type: {file_extension}. Supported: PDF, TXT, DOCX",
             )
 
-        # Read file content
-        file_content = await file.read()
-
-        # Check file size
-        file_size_mb = len(file_content) / (1024 * 1024)
-        if file_size_mb > max_size_mb:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File size ({file_size_mb:.2f}MB) exceeds limit ({max_size_mb}MB)",
-            )
-
-        logger.info(f"Processing uploaded file: {file.filename} ({file_size_mb:.2f}MB)")
-
-        # Convert to base64 for processing
-        file_base64 = base64.b64encode(file_content).decode("utf-8")
-
-        # Initialize file processor
-        file_processor = FileProcessorService()
-
-        # Extract text from file
-        extracted_text = file_processor.extract_text_from_base64(
-            file_base64, file_extension, file.filename
-        )
+        # Track what the upload holds: raw bytes, base64 copy and extraction
+        with memory_service.track(f"upload.{file_extension}"):
+            # Read file content
+            file_content = await file.read()
+            memory_service.note_size("upload", file_content)
+            memory_service.note_input(len(file_content))
+
+            # Check file size
+            file_size_mb = len(file_content) / (1024 * 1024)
+            if file_size_mb > max_size_mb:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File size ({file_size_mb:.2f}MB) exceeds limit ({max_size_mb}MB)",
+                )
+
+            logger.info(f"Processing uploaded file: {file.filename} ({file_size_mb:.2f}MB)")
+
+            # Convert to base64 for processing
+            file_base64 = base64.b64encode(file_content).decode("utf-8")
+            memory_service.note_size("base64", file_base64)
+
+            # Initialize file processor
+            file_processor = FileProcessorService()
+
+            # Extract text from file, counting words and lines in the same pass
+            async with admission_service.extraction_slot():
+                extracted = await asyncio.to_thread(
+                    file_processor.extract_with_stats,
+                    file_base64,
+                    file_extension,
+                    file.filename,
+                )
 
         # Calculate processing time
         processing_time = int((time.time() - start_time) * 1000)
 
-        # Calculate text statistics
-        word_count = len(extracted_text.split())
-        line_count = len(extracted_text.splitlines())
-
         logger.info(
-            f"Successfully processed upload: {len(extracted_text)} characters extracted"
+            f"Successfully processed upload: {len(extracted.text)} characters extracted"
+        )
+
+        selected_text, selected_offset = _select_text(
+            extracted.text, fields, text_offset, text_limit
         )
 
         return FileProcessResponse(
@@ -187,15 +246,21 @@ async def process_file_upload(
             file_type=file_extension,
             file_size_mb=round(file_size_mb, 2),
             processing_time_ms=processing_time,
-            extracted_text=extracted_text,
-            text_length=len(extracted_text),
-            word_count=word_count,
-            line_count=line_count,
+            extracted_text=selected_text,
+            text_offset=selected_offset,
+            text_length=len(extracted.text),
+            word_count=extracted.word_count,
+            line_count=extracted.line_count,
         )
 
     except HTTPException:
         raise
 
+    except AdmissionRejectedError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        )
+
     except ValueError as e:
         logger.error(f"File processing error: {e}")
         processing_time = int((time.time() - start_time) * 1000)
@@ -16,6 +16,15 @@ router = APIRouter(
     }
 )
 
+# Load balancer probes cannot send an API key, so this router is mounted
+# without the API key dependency
+probe_router = APIRouter(
+    tags=["Health & Info"],
+    responses={
+        500: {"model": ErrorResponse, "description": "Internal server error"}
+    }
+)
+
 @router.get(
     "/",
     response_model=Dict[str, Any],
@@ -77,6 +86,37 @@ async def get_health_status():
             detail="Health check failed. Please try again."
         )
 
+@probe_router.get(
+    "/ready",
+    response_model=Dict[str, Any],
+    status_code=status.HTTP_200_OK,
+    summary="Readiness Check",
+    description="Check whether this worker has finished warming up and can take traffic",
+    response_description="Readiness and warm-up status"
+)
+async def get_readiness():
+    """Get readiness of this worker for load balancer probes."""
+    try:
+        readiness = await HealthController.get_readiness()
+
+        if not readiness["ready"]:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Service is warming up" if not readiness["draining"] else "Service is shutting down"
+            )
+
+        return readiness
+
+    except HTTPException:
+        # Re-raise HTTP exceptions
+        raise
+    except Exception as e:
+        logger.error(f"Error during readiness check: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Readiness check failed. Please try again."
+        )
+
 @router.get(
     "/api/info",
     response_model=Dict[str, Any],
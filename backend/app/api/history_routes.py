@@ -0,0 +1,139 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from datetime import datetime
+from typing import Optional
+import logging
+
+from ..models.risk_model import (
+    RiskAnalysisResponse,
+    AnalysisHistoryPage,
+    RiskHistoryPage,
+    ErrorResponse,
+    DocumentType,
+    CompanyScale,
+    RiskCategory,
+    RiskSeverity,
+)
+from ..controllers.history_controller import HistoryController
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Create router instance
+router = APIRouter(
+    prefix="/api/v1/history",
+    tags=["Analysis History"],
+    responses={
+        404: {"model": ErrorResponse, "description": "Not found"},
+        500: {"model": ErrorResponse, "description": "Internal server error"}
+    }
+)
+
+@router.get(
+    "",
+    response_model=AnalysisHistoryPage,
+    status_code=status.HTTP_200_OK,
+    summary="List Past Analyses",
+    description="List persisted analyses newest first, filtered by industry, company scale, document type and time range",
+    response_description="A page of stored analysis summaries"
+)
+async def list_analyses(
+    industry: Optional[str] = Query(None, description="Industry (case-insensitive)"),
+    company_scale: Optional[CompanyScale] = Query(None),
+    document_type: Optional[DocumentType] = Query(None),
+    since: Optional[datetime] = Query(None, description="Only analyses at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only analyses before this time"),
+    page: int = Query(1, ge=1),
+    page_size: Optional[int] = Query(None, ge=1),
+):
+    """List persisted analyses."""
+    try:
+        logger.info("Listing analysis history")
+
+        return await HistoryController.list_analyses(
+            industry=industry,
+            company_scale=company_scale,
+            document_type=document_type,
+            since=since,
+            until=until,
+            page=page,
+            page_size=page_size,
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error listing analysis history: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Unable to retrieve analysis history. Please try again."
+        )
+
+@router.get(
+    "/risks",
+    response_model=RiskHistoryPage,
+    status_code=status.HTTP_200_OK,
+    summary="List Past Risks",
+    description="List persisted risks across analyses, filtered by category, severity, score and analysis context",
+    response_description="A page of stored risks with their analysis context"
+)
+async def list_risks(
+    category: Optional[RiskCategory] = Query(None),
+    severity: Optional[RiskSeverity] = Query(None),
+    industry: Optional[str] = Query(None, description="Industry (case-insensitive)"),
+    company_scale: Optional[CompanyScale] = Query(None),
+    document_type: Optional[DocumentType] = Query(None),
+    since: Optional[datetime] = Query(None, description="Only risks from analyses at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only risks from analyses before this time"),
+    min_risk_score: Optional[float] = Query(None, ge=0.0, le=10.0),
+    page: int = Query(1, ge=1),
+    page_size: Optional[int] = Query(None, ge=1),
+):
+    """List persisted risks."""
+    try:
+        logger.info("Listing risk history")
+
+        return await HistoryController.list_risks(
+            category=category,
+            severity=severity,
+            industry=industry,
+            company_scale=company_scale,
+            document_type=document_type,
+            since=since,
+            until=until,
+            min_risk_score=min_risk_score,
+            page=page,
+            page_size=page_size,
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error listing risk history: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Unable to retrieve risk history. Please try again."
+        )
+
+@router.get(
+    "/{analysis_id}",
+    response_model=RiskAnalysisResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get Past Analysis",
+    description="Get a persisted analysis by id without re-running the model",
+    response_description="The stored risk analysis"
+)
+async def get_analysis(analysis_id: str):
+    """Get a persisted analysis by id."""
+    try:
+        logger.info(f"Retrieving stored analysis {analysis_id}")
+
+        return await HistoryController.get_analysis(analysis_id)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving stored analysis: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Unable to retrieve analysis. Please try again."
+        )
@@ -0,0 +1,104 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from typing import List, Literal, Optional
+import logging
+
+from ..models.risk_model import MemorySnapshotInfo, MemorySnapshotDiff, ErrorResponse
+from ..controllers.memory_controller import MemoryController
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Create router instance
+router = APIRouter(
+    prefix="/api/v1/memory",
+    tags=["Memory"],
+    responses={
+        403: {"model": ErrorResponse, "description": "Admin API key required"},
+        404: {"model": ErrorResponse, "description": "Not found"},
+        409: {"model": ErrorResponse, "description": "Memory tracing is off"},
+        500: {"model": ErrorResponse, "description": "Internal server error"}
+    }
+)
+
+@router.post(
+    "/snapshots",
+    response_model=MemorySnapshotInfo,
+    status_code=status.HTTP_201_CREATED,
+    summary="Take Memory Snapshot",
+    description=(
+        "Take a tracemalloc snapshot in the worker that serves the request "
+        "(admin only, needs MEMORY_TRACING_ENABLED)"
+    ),
+    response_description="The snapshot's id, worker and traced size"
+)
+async def take_snapshot():
+    """Take a tracemalloc snapshot."""
+    try:
+        logger.info("Taking memory snapshot")
+
+        return await MemoryController.take_snapshot()
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error taking memory snapshot: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Unable to take memory snapshot. Please try again."
+        )
+
+@router.get(
+    "/snapshots",
+    response_model=List[MemorySnapshotInfo],
+    status_code=status.HTTP_200_OK,
+    summary="List Memory Snapshots",
+    description="List the snapshots held by the worker that serves the request (admin only)",
+    response_description="Snapshots, oldest first"
+)
+async def list_snapshots():
+    """List tracemalloc snapshots."""
+    try:
+        return await MemoryController.list_snapshots()
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error listing memory snapshots: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Unable to list memory snapshots. Please try again."
+        )
+
+@router.get(
+    "/snapshots/{snapshot_id}/diff",
+    response_model=MemorySnapshotDiff,
+    status_code=status.HTTP_200_OK,
+    summary="Diff Memory Snapshots",
+    description=(
+        "Largest allocation changes since a snapshot, up to another snapshot or "
+        "to now (admin only)"
+    ),
+    response_description="Allocation changes by source location, largest first"
+)
+async def diff_snapshots(
+    snapshot_id: str,
+    against: Optional[str] = Query(None, description="Later snapshot (default: now)"),
+    key_type: Literal["lineno", "filename", "traceback"] = Query(
+        "lineno", description="Group allocations by line, file or traceback"
+    ),
+    limit: int = Query(20, ge=1, le=200, description="Locations returned"),
+):
+    """Diff tracemalloc snapshots."""
+    try:
+        logger.info(f"Diffing memory snapshot {snapshot_id}")
+
+        return await MemoryController.diff_snapshots(snapshot_id, against, key_type, limit)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error diffing memory snapshots: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Unable to diff memory snapshots. Please try again."
+        )
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, status
+from typing import Dict, Any
+import logging
+
+from ..controllers.metrics_controller import MetricsController
+from ..models.risk_model import ErrorResponse
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Create router instance
+router = APIRouter(
+    prefix="/api/v1",
+    tags=["Metrics"],
+    responses={
+        500: {"model": ErrorResponse, "description": "Internal server error"}
+    }
+)
+
+@router.get(
+    "/metrics",
+    response_model=Dict[str, Any],
+    status_code=status.HTTP_200_OK,
+    summary="Runtime Metrics",
+    description="Get counters and timings collected by this API process",
+    response_description="Counters, gauges, observations and feature statistics"
+)
+async def get_metrics():
+    """Get runtime metrics."""
+    try:
+        return await MetricsController.get_metrics()
+
+    except Exception as e:
+        logger.error(f"Error collecting metrics: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Unable to collect metrics. Please try again."
+        )
@@ -0,0 +1,76 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from typing import List, Literal
+import logging
+
+from ..models.risk_model import ProfileSummary, ErrorResponse
+from ..controllers.profile_controller import ProfileController
+from ..services import profiling_service
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Create router instance
+router = APIRouter(
+    prefix="/api/v1/profiles",
+    tags=["Profiling"],
+    responses={
+        403: {"model": ErrorResponse, "description": "Admin API key required"},
+        404: {"model": ErrorResponse, "description": "Not found"},
+        500: {"model": ErrorResponse, "description": "Internal server error"}
+    }
+)
+
+@router.get(
+    "",
+    response_model=List[ProfileSummary],
+    status_code=status.HTTP_200_OK,
+    summary="List Request Profiles",
+    description="List profiles captured with the X-Profile header (admin only)",
+    response_description="Stored profiles, newest first"
+)
+async def list_profiles():
+    """List stored request profiles."""
+    try:
+        return await ProfileController.list_profiles()
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error listing profiles: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Unable to retrieve profiles. Please try again."
+        )
+
+@router.get(
+    "/{profile_id}",
+    status_code=status.HTTP_200_OK,
+    summary="Get Request Profile",
+    description=(
+        "Get a captured profile as folded stacks for flamegraph.pl, speedscope or "
+        "inferno, or as JSON with its metadata (admin only)"
+    ),
+    response_description="Folded stacks, one 'frame;frame;frame count' line per stack"
+)
+async def get_profile(
+    profile_id: str,
+    format: Literal["folded", "json"] = Query("folded", description="Output format"),
+):
+    """Get a stored request profile."""
+    try:
+        logger.info(f"Retrieving profile {profile_id}")
+
+        profile = await ProfileController.get_profile(profile_id)
+        if format == "json":
+            return profile
+        return PlainTextResponse(profiling_service.folded(profile))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving profile: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Unable to retrieve profile. Please try again."
+        )
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import Dict, Any
+from fastapi import APIRouter, Header, HTTPException, Request, status
+from typing import Dict, Any, Optional
 import logging
+import time
 
 from ..models.risk_model import DocumentInput, RiskAnalysisResponse, ErrorResponse
 from ..controllers.risk_controller import RiskController
+from ..services import lifecycle_service, ClientDisconnectedError
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -27,20 +29,42 @@ router = APIRouter(
     description="Analyze business documents (meeting transcripts, business plans) to identify potential risks",
     response_description="Detailed risk analysis with identified risks, categories, and mitigation recommendations"
 )
-async def analyze_document_risks(document_input: DocumentInput):
+async def analyze_document_risks(
+    document_input: DocumentInput,
+    request: Request,
+    x_deadline_ms: Optional[int] = Header(
+        None,
+        ge=100,
+        description="Latency budget in milliseconds (same as the deadline_ms field)",
+    ),
+):
     """Analyze document content for business risks."""
+    # The tighter of the header and body deadlines, counted from arrival
+    budgets = [ms for ms in (x_deadline_ms, document_input.deadline_ms) if ms]
+    deadline = time.monotonic() + min(budgets) / 1000 if budgets else None
+
     try:
         logger.info(f"Starting risk analysis for document type: {document_input.document_type}")
         
         # validate input first
         validated_input = await RiskController.validate_document_input(document_input)
         
-        # Perform risk analysis
-        analysis_result = await RiskController.analyze_document_risks(validated_input)
+        # Perform risk analysis, abandoning it if the client disconnects
+        analysis_result = await lifecycle_service.cancel_on_disconnect(
+            request, RiskController.analyze_document_risks(validated_input, deadline)
+        )
         
         logger.info(f"Risk analysis completed. Found {analysis_result.risk_summary.total_risks} risks")
         return analysis_result
     
+    except HTTPException:
+        # Re-raise HTTP exceptions (validation, capacity)
+        raise
+
+    except ClientDisconnectedError:
+        # Nobody receives this; 499 (client closed request) keeps access logs honest
+        raise HTTPException(status_code=499, detail="Client closed request")
+        
     except ValueError as ve:
         logger.error(f"Validation error during risk analysis: {str(ve)}")
         raise HTTPException(
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from datetime import datetime
+from typing import List, Optional
+import logging
+
+from ..models.risk_model import TokenUsageReport, UsageDimension, ErrorResponse
+from ..controllers.usage_controller import UsageController
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Create router instance
+router = APIRouter(
+    prefix="/api/v1",
+    tags=["Token Usage"],
+    responses={
+        403: {"model": ErrorResponse, "description": "Admin API key required"},
+        404: {"model": ErrorResponse, "description": "Not found"},
+        500: {"model": ErrorResponse, "description": "Internal server error"}
+    }
+)
+
+@router.get(
+    "/usage",
+    response_model=TokenUsageReport,
+    status_code=status.HTTP_200_OK,
+    summary="Token Usage",
+    description="Prompt, completion and cached tokens grouped by API key, model and/or document type. Only admin keys see other tenants",
+    response_description="Token totals per group, most expensive first"
+)
+async def get_usage(
+    group_by: Optional[List[UsageDimension]] = Query(
+        None,
+        description="Dimensions to group by (repeatable); api_key for admin keys, model otherwise",
+    ),
+    since: Optional[datetime] = Query(None, description="Only usage at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only usage before this time"),
+):
+    """Get token usage totals."""
+    try:
+        logger.info("Building token usage report")
+
+        return await UsageController.get_usage_report(
+            group_by=group_by, since=since, until=until
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error building token usage report: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Unable to retrieve token usage. Please try again."
+        )
@@ -1,6 +1,6 @@
 from pydantic import Field, validator
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Dict, List, Optional
 import secrets
 import os
 from pathlib import Path
@@ -26,6 +26,16 @@ class Settings(BaseSettings):
         description="API key for authenticating requests",
     )
     API_KEY_REQUIRED: bool = Field(default=True, env="API_KEY_REQUIRED")
+    ADMIN_API_KEYS: List[str] = Field(
+        default=[],
+        env="ADMIN_API_KEYS",
+        description="API keys allowed to use admin features such as profiling",
+    )
+    CLIENT_API_KEYS: List[str] = Field(
+        default=[],
+        env="CLIENT_API_KEYS",
+        description="Further API keys accepted besides API_KEY, each its own tenant",
+    )
 
     # OpenAI Configuration
     OPENAI_API_KEY: str = Field(..., env="OPENAI_API_KEY")
@@ -33,6 +43,47 @@ class Settings(BaseSettings):
     OPENAI_MAX_TOKENS: int = Field(default=2000, env="OPENAI_MAX_TOKENS")
     OPENAI_TEMPERATURE: float = Field(default=0.3, env="OPENAI_TEMPERATURE")
     OPENAI_TIMEOUT: int = Field(default=60, env="OPENAI_TIMEOUT")
+    FAST_PROFILE_MODEL: Optional[str] = Field(
+        default=None,
+        env="FAST_PROFILE_MODEL",
+        description="Smaller model for the 'fast' analysis profile (defaults to OPENAI_MODEL)",
+    )
+    DEEP_PROFILE_MODEL: Optional[str] = Field(
+        default=None,
+        env="DEEP_PROFILE_MODEL",
+        description="Model for the 'deep' analysis profile (defaults to OPENAI_MODEL)",
+    )
+
+    # Output Budget Configuration
+    ADAPTIVE_MAX_TOKENS_ENABLED: bool = Field(
+        default=True,
+        env="ADAPTIVE_MAX_TOKENS_ENABLED",
+        description="Size max_tokens per request; OPENAI_MAX_TOKENS is used when disabled",
+    )
+    OUTPUT_TOKENS_BASE: int = Field(
+        default=300,
+        env="OUTPUT_TOKENS_BASE",
+        description="Tokens for key concerns, insights and JSON overhead",
+    )
+    OUTPUT_TOKENS_PER_RISK: int = Field(default=200, env="OUTPUT_TOKENS_PER_RISK")
+    OUTPUT_CHARS_PER_RISK: int = Field(
+        default=400,
+        env="OUTPUT_CHARS_PER_RISK",
+        description="Document characters that support one expected risk",
+    )
+    OUTPUT_MIN_TOKENS: int = Field(default=600, env="OUTPUT_MIN_TOKENS")
+    OUTPUT_MAX_TOKENS: int = Field(default=4000, env="OUTPUT_MAX_TOKENS")
+    ANALYSIS_DETAIL_LEVEL: str = Field(default="standard", env="ANALYSIS_DETAIL_LEVEL")
+    COMPACT_OUTPUT_ENABLED: bool = Field(
+        default=False,
+        env="COMPACT_OUTPUT_ENABLED",
+        description="Ask the model for short keys, enum codes and positional risk rows",
+    )
+    MAX_CONTINUATIONS: int = Field(
+        default=2,
+        env="MAX_CONTINUATIONS",
+        description="Follow-up requests allowed when a response stops at max_tokens",
+    )
 
     # CORS Configuration
     ALLOWED_ORIGINS: List[str] = Field(
@@ -46,6 +97,169 @@ class Settings(BaseSettings):
         description="List of allowed hosts for production",
     )
 
+    # Response Compression Configuration
+    COMPRESSION_MIN_SIZE: int = Field(
+        default=1024,
+        env="COMPRESSION_MIN_SIZE",
+        description="Responses smaller than this many bytes are sent uncompressed",
+    )
+    COMPRESSION_GZIP_LEVEL: int = Field(
+        default=6,
+        env="COMPRESSION_GZIP_LEVEL",
+        description="gzip level (1-9), used when brotli-asgi is not installed",
+    )
+    COMPRESSION_BROTLI_QUALITY: int = Field(
+        default=4,
+        env="COMPRESSION_BROTLI_QUALITY",
+        description="Brotli quality (0-11), used when brotli-asgi is installed",
+    )
+
+    # Production Server Configuration
+    SERVER_HOST: str = Field(default="0.0.0.0", env="SERVER_HOST")
+    SERVER_PORT: int = Field(default=8000, env="SERVER_PORT")
+    SERVER_WORKERS: Optional[int] = Field(
+        default=None,
+        env="SERVER_WORKERS",
+        description="Fixed worker count; sized from CPU and memory when unset",
+    )
+    SERVER_WORKERS_PER_CPU: int = Field(default=1, env="SERVER_WORKERS_PER_CPU")
+    SERVER_MAX_WORKERS: int = Field(default=8, env="SERVER_MAX_WORKERS")
+    SERVER_WORKER_MEMORY_MB: int = Field(
+        default=256,
+        env="SERVER_WORKER_MEMORY_MB",
+        description="Memory budget per worker used when sizing the worker count",
+    )
+    SERVER_KEEPALIVE: int = Field(default=5, env="SERVER_KEEPALIVE")
+    SERVER_DRAIN_TIMEOUT: int = Field(
+        default=90,
+        env="SERVER_DRAIN_TIMEOUT",
+        description="Seconds to let in-flight analyses finish after SIGTERM",
+    )
+
+    # Warm-up Configuration
+    WARMUP_ENABLED: bool = Field(default=True, env="WARMUP_ENABLED")
+    WARMUP_TIMEOUT_SECONDS: float = Field(
+        default=30.0,
+        env="WARMUP_TIMEOUT_SECONDS",
+        description="Longest a worker stays unready while it warms up",
+    )
+    WARMUP_PROVIDER_CONNECTIONS: int = Field(
+        default=2,
+        env="WARMUP_PROVIDER_CONNECTIONS",
+        description="Provider connections opened and pooled at startup",
+    )
+    WARMUP_PRELOAD_CACHES: bool = Field(default=True, env="WARMUP_PRELOAD_CACHES")
+
+    # Fault Injection Configuration (never active in production)
+    FAULT_INJECTION_ENABLED: bool = Field(
+        default=False,
+        env="FAULT_INJECTION_ENABLED",
+        description="Honour X-Fault-Injection headers on provider calls",
+    )
+    FAULT_INJECTION_DEFAULT: Optional[str] = Field(
+        default=None,
+        env="FAULT_INJECTION_DEFAULT",
+        description="Fault spec for requests without the header, e.g. error=503@0.1",
+    )
+
+    # Profiling Configuration (admin API keys only)
+    PROFILING_ENABLED: bool = Field(default=True, env="PROFILING_ENABLED")
+    PROFILING_SAMPLE_INTERVAL_MS: float = Field(
+        default=5.0,
+        env="PROFILING_SAMPLE_INTERVAL_MS",
+        description="Milliseconds between stack samples of a profiled request",
+    )
+    PROFILING_MAX_SECONDS: float = Field(
+        default=120.0,
+        env="PROFILING_MAX_SECONDS",
+        description="Sampling stops after this long even if the request has not finished",
+    )
+    PROFILING_MIN_INTERVAL_SECONDS: float = Field(
+        default=60.0,
+        env="PROFILING_MIN_INTERVAL_SECONDS",
+        description="Seconds between profile captures in one worker",
+    )
+    PROFILING_PATH: str = Field(default="profiles", env="PROFILING_PATH")
+    PROFILING_MAX_STORED: int = Field(
+        default=50,
+        env="PROFILING_MAX_STORED",
+        description="Stored profiles kept; the oldest are deleted beyond this",
+    )
+
+    # Memory Instrumentation Configuration
+    MEMORY_TRACKING_ENABLED: bool = Field(
+        default=True,
+        env="MEMORY_TRACKING_ENABLED",
+        description="Record what uploads and extractions hold at each stage",
+    )
+    MEMORY_TRACING_ENABLED: bool = Field(
+        default=False,
+        env="MEMORY_TRACING_ENABLED",
+        description="Run tracemalloc for peak figures and snapshots (slows allocations)",
+    )
+    MEMORY_TRACE_FRAMES: int = Field(
+        default=1,
+        env="MEMORY_TRACE_FRAMES",
+        description="Stack frames tracemalloc keeps per allocation",
+    )
+    MEMORY_MAX_SNAPSHOTS: int = Field(default=5, env="MEMORY_MAX_SNAPSHOTS")
+
+    # Admission Control Configuration
+    ADMISSION_CONTROL_ENABLED: bool = Field(default=True, env="ADMISSION_CONTROL_ENABLED")
+    EXTRACTION_MAX_CONCURRENCY: int = Field(default=2, env="EXTRACTION_MAX_CONCURRENCY")
+    EXTRACTION_MAX_QUEUE: int = Field(default=16, env="EXTRACTION_MAX_QUEUE")
+    LLM_MAX_CONCURRENCY: int = Field(default=16, env="LLM_MAX_CONCURRENCY")
+    LLM_MAX_QUEUE: int = Field(default=64, env="LLM_MAX_QUEUE")
+
+    # Scheduling Configuration
+    PRIORITY_WEIGHTS: Dict[str, float] = Field(
+        default={"interactive": 8.0, "batch": 2.0, "background": 1.0},
+        env="PRIORITY_WEIGHTS",
+        description="Share of queued slots each priority class gets relative to the others",
+    )
+    API_KEY_WEIGHTS: Dict[str, float] = Field(
+        default={},
+        env="API_KEY_WEIGHTS",
+        description="Fair-share weight per configured API key, keyed by its first 8 characters (default 1)",
+    )
+
+    # Token Accounting Configuration
+    TOKEN_ACCOUNTING_ENABLED: bool = Field(default=True, env="TOKEN_ACCOUNTING_ENABLED")
+    API_KEY_TOKEN_BUDGETS: Dict[str, int] = Field(
+        default={},
+        env="API_KEY_TOKEN_BUDGETS",
+        description="Tokens each configured API key may use per budget period, keyed by its first 8 characters",
+    )
+    TOKEN_BUDGET_PERIOD_HOURS: int = Field(default=24, env="TOKEN_BUDGET_PERIOD_HOURS")
+    TOKEN_BUDGET_REFRESH_SECONDS: float = Field(
+        default=30.0,
+        env="TOKEN_BUDGET_REFRESH_SECONDS",
+        description="How long a key's stored usage total is trusted before re-reading it",
+    )
+
+    # Deadline Configuration
+    DEADLINE_SAFETY_MARGIN: float = Field(
+        default=0.3,
+        env="DEADLINE_SAFETY_MARGIN",
+        description="Seconds of a deadline kept for processing and returning the result",
+    )
+    DEADLINE_FAST_MODEL_SPEEDUP: float = Field(
+        default=0.5,
+        env="DEADLINE_FAST_MODEL_SPEEDUP",
+        description="Expected duration of a fast-profile analysis relative to a full one",
+    )
+    DEADLINE_MIN_LLM_SECONDS: float = Field(
+        default=1.0,
+        env="DEADLINE_MIN_LLM_SECONDS",
+        description="Below this remaining time no provider call is attempted",
+    )
+    DEADLINE_MIN_DOCUMENT_CHARS: int = Field(default=1000, env="DEADLINE_MIN_DOCUMENT_CHARS")
+    DEADLINE_NEAR_DUPLICATE_THRESHOLD: float = Field(
+        default=0.85,
+        env="DEADLINE_NEAR_DUPLICATE_THRESHOLD",
+        description="Relaxed similarity for reusing a stored analysis when out of time",
+    )
+
     # Rate Limiting (for future implementation)
     RATE_LIMIT_PER_MINUTE: int = Field(default=60, env="RATE_LIMIT_PER_MINUTE")
 
@@ -53,6 +267,50 @@ class Settings(BaseSettings):
     DEFAULT_MAX_RISKS: int = Field(default=10, env="DEFAULT_MAX_RISKS")
     DEFAULT_MIN_RISK_SCORE: float = Field(default=3.0, env="DEFAULT_MIN_RISK_SCORE")
     MAX_DOCUMENT_LENGTH: int = Field(default=50000, env="MAX_DOCUMENT_LENGTH")
+    TRANSCRIPT_COMPACTION_ENABLED: bool = Field(
+        default=True,
+        env="TRANSCRIPT_COMPACTION_ENABLED",
+        description="Strip filler and back-channel turns from meeting transcripts",
+    )
+    PASSAGE_SELECTION_ENABLED: bool = Field(default=True, env="PASSAGE_SELECTION_ENABLED")
+    PROMPT_DOCUMENT_TOKEN_BUDGET: int = Field(
+        default=6000,
+        env="PROMPT_DOCUMENT_TOKEN_BUDGET",
+        description="Longer documents are reduced to their most risk-relevant passages",
+    )
+    CATEGORY_SHARDING_ENABLED: bool = Field(
+        default=False,
+        env="CATEGORY_SHARDING_ENABLED",
+        description="Analyze category groups in concurrent smaller completions by default",
+    )
+
+    # Incremental Re-analysis Configuration
+    INCREMENTAL_CHUNK_MIN_CHARS: int = Field(default=1500, env="INCREMENTAL_CHUNK_MIN_CHARS")
+    INCREMENTAL_CHUNK_MAX_CHARS: int = Field(default=6000, env="INCREMENTAL_CHUNK_MAX_CHARS")
+    INCREMENTAL_CHUNK_BOUNDARY_DIVISOR: int = Field(
+        default=8,
+        env="INCREMENTAL_CHUNK_BOUNDARY_DIVISOR",
+        description="On average one text unit in N ends a chunk once the minimum size is reached",
+    )
+    INCREMENTAL_MAX_CONCURRENCY: int = Field(default=4, env="INCREMENTAL_MAX_CONCURRENCY")
+    CHUNK_CACHE_TTL_HOURS: float = Field(
+        default=720.0,
+        env="CHUNK_CACHE_TTL_HOURS",
+        description="Cached chunk findings unused for this long are dropped (0 keeps them)",
+    )
+    CHUNK_CACHE_MAX_ENTRIES: int = Field(
+        default=50000,
+        env="CHUNK_CACHE_MAX_ENTRIES",
+        description="Most cached chunk findings kept; least recently used go first (0 is unbounded)",
+    )
+
+    # Near-duplicate Reuse Configuration
+    NEAR_DUPLICATE_ENABLED: bool = Field(default=True, env="NEAR_DUPLICATE_ENABLED")
+    NEAR_DUPLICATE_THRESHOLD: float = Field(
+        default=0.95,
+        env="NEAR_DUPLICATE_THRESHOLD",
+        description="Minimum fingerprint similarity (0-1) for reusing a stored analysis",
+    )
 
     # Logging Configuration
     LOG_LEVEL: str = Field(default="INFO", env="LOG_LEVEL")
@@ -60,10 +318,32 @@ class Settings(BaseSettings):
         default="%(asctime)s - %(name)s - %(levelname)s - %(message)s", env="LOG_FORMAT"
     )
 
-    # Database Configuration (for future implementation)
-    DATABASE_URL: Optional[str] = Field(default=None, env="DATABASE_URL")
+    # Database Configuration
+    DATABASE_URL: Optional[str] = Field(
+        default="sqlite:///./risk_analyses.db",
+        env="DATABASE_URL",
+        description="Database URL for persisted analyses (sqlite:///path/to/file.db)",
+    )
+    ANALYSIS_HISTORY_ENABLED: bool = Field(default=True, env="ANALYSIS_HISTORY_ENABLED")
+    HISTORY_DEFAULT_PAGE_SIZE: int = Field(default=20, env="HISTORY_DEFAULT_PAGE_SIZE")
+    HISTORY_MAX_PAGE_SIZE: int = Field(default=100, env="HISTORY_MAX_PAGE_SIZE")
     REDIS_URL: Optional[str] = Field(default=None, env="REDIS_URL")
 
+    # Shadow Recording Configuration
+    SHADOW_RECORDING_ENABLED: bool = Field(
+        default=False,
+        env="SHADOW_RECORDING_ENABLED",
+        description="Record anonymized analyze requests and responses for replay",
+    )
+    SHADOW_RECORDING_PATH: str = Field(
+        default="shadow_traffic.jsonl", env="SHADOW_RECORDING_PATH"
+    )
+    SHADOW_RECORDING_SAMPLE_RATE: float = Field(
+        default=1.0,
+        env="SHADOW_RECORDING_SAMPLE_RATE",
+        description="Share of successful analyze requests that are recorded",
+    )
+
     # File Upload Configuration
     MAX_UPLOAD_SIZE: int = Field(default=10_000_000, env="MAX_UPLOAD_SIZE")  # 10MB
     ALLOWED_FILE_TYPES: List[str] = Field(
@@ -85,6 +365,14 @@ class Settings(BaseSettings):
             raise ValueError("OpenAI temperature must be between 0.0 and 1.0")
         return v
 
+    @validator("ANALYSIS_DETAIL_LEVEL")
+    def validate_detail_level(cls, v):
+        """Validate analysis detail level."""
+        allowed_levels = ["brief", "standard", "detailed"]
+        if v not in allowed_levels:
+            raise ValueError(f"Analysis detail level must be one of: {allowed_levels}")
+        return v
+
     @validator("DEFAULT_MIN_RISK_SCORE")
     def validate_min_risk_score(cls, v):
         """Validate minimum risk score."""
@@ -92,6 +380,13 @@ class Settings(BaseSettings):
             raise ValueError("Minimum risk score must be between 0.0 and 10.0")
         return v
 
+    @validator("NEAR_DUPLICATE_THRESHOLD")
+    def validate_near_duplicate_threshold(cls, v):
+        """Validate near-duplicate similarity threshold."""
+        if not 0.5 <= v <= 1.0:
+            raise ValueError("Near-duplicate threshold must be between 0.5 and 1.0")
+        return v
+
     @validator("ALLOWED_ORIGINS", pre=True)
     def parse_allowed_origins(cls, v):
         """Parse allowed origins from string or list."""
@@ -1,7 +1,17 @@
 from .risk_controller import RiskController
 from .health_controller import HealthController
+from .history_controller import HistoryController
+from .metrics_controller import MetricsController
+from .usage_controller import UsageController
+from .profile_controller import ProfileController
+from .memory_controller import MemoryController
 
 __all__ = [
     "RiskController",
-    "HealthController"
+    "HealthController",
+    "HistoryController",
+    "MetricsController",
+    "UsageController",
+    "ProfileController",
+    "MemoryController"
 ]
\ No newline at end of file
@@ -3,7 +3,7 @@ from typing import Any, Dict
 from loguru import logger
 
 from app.config import settings
-from app.services import risk_analysis_engine
+from app.services import risk_analysis_engine, lifecycle_service, warmup_service
 
 
 class HealthController:
@@ -64,6 +64,16 @@ class HealthController:
                 "api_version": settings.APP_VERSION,
             }
 
+    @staticmethod
+    async def get_readiness() -> Dict[str, Any]:
+        """Get whether this worker should receive traffic"""
+        return {
+            "ready": warmup_service.is_ready and not lifecycle_service.is_draining,
+            "draining": lifecycle_service.is_draining,
+            "warmup": warmup_service.get_stats(),
+            "timestamp": time.time(),
+        }
+
     @staticmethod
     async def get_api_info() -> Dict[str, Any]:
         """Get detailed API information and configuration"""
@@ -0,0 +1,135 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, status
+from loguru import logger
+
+from app.models import (
+    RiskAnalysisResponse,
+    AnalysisHistoryPage,
+    RiskHistoryPage,
+    DocumentType,
+    CompanyScale,
+    RiskCategory,
+    RiskSeverity,
+)
+from app.services import analysis_store
+from app.config import settings
+
+
+class HistoryController:
+    """Controller for persisted analysis history endpoints"""
+
+    @staticmethod
+    def _ensure_enabled() -> None:
+        """Reject history requests when persistence is switched off"""
+        if not settings.ANALYSIS_HISTORY_ENABLED:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Analysis history is disabled",
+            )
+
+    @staticmethod
+    def _page_size(page_size: Optional[int]) -> int:
+        """Apply the default and maximum page size"""
+        if page_size is None:
+            return settings.HISTORY_DEFAULT_PAGE_SIZE
+        return min(page_size, settings.HISTORY_MAX_PAGE_SIZE)
+
+    @staticmethod
+    async def list_analyses(
+        industry: Optional[str] = None,
+        company_scale: Optional[CompanyScale] = None,
+        document_type: Optional[DocumentType] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        page: int = 1,
+        page_size: Optional[int] = None,
+    ) -> AnalysisHistoryPage:
+        """Get a page of stored analyses"""
+        HistoryController._ensure_enabled()
+        page_size = HistoryController._page_size(page_size)
+
+        try:
+            items, total = await asyncio.to_thread(
+                analysis_store.list_analyses,
+                industry=industry,
+                company_scale=company_scale.value if company_scale else None,
+                document_type=document_type.value if document_type else None,
+                since=since,
+                until=until,
+                page=page,
+                page_size=page_size,
+            )
+        except Exception as e:
+            logger.error(f"Failed to list analyses: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to retrieve analysis history",
+            )
+
+        return AnalysisHistoryPage(
+            items=items, page=page, page_size=page_size, total=total
+        )
+
+    @staticmethod
+    async def list_risks(
+        category: Optional[RiskCategory] = None,
+        severity: Optional[RiskSeverity] = None,
+        industry: Optional[str] = None,
+        company_scale: Optional[CompanyScale] = None,
+        document_type: Optional[DocumentType] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        min_risk_score: Optional[float] = None,
+        page: int = 1,
+        page_size: Optional[int] = None,
+    ) -> RiskHistoryPage:
+        """Get a page of stored risks across analyses"""
+        HistoryController._ensure_enabled()
+        page_size = HistoryController._page_size(page_size)
+
+        try:
+            items, total = await asyncio.to_thread(
+                analysis_store.list_risks,
+                category=category.value if category else None,
+                severity=severity.value if severity else None,
+                industry=industry,
+                company_scale=company_scale.value if company_scale else None,
+                document_type=document_type.value if document_type else None,
+                since=since,
+                until=until,
+                min_risk_score=min_risk_score,
+                page=page,
+                page_size=page_size,
+            )
+        except Exception as e:
+            logger.error(f"Failed to list risks: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to retrieve risk history",
+            )
+
+        return RiskHistoryPage(items=items, page=page, page_size=page_size, total=total)
+
+    @staticmethod
+    async def get_analysis(analysis_id: str) -> RiskAnalysisResponse:
+        """Get a single stored analysis"""
+        HistoryController._ensure_enabled()
+
+        try:
+            analysis = await asyncio.to_thread(analysis_store.get_analysis, analysis_id)
+        except Exception as e:
+            logger.error(f"Failed to load analysis {analysis_id}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to retrieve analysis",
+            )
+
+        if analysis is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Analysis '{analysis_id}' not found",
+            )
+
+        return analysis
@@ -0,0 +1,78 @@
+import asyncio
+from typing import List, Optional
+from fastapi import HTTPException, status
+from loguru import logger
+
+from app.models import MemorySnapshotDiff, MemorySnapshotInfo
+from app.services import current_request_context, memory_service
+
+
+class MemoryController:
+    """Controller for tracemalloc snapshot endpoints"""
+
+    @staticmethod
+    def _ensure_admin_tracing() -> None:
+        """Reject non-admin requests and requests while tracemalloc is off"""
+        if not current_request_context().is_admin:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Memory snapshots require an admin API key",
+            )
+        if not memory_service.tracing:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Memory tracing is off; set MEMORY_TRACING_ENABLED=true",
+            )
+
+    @staticmethod
+    async def take_snapshot() -> MemorySnapshotInfo:
+        """Take a snapshot in this worker"""
+        MemoryController._ensure_admin_tracing()
+
+        try:
+            info = await asyncio.to_thread(memory_service.take_snapshot)
+        except Exception as e:
+            logger.error(f"Failed to take memory snapshot: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to take memory snapshot",
+            )
+
+        return MemorySnapshotInfo(**info)
+
+    @staticmethod
+    async def list_snapshots() -> List[MemorySnapshotInfo]:
+        """List the snapshots this worker holds"""
+        MemoryController._ensure_admin_tracing()
+
+        return [MemorySnapshotInfo(**info) for info in memory_service.list_snapshots()]
+
+    @staticmethod
+    async def diff_snapshots(
+        snapshot_id: str, against: Optional[str], key_type: str, limit: int
+    ) -> MemorySnapshotDiff:
+        """Diff a snapshot against a later one, or against the current heap"""
+        MemoryController._ensure_admin_tracing()
+
+        try:
+            diff = await asyncio.to_thread(
+                memory_service.diff, snapshot_id, against, key_type, limit
+            )
+        except Exception as e:
+            logger.error(f"Failed to diff memory snapshot {snapshot_id}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to diff memory snapshots",
+            )
+
+        if diff is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=(
+                    f"Snapshot '{snapshot_id}'"
+                    + (f" or '{against}'" if against else "")
+                    + " not found in this worker"
+                ),
+            )
+
+        return MemorySnapshotDiff(**diff)
@@ -0,0 +1,36 @@
+import time
+from typing import Any, Dict
+from loguru import logger
+
+from app.services import (
+    metrics_service,
+    near_duplicate_service,
+    admission_service,
+    lifecycle_service,
+    usage_service,
+    warmup_service,
+    memory_service,
+)
+
+
+class MetricsController:
+    """Controller for runtime metrics endpoints"""
+
+    @staticmethod
+    async def get_metrics() -> Dict[str, Any]:
+        """Get current runtime metrics"""
+        logger.info("Collecting runtime metrics")
+
+        metrics = metrics_service.snapshot()
+        metrics.update(
+            {
+                "near_duplicate": near_duplicate_service.get_stats(),
+                "admission": admission_service.get_stats(),
+                "lifecycle": lifecycle_service.get_stats(),
+                "token_usage": usage_service.get_stats(),
+                "warmup": warmup_service.get_stats(),
+                "memory": memory_service.get_stats(),
+                "timestamp": time.time(),
+            }
+        )
+        return metrics
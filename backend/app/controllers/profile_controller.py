@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any, Dict, List
+from fastapi import HTTPException, status
+from loguru import logger
+
+from app.models import ProfileSummary
+from app.services import current_request_context, profiling_service
+
+
+class ProfileController:
+    """Controller for stored request profiles"""
+
+    @staticmethod
+    def ensure_admin() -> None:
+        """Reject requests not made with one of ADMIN_API_KEYS"""
+        if not current_request_context().is_admin:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Profiles require an admin API key",
+            )
+
+    @staticmethod
+    async def list_profiles() -> List[ProfileSummary]:
+        """List stored profiles, newest first"""
+        ProfileController.ensure_admin()
+
+        try:
+            profiles = await asyncio.to_thread(profiling_service.list_profiles)
+        except Exception as e:
+            logger.error(f"Failed to list profiles: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to retrieve profiles",
+            )
+
+        return [ProfileSummary(**profile) for profile in profiles]
+
+    @staticmethod
+    async def get_profile(profile_id: str) -> Dict[str, Any]:
+        """Get a stored profile with its stacks"""
+        ProfileController.ensure_admin()
+
+        try:
+            profile = await asyncio.to_thread(profiling_service.get_profile, profile_id)
+        except Exception as e:
+            logger.error(f"Failed to load profile {profile_id}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to retrieve profile",
+            )
+
+        if profile is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Profile '{profile_id}' not found",
+            )
+
+        return profile
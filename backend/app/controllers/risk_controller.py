@@ -1,9 +1,17 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from fastapi import HTTPException, status
 from loguru import logger
 
-from app.models import DocumentInput, RiskAnalysisResponse
-from app.services import risk_analysis_engine
+from app.models import DocumentInput, RiskAnalysisResponse, AnalysisProfile
+from app.services import (
+    risk_analysis_engine,
+    analysis_store,
+    usage_service,
+    current_request_context,
+    shadow_recorder,
+    AdmissionRejectedError,
+    TokenBudgetExceededError,
+)
 from app.config import settings
 
 
@@ -104,6 +112,7 @@ class RiskController:
     @staticmethod
     async def analyze_document_risks(
         document_input: DocumentInput,
+        deadline: Optional[float] = None,
     ) -> RiskAnalysisResponse:
         """Main method to analyze document for risks"""
         try:
@@ -114,8 +123,13 @@ class RiskController:
                 f"Scale: {document_input.company_scale.value}"
             )
 
+            # Refuse before extraction when the API key is out of tokens
+            await usage_service.check_budget(current_request_context())
+
             # Perform risk analysis
-            result = await risk_analysis_engine.analyze_document(document_input)
+            result = await risk_analysis_engine.analyze_document(
+                document_input, deadline=deadline
+            )
 
             # Log successful analysis
             logger.info(
@@ -125,8 +139,28 @@ class RiskController:
                 f"Overall score: {result.risk_summary.overall_risk_score}"
             )
 
+            # Keep an anonymized copy for replaying against other models and prompts
+            await shadow_recorder.record(document_input, result)
+
             return result
 
+        except HTTPException:
+            raise
+
+        except AdmissionRejectedError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(e),
+                headers={"Retry-After": str(e.retry_after)},
+            )
+
+        except TokenBudgetExceededError as e:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=str(e),
+                headers={"Retry-After": str(e.retry_after)},
+            )
+
         except ValueError as e:
             logger.error(f"Risk analysis validation error: {e}")
             raise HTTPException(
@@ -181,8 +215,14 @@ class RiskController:
                     "min_risk_score_threshold": settings.DEFAULT_MIN_RISK_SCORE,
                     "model": settings.OPENAI_MODEL,
                     "max_document_length": settings.MAX_DOCUMENT_LENGTH,
+                    "analysis_profiles": [profile.value for profile in AnalysisProfile],
                 },
                 "model_info": health_data.get("model_info", {}),
+                "history": (
+                    analysis_store.get_stats()
+                    if settings.ANALYSIS_HISTORY_ENABLED
+                    else {"enabled": False}
+                ),
                 "last_updated": health_data.get("timestamp"),
             }
 
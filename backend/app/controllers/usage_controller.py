@@ -0,0 +1,64 @@
+import asyncio
+from datetime import datetime
+from typing import List, Optional
+from fastapi import HTTPException, status
+from loguru import logger
+
+from app.models import TokenUsageReport, UsageDimension
+from app.services import analysis_store, current_request_context
+from app.config import settings
+
+
+class UsageController:
+    """Controller for token usage reporting endpoints"""
+
+    @staticmethod
+    async def get_usage_report(
+        group_by: Optional[List[UsageDimension]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> TokenUsageReport:
+        """Get token totals grouped by API key, model and/or document type
+
+        Admin keys see every tenant, grouped by API key unless asked otherwise.
+        Other keys only see their own usage, grouped by model by default, and
+        may not group by API key.
+        """
+        if not settings.TOKEN_ACCOUNTING_ENABLED:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Token accounting is disabled",
+            )
+
+        context = current_request_context()
+        if not group_by:
+            group_by = [
+                UsageDimension.API_KEY if context.is_admin else UsageDimension.MODEL
+            ]
+        if not context.is_admin and UsageDimension.API_KEY in group_by:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Grouping by API key requires an admin API key",
+            )
+
+        # Keep the requested order but drop repeats
+        dimensions = list(dict.fromkeys(group_by))
+
+        try:
+            items = await asyncio.to_thread(
+                analysis_store.summarize_token_usage,
+                [dimension.value for dimension in dimensions],
+                since,
+                until,
+                None if context.is_admin else context.tenant,
+            )
+        except Exception as e:
+            logger.error(f"Failed to summarize token usage: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to retrieve token usage",
+            )
+
+        return TokenUsageReport(
+            group_by=dimensions, since=since, until=until, items=items
+        )
@@ -0,0 +1,301 @@
+"""
+Bulk ingestion of a directory or manifest of documents.
+
+    python -m app.ingest ./documents --output results.jsonl
+    python -m app.ingest manifest.jsonl --output results.jsonl --concurrency 8 --rate 120
+
+- Extracts text with FileProcessorService in a process pool
+- Runs RiskAnalysisEngine concurrently under a per-minute rate limit, in the
+  batch priority class so interactive API traffic is served first
+- Appends one JSON line per file to the output, which doubles as the
+  checkpoint: a rerun skips files already analyzed unless they have changed
+- Logs throughput and ETA as files complete
+
+A manifest is either a text file with one path per line, or JSONL with a
+"path" plus optional document_type, company_scale, industry and
+analysis_profile per line. Relative paths resolve against the manifest.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+from app.config import settings
+from app.models import DocumentInput, RequestPriority
+from app.services.file_processing_service import FileProcessorService
+from app.services.request_context import RequestContext, bind_request_context
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = {"pdf", "txt", "docx", "doc"}
+
+# Seconds between progress lines when files complete quickly
+PROGRESS_INTERVAL = 5.0
+
+
+class IngestItem(NamedTuple):
+    path: Path
+    options: Dict[str, Any]
+
+
+def discover_items(source: Path) -> List[IngestItem]:
+    """Files to ingest from a directory tree or a manifest"""
+    if source.is_dir():
+        return [
+            IngestItem(path, {})
+            for path in sorted(source.rglob("*"))
+            if path.is_file()
+            and path.suffix.lower().lstrip(".") in SUPPORTED_EXTENSIONS
+        ]
+
+    items = []
+    for line in source.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        options: Dict[str, Any] = (
+            json.loads(line) if line.startswith("{") else {"path": line}
+        )
+        path = Path(options.pop("path"))
+        if not path.is_absolute():
+            path = source.parent / path
+        items.append(IngestItem(path, options))
+    return items
+
+
+def checkpoint_key(path: Path) -> str:
+    """Identity of a file version; an edited file gets a new key and is re-analyzed"""
+    stat = path.stat()
+    return f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def load_completed(output: Path) -> Set[str]:
+    """Checkpoint keys of files already analyzed successfully"""
+    completed: Set[str] = set()
+    if not output.exists():
+        return completed
+
+    with output.open(encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by a crash; that file runs again
+                continue
+            if record.get("status") == "ok":
+                completed.add(record["checkpoint"])
+    return completed
+
+
+def extract_text(path: str) -> str:
+    """Extract a file's text (runs in a pool process)"""
+    file_path = Path(path)
+    file_data = base64.b64encode(file_path.read_bytes()).decode("utf-8")
+    return FileProcessorService.extract_text_from_base64(
+        file_data, file_path.suffix.lower().lstrip("."), file_path.name
+    )
+
+
+class RateLimiter:
+    """Spaces calls evenly so no more than per_minute start in any minute"""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            if self._next_start > now:
+                await asyncio.sleep(self._next_start - now)
+            self._next_start = max(now, self._next_start) + self.interval
+
+
+class ProgressReporter:
+    """Logs completed files, throughput and ETA"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.succeeded = 0
+        self.failed = 0
+        self.start = time.monotonic()
+        self._last_report = 0.0
+
+    @property
+    def done(self) -> int:
+        return self.succeeded + self.failed
+
+    def record(self, ok: bool) -> None:
+        if ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+        now = time.monotonic()
+        if now - self._last_report >= PROGRESS_INTERVAL or self.done == self.total:
+            self._last_report = now
+            logger.info(self.summary())
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.start
+        per_minute = self.done / elapsed * 60 if elapsed > 0 else 0.0
+        remaining = self.total - self.done
+        eta = remaining / per_minute * 60 if per_minute > 0 else 0.0
+        return (
+            f"{self.done}/{self.total} files ({self.failed} failed), "
+            f"{per_minute:.1f} files/min, ETA {int(eta // 60)}m{int(eta % 60):02d}s"
+        )
+
+
+async def ingest(
+    items: List[IngestItem],
+    output: Path,
+    defaults: Dict[str, Any],
+    processes: int,
+    concurrency: int,
+    rate_per_minute: float,
+) -> ProgressReporter:
+    """Analyze items not yet in the output, appending a result line for each"""
+    from app.services.risk_analysis_engine import risk_analysis_engine
+
+    completed = load_completed(output)
+    pending = []
+    missing = 0
+    for item in items:
+        try:
+            key = checkpoint_key(item.path)
+        except OSError as e:
+            logger.warning(f"Skipping {item.path}: {e}")
+            missing += 1
+            continue
+        if key not in completed:
+            pending.append((item, key))
+    logger.info(
+        f"{len(items)} files found, {len(items) - len(pending) - missing} already done, "
+        f"{missing} missing, {len(pending)} to analyze"
+    )
+
+    progress = ProgressReporter(len(pending))
+    rate_limiter = RateLimiter(rate_per_minute)
+    queue: asyncio.Queue = asyncio.Queue()
+    for entry in pending:
+        queue.put_nowait(entry)
+
+    loop = asyncio.get_running_loop()
+
+    with ProcessPoolExecutor(max_workers=processes) as pool, output.open(
+        "a", encoding="utf-8"
+    ) as results:
+
+        def write(record: Dict[str, Any]) -> None:
+            results.write(json.dumps(record, default=str) + "\n")
+            results.flush()
+
+        async def analyze(item: IngestItem, key: str) -> None:
+            started = time.monotonic()
+            record: Dict[str, Any] = {"path": str(item.path), "checkpoint": key}
+            try:
+                text = await loop.run_in_executor(pool, extract_text, str(item.path))
+                document_input = DocumentInput(
+                    document_content=text,
+                    filename=item.path.name,
+                    **{**defaults, **item.options},
+                )
+                await rate_limiter.wait()
+                response = await risk_analysis_engine.analyze_document(document_input)
+                record.update(
+                    status="ok",
+                    analysis_id=response.analysis_id,
+                    result=response.model_dump(mode="json"),
+                )
+            except Exception as e:
+                logger.warning(f"Failed to analyze {item.path}: {e}")
+                record.update(status="error", error=str(e))
+
+            record["elapsed_seconds"] = round(time.monotonic() - started, 3)
+            write(record)
+            progress.record(record["status"] == "ok")
+
+        async def worker() -> None:
+            while True:
+                try:
+                    item, key = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                # Bulk work queues behind interactive requests for LLM slots;
+                # a context per file keeps its timings and token usage apart
+                context = RequestContext("ingest", RequestPriority.BATCH)
+                with bind_request_context(context):
+                    await analyze(item, key)
+
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+    return progress
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Analyze a directory or manifest of documents"
+    )
+    parser.add_argument("source", type=Path, help="Directory to walk or manifest file")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        required=True,
+        help="Results JSONL, also used as the checkpoint",
+    )
+    parser.add_argument("--document-type", default="business_plan")
+    parser.add_argument("--company-scale", default="small")
+    parser.add_argument("--industry", default=None)
+    parser.add_argument(
+        "--profile", default=None, help="Analysis profile (fast, standard, deep)"
+    )
+    parser.add_argument(
+        "--processes", type=int, default=None, help="Extraction processes (default: CPUs)"
+    )
+    parser.add_argument("--concurrency", type=int, default=4, help="Analyses in flight")
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=settings.RATE_LIMIT_PER_MINUTE,
+        help="Most analyses started per minute (0 for no limit)",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=settings.LOG_LEVEL, format=settings.LOG_FORMAT)
+
+    from app.server import available_cpus
+
+    defaults: Dict[str, Any] = {
+        "document_type": args.document_type,
+        "company_scale": args.company_scale,
+        "industry": args.industry,
+        "analysis_profile": args.profile,
+    }
+    items = discover_items(args.source)
+
+    progress = asyncio.run(
+        ingest(
+            items,
+            args.output,
+            defaults,
+            processes=args.processes or available_cpus(),
+            concurrency=args.concurrency,
+            rate_per_minute=args.rate,
+        )
+    )
+    logger.info(f"Finished: {progress.summary()}")
+    if progress.failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
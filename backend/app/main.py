@@ -1,19 +1,33 @@
 from fastapi import FastAPI, Request, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.encoders import jsonable_encoder
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+import asyncio
 import logging
 import time
 from typing import Dict, Any
-import uvicorn
 
-from .api import api_router
+from .api import api_router, probe_router
 from .config.settings import settings
-from .models.risk_model import ErrorResponse
+from .models.risk_model import ErrorResponse, RequestPriority
+from .services.lifecycle_service import lifecycle_service
+from .services.warmup_service import warmup_service
+from .services.fault_injection import FaultPlan, fault_injector
+from .services.profiling_service import profiling_service
+from .services.memory_service import memory_service
+from .services.request_context import (
+    RequestContext,
+    bind_request_context,
+    current_request_context,
+    is_admin_api_key,
+    is_configured_api_key,
+    tenant_for_api_key,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -44,7 +58,7 @@ async def verify_api_key(credentials: HTTPAuthorizationCredentials = Depends(sec
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if credentials.credentials != settings.API_KEY:
+    if not is_configured_api_key(credentials.credentials):
         logger.warning(f"Invalid API key attempted: {credentials.credentials[:8]}...")
         raise HTTPException(
             status_code=401,
@@ -69,10 +83,22 @@ async def lifespan(app: FastAPI):
     )
     logger.info(f"🔐 API Key protection: {'✅' if settings.API_KEY_REQUIRED else '❌'}")
 
+    if settings.MEMORY_TRACING_ENABLED:
+        memory_service.start_tracing()
+
+    # Warm up in the background; /ready reports 503 until it completes
+    warmup_task = asyncio.create_task(warmup_service.warm_up())
+
     yield
 
     # Shutdown
     logger.info("🛑 Business Risk Identifier API is shutting down...")
+    warmup_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await warmup_task
+    lifecycle_service.start_draining()
+    if await lifecycle_service.wait_until_idle(settings.SERVER_DRAIN_TIMEOUT):
+        logger.info("✅ In-flight work drained")
 
 
 # Create FastAPI application instance
@@ -139,11 +165,125 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Response Compression Middleware
+# Brotli when the client accepts it and brotli-asgi is installed, gzip otherwise
+try:
+    from brotli_asgi import BrotliMiddleware
+
+    app.add_middleware(
+        BrotliMiddleware,
+        quality=settings.COMPRESSION_BROTLI_QUALITY,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_fallback=True,
+    )
+except ImportError:
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        compresslevel=settings.COMPRESSION_GZIP_LEVEL,
+    )
+
 # Trusted Host Middleware (Security)
 if settings.ENVIRONMENT == "production":
     app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.ALLOWED_HOSTS)
 
 
+# Graceful Drain Middleware
+@app.middleware("http")
+async def reject_while_draining(request: Request, call_next):
+    """Track in-flight requests and turn new ones away once draining starts."""
+    if lifecycle_service.is_draining:
+        error_response = ErrorResponse(
+            error="HTTP 503",
+            detail="Server is shutting down. Please retry on another instance.",
+        )
+        return JSONResponse(
+            status_code=503,
+            content=jsonable_encoder(error_response.dict()),
+            headers={"Retry-After": "1", "Connection": "close"},
+        )
+
+    with lifecycle_service.track_request():
+        return await call_next(request)
+
+
+# On-demand Profiling Middleware (runs inside the scheduling context)
+@app.middleware("http")
+async def profile_on_demand(request: Request, call_next):
+    """Profile an analyze or file-processor request when an admin asks for it."""
+    flag = request.headers.get("X-Profile") or request.query_params.get("profile")
+    if (
+        not flag
+        or flag.lower() not in ("1", "true", "yes")
+        or not profiling_service.enabled
+        or not profiling_service.covers(request.url.path)
+    ):
+        return await call_next(request)
+
+    if not current_request_context().is_admin:
+        error_response = ErrorResponse(
+            error="HTTP 403", detail="Profiling requires an admin API key"
+        )
+        return JSONResponse(
+            status_code=403, content=jsonable_encoder(error_response.dict())
+        )
+
+    capture = profiling_service.start(f"{request.method} {request.url.path}")
+    if capture is None:
+        response = await call_next(request)
+        response.headers["X-Profile-Status"] = "rate-limited"
+        return response
+
+    status_code = None
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        await profiling_service.finish(capture, status_code)
+    response.headers["X-Profile-Id"] = capture.profile_id
+    return response
+
+
+# Request Scheduling Context Middleware
+@app.middleware("http")
+async def bind_scheduling_context(request: Request, call_next):
+    """Tag the request with its API key and priority class for fair-share queueing."""
+    priority_header = request.headers.get("X-Priority", RequestPriority.INTERACTIVE.value)
+    try:
+        priority = RequestPriority(priority_header.lower())
+    except ValueError:
+        allowed = ", ".join(p.value for p in RequestPriority)
+        error_response = ErrorResponse(
+            error="HTTP 400", detail=f"X-Priority must be one of: {allowed}"
+        )
+        return JSONResponse(
+            status_code=400, content=jsonable_encoder(error_response.dict())
+        )
+
+    scheme, _, api_key = request.headers.get("Authorization", "").partition(" ")
+    tenant = tenant_for_api_key(api_key if scheme.lower() == "bearer" else None)
+    context = RequestContext(tenant, priority)
+    context.is_admin = is_admin_api_key(api_key if scheme.lower() == "bearer" else None)
+
+    # Provider faults for resilience tests; ignored in production
+    fault_header = request.headers.get("X-Fault-Injection")
+    if fault_header and fault_injector.enabled:
+        try:
+            context.faults = FaultPlan.parse(fault_header)
+        except ValueError as e:
+            error_response = ErrorResponse(
+                error="HTTP 400", detail=f"Invalid X-Fault-Injection header: {e}"
+            )
+            return JSONResponse(
+                status_code=400, content=jsonable_encoder(error_response.dict())
+            )
+
+    with bind_request_context(context):
+        response = await call_next(request)
+    response.headers["X-Queue-Wait-Ms"] = str(context.queue_wait_ms)
+    return response
+
+
 # Request Processing Time Middleware
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
@@ -164,7 +304,9 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     error_response = ErrorResponse(error=f"HTTP {exc.status_code}", detail=exc.detail)
 
     return JSONResponse(
-        status_code=exc.status_code, content=jsonable_encoder(error_response.dict())
+        status_code=exc.status_code,
+        content=jsonable_encoder(error_response.dict()),
+        headers=getattr(exc, "headers", None),
     )
 
 
@@ -211,6 +353,9 @@ async def general_exception_handler(request: Request, exc: Exception):
 # Include API routes with API key protection
 app.include_router(api_router, dependencies=[Depends(verify_api_key)])
 
+# Readiness probes only see warm-up and drain state, so they need no API key
+app.include_router(probe_router)
+
 
 # Health check endpoint (additional simple one)
 @app.get("/ping", include_in_schema=False)
@@ -229,6 +374,8 @@ async def startup_event():
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     # Run the application
     uvicorn.run(
         "app.main:app",
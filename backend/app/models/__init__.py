@@ -8,14 +8,34 @@ from .risk_model import (
     IdentifiedRisk,
     RiskSummary,
     RiskAnalysisResponse,
+    AnalysisMetadata,
+    PassageCoverage,
+    TranscriptCompaction,
+    TokenUsage,
+    TokenUsageAggregate,
+    TokenUsageReport,
+    ProfileSummary,
+    MemorySnapshotInfo,
+    MemoryAllocationDiff,
+    MemorySnapshotDiff,
     ErrorResponse,
     
+    # History Models
+    AnalysisHistoryItem,
+    AnalysisHistoryPage,
+    StoredRiskItem,
+    RiskHistoryPage,
+    
     # Enum Types
     DocumentType,
     CompanyScale,
     RiskCategory,
     RiskSeverity,
     RiskProbability,
+    AnalysisProfile,
+    DetailLevel,
+    RequestPriority,
+    UsageDimension,
     
     # Helper Models
     RiskDistribution
@@ -28,11 +48,29 @@ __all__ = [
     "IdentifiedRisk",
     "RiskSummary",
     "RiskAnalysisResponse",
+    "AnalysisMetadata",
+    "PassageCoverage",
+    "TranscriptCompaction",
+    "TokenUsage",
+    "TokenUsageAggregate",
+    "TokenUsageReport",
+    "ProfileSummary",
+    "MemorySnapshotInfo",
+    "MemoryAllocationDiff",
+    "MemorySnapshotDiff",
     "ErrorResponse",
+    "AnalysisHistoryItem",
+    "AnalysisHistoryPage",
+    "StoredRiskItem",
+    "RiskHistoryPage",
     "DocumentType",
     "CompanyScale", 
     "RiskCategory",
     "RiskSeverity",
     "RiskProbability",
+    "AnalysisProfile",
+    "DetailLevel",
+    "RequestPriority",
+    "UsageDimension",
     "RiskDistribution"
 ]
\ No newline at end of file
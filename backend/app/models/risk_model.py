@@ -46,6 +46,34 @@ class RiskProbability(str, Enum):
     HIGH = "high"
 
 
+class AnalysisProfile(str, Enum):
+    # Enum for named analysis profiles
+    FAST = "fast"
+    STANDARD = "standard"
+    DEEP = "deep"
+
+
+class RequestPriority(str, Enum):
+    # Enum for scheduling classes of LLM work
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+    BACKGROUND = "background"
+
+
+class UsageDimension(str, Enum):
+    # Enum for grouping token usage reports
+    API_KEY = "api_key"
+    MODEL = "model"
+    DOCUMENT_TYPE = "document_type"
+
+
+class DetailLevel(str, Enum):
+    # Enum for how much detail each risk carries
+    BRIEF = "brief"
+    STANDARD = "standard"
+    DETAILED = "detailed"
+
+
 # Input Models
 class FileType(str, Enum):
     PDF = "pdf"
@@ -54,6 +82,20 @@ class FileType(str, Enum):
     DOC = "doc"
 
 
+# Configuration Model
+class AnalysisConfig(BaseModel):
+    # Configuration for risk analysis (fields left unset come from the profile)
+    max_risks: int = Field(default=10, ge=1, le=20)
+    min_risk_score: float = Field(default=3.0, ge=0.0, le=10.0)
+    include_evidence: bool = Field(default=True)
+    detailed_mitigation: bool = Field(default=True)
+    detail_level: DetailLevel = Field(default=DetailLevel.STANDARD)
+    category_sharding: bool = Field(
+        default=False,
+        description="Split the analysis into concurrent completions per category group",
+    )
+
+
 class DocumentInput(BaseModel):
     # Existing fields
     document_content: Optional[str] = Field(
@@ -90,6 +132,23 @@ class DocumentInput(BaseModel):
         None,
         description="Original filename",
     )
+    incremental: bool = Field(
+        False,
+        description="Revision-aware mode: only re-analyze chunks that changed since a previous submission",
+    )
+    analysis_profile: Optional[AnalysisProfile] = Field(
+        None,
+        description="Named profile: 'fast' for quick triage, 'deep' for a thorough review",
+    )
+    analysis_config: Optional[AnalysisConfig] = Field(
+        None,
+        description="Per-request settings; fields set here override the profile",
+    )
+    deadline_ms: Optional[int] = Field(
+        None,
+        ge=100,
+        description="Latency budget in milliseconds; a degraded result is returned when it runs out",
+    )
 
     @field_validator("document_content")
     def validate_content(cls, v):
@@ -234,14 +293,214 @@ class RiskSummary(BaseModel):
         return round(v, 1)
 
 
+class TokenUsage(BaseModel):
+    # Model for provider token counts
+    calls: int = Field(0, ge=0, description="Provider calls made")
+    prompt_tokens: int = Field(0, ge=0)
+    completion_tokens: int = Field(0, ge=0)
+    cached_tokens: int = Field(
+        0, ge=0, description="Prompt tokens served from the provider's prompt cache"
+    )
+    total_tokens: int = Field(0, ge=0)
+
+
+class PassageCoverage(BaseModel):
+    # Model for how much of a long document was sent to the model
+    passages_total: int = Field(ge=0)
+    passages_kept: int = Field(ge=0)
+    original_tokens: int = Field(ge=0, description="Estimated tokens of the full document")
+    selected_tokens: int = Field(ge=0, description="Estimated tokens of the text sent")
+    content_coverage: float = Field(
+        ge=0.0, le=1.0, description="Share of the document's text that was kept"
+    )
+    signal_coverage: float = Field(
+        ge=0.0, le=1.0, description="Share of the document's risk signals that was kept"
+    )
+
+
+class TranscriptCompaction(BaseModel):
+    # Model for how much a meeting transcript was compacted before analysis
+    turns_total: int = Field(ge=0, description="Speaker turns parsed from the transcript")
+    turns_kept: int = Field(
+        ge=0, description="Turns left after dropping back-channel turns and merging"
+    )
+    speakers: int = Field(ge=0)
+    original_tokens: int = Field(ge=0, description="Estimated tokens of the transcript")
+    compacted_tokens: int = Field(ge=0, description="Estimated tokens of the compact form")
+    token_reduction: float = Field(description="Share of the estimated tokens removed")
+
+
+class AnalysisMetadata(BaseModel):
+    # Model for details about how an analysis was produced
+    analysis_mode: str = Field(
+        "full", description="How the analysis was produced (full, incremental, reused)"
+    )
+    chunks_total: Optional[int] = Field(
+        None, description="Number of content chunks (incremental mode)"
+    )
+    chunks_reused: Optional[int] = Field(
+        None, description="Chunks answered from cached findings (incremental mode)"
+    )
+    reused_from: Optional[str] = Field(
+        None, description="Analysis id whose findings were reused for a near-duplicate document"
+    )
+    similarity: Optional[float] = Field(
+        None, description="Fingerprint similarity to the reused analysis (0-1)"
+    )
+    risks_salvaged: int = Field(
+        0, ge=0, description="Risks recovered from a truncated or malformed model response"
+    )
+    fields_repaired: int = Field(
+        0, ge=0, description="Over-long risk fields shortened instead of dropping the risk"
+    )
+    analysis_profile: Optional[str] = Field(
+        None, description="Analysis profile the request ran with"
+    )
+    model: Optional[str] = Field(None, description="Model that produced the findings")
+    prompt_version: Optional[str] = Field(
+        None, description="Hash of the system prompt the findings were produced with"
+    )
+    degraded: bool = Field(
+        False,
+        description="Whether the result was reduced to meet the request deadline or is missing failed category groups",
+    )
+    faults_injected: bool = Field(
+        False, description="Whether provider faults could be injected (resilience testing)"
+    )
+    strategy: Optional[str] = Field(
+        None,
+        description="How the result was produced under a deadline (full, fast_model, truncated, near_duplicate, partial, none)",
+    )
+    deadline_ms: Optional[int] = Field(None, description="Deadline the request ran under")
+    shards_total: Optional[int] = Field(
+        None, description="Category-group completions run concurrently (sharded mode)"
+    )
+    shards_failed: Optional[int] = Field(
+        None, description="Category-group completions that failed (sharded mode)"
+    )
+    priority: Optional[str] = Field(
+        None, description="Scheduling class the request's model calls ran in"
+    )
+    queue_wait_ms: int = Field(
+        0, ge=0, description="Time the request spent queued for extraction and model slots"
+    )
+    transcript_compaction: Optional[TranscriptCompaction] = Field(
+        None, description="Set when a meeting transcript was compacted before analysis"
+    )
+    passage_selection: Optional[PassageCoverage] = Field(
+        None, description="Set when only the most risk-relevant passages were analyzed"
+    )
+    token_usage: Optional[TokenUsage] = Field(
+        None, description="Tokens used by the request's provider calls"
+    )
+
+
 class RiskAnalysisResponse(BaseModel):
     # Main response model for risk analysis
+    analysis_id: Optional[str] = Field(
+        None, description="Identifier of the persisted analysis (for history lookups)"
+    )
     document_analysis: DocumentAnalysis
     identified_risk: List[IdentifiedRisk] = Field(default_factory=list)
     risk_summary: RiskSummary
     processing_time: Optional[float] = Field(
         None, description="Time taken to process the analysis in seconds"
     )
+    metadata: AnalysisMetadata = Field(default_factory=AnalysisMetadata)
+
+
+# History Models
+class AnalysisHistoryItem(BaseModel):
+    # Summary row for a persisted analysis
+    analysis_id: str
+    document_type: DocumentType
+    industry: Optional[str] = None
+    company_scale: CompanyScale
+    analysis_timestamp: datetime
+    document_length: int
+    total_risks: int
+    overall_risk_score: float
+    processing_time: Optional[float] = None
+    faults_injected: bool = False
+
+
+class AnalysisHistoryPage(BaseModel):
+    # Paginated list of persisted analyses
+    items: List[AnalysisHistoryItem] = Field(default_factory=list)
+    page: int = Field(ge=1)
+    page_size: int = Field(ge=1)
+    total: int = Field(ge=0)
+
+
+class StoredRiskItem(BaseModel):
+    # Single persisted risk together with the context of its analysis
+    analysis_id: str
+    analysis_timestamp: datetime
+    document_type: DocumentType
+    industry: Optional[str] = None
+    company_scale: CompanyScale
+    risk: IdentifiedRisk
+
+
+class RiskHistoryPage(BaseModel):
+    # Paginated list of persisted risks
+    items: List[StoredRiskItem] = Field(default_factory=list)
+    page: int = Field(ge=1)
+    page_size: int = Field(ge=1)
+    total: int = Field(ge=0)
+
+
+class TokenUsageAggregate(TokenUsage):
+    # Token totals for one group of a usage report
+    api_key: Optional[str] = Field(None, description="First 8 characters of the API key")
+    model: Optional[str] = None
+    document_type: Optional[str] = None
+    analyses: int = Field(0, ge=0, description="Analysis requests that made provider calls")
+
+
+class TokenUsageReport(BaseModel):
+    # Token usage grouped by the requested dimensions
+    group_by: List[UsageDimension] = Field(default_factory=list)
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    items: List[TokenUsageAggregate] = Field(default_factory=list)
+
+
+class ProfileSummary(BaseModel):
+    # A stored request profile, without its stacks
+    profile_id: str
+    label: str = Field(..., description="Method and path of the profiled request")
+    created_at: datetime
+    duration_seconds: float
+    interval_ms: float
+    samples: int
+    status_code: Optional[int] = None
+
+
+class MemorySnapshotInfo(BaseModel):
+    # A tracemalloc snapshot kept by one worker
+    snapshot_id: str
+    taken_at: datetime
+    pid: int = Field(..., description="Worker process that holds the snapshot")
+    traced_bytes: int
+
+
+class MemoryAllocationDiff(BaseModel):
+    # Allocation change at one source location between two snapshots
+    frames: List[str] = Field(default_factory=list, description="file:line, outermost first")
+    size_bytes: int
+    size_diff_bytes: int
+    count: int
+    count_diff: int
+
+
+class MemorySnapshotDiff(BaseModel):
+    # Largest allocation changes since a snapshot
+    snapshot_id: str
+    against: Optional[str] = Field(None, description="Later snapshot; None means now")
+    key_type: str
+    total_diff_bytes: int
+    items: List[MemoryAllocationDiff] = Field(default_factory=list)
 
 
 # Error Models
@@ -250,12 +509,3 @@ class ErrorResponse(BaseModel):
     error: str
     detail: Optional[str] = None
     timestamp: datetime = Field(default_factory=datetime.now)
-
-
-# Configuration Model
-class AnalysisConfig(BaseModel):
-    # Configuration for risk analysis
-    max_risks: int = Field(default=10, ge=1, le=20)
-    min_risk_score: float = Field(default=3.0, ge=0.0, le=10.0)
-    include_evidence: bool = Field(default=True)
-    detailed_mitigation: bool = Field(default=True)
@@ -0,0 +1,335 @@
+"""
+Replay recorded analyze traffic against another model, prompt or profile.
+
+    python -m app.replay shadow_traffic.jsonl --model openai/gpt-4o-mini
+    python -m app.replay shadow_traffic.jsonl --system-prompt prompts/v2.txt --output report.jsonl
+    python -m app.replay shadow_traffic.jsonl --profile fast --stub
+
+- Reads records written by the shadow recorder (SHADOW_RECORDING_ENABLED)
+- Runs each recorded request through RiskAnalysisEngine with the overrides,
+  without history, near-duplicate reuse, token accounting or recording
+- Reports per request the latency delta, the token delta and the overlap of
+  the replayed risk set with the recorded RiskAnalysisResponse
+- --stub answers every call locally with the recorded risks instead of calling
+  the provider, which measures pipeline overhead and checks the harness itself
+
+--model replaces OPENAI_MODEL; a profile with its own model setting
+(FAST_PROFILE_MODEL, DEEP_PROFILE_MODEL) keeps using that model.
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import logging
+import re
+import statistics
+import time
+import types
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.models import DocumentInput, RequestPriority
+from app.services.passage_selector import PassageSelector
+from app.services.request_context import RequestContext, bind_request_context
+
+logger = logging.getLogger(__name__)
+
+# Risks match when they share a category and this much of their title words
+TITLE_MATCH_THRESHOLD = 0.5
+
+# Fields of a recorded risk the stub returns as model output
+STUB_RISK_FIELDS = (
+    "risk_id",
+    "title",
+    "description",
+    "category",
+    "severity",
+    "probability",
+    "risk_score",
+    "impact_areas",
+    "mitigation_recommendations",
+    "context_evidence",
+)
+
+_TITLE_WORD = re.compile(r"[a-z0-9]+")
+
+# Recorded response the stub is answering for, per replay task
+_stub_response: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar(
+    "stub_response"
+)
+
+
+def load_records(path: Path, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Shadow records from a JSONL file, skipping lines cut short by a crash"""
+    records = []
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+            if limit is not None and len(records) >= limit:
+                break
+    return records
+
+
+class _StubCompletions:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def create(self, messages: List[Dict[str, str]], **kwargs) -> Any:
+        recorded = _stub_response.get()
+        risks = [
+            {field: risk[field] for field in STUB_RISK_FIELDS if field in risk}
+            for risk in recorded.get("identified_risk", [])
+        ]
+        content = json.dumps(
+            {
+                "identified_risks": risks,
+                "key_concerns": recorded.get("risk_summary", {}).get("key_concerns", []),
+            }
+        )
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        prompt_tokens = sum(
+            PassageSelector.estimate_tokens(message["content"]) for message in messages
+        )
+        completion_tokens = PassageSelector.estimate_tokens(content)
+        return types.SimpleNamespace(
+            choices=[
+                types.SimpleNamespace(
+                    message=types.SimpleNamespace(content=content), finish_reason="stop"
+                )
+            ],
+            usage=types.SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+                prompt_tokens_details=None,
+            ),
+        )
+
+
+class StubClient:
+    """Provider stand-in that answers with the recorded response's risks"""
+
+    def __init__(self, latency: float = 0.0):
+        self.chat = types.SimpleNamespace(completions=_StubCompletions(latency))
+
+
+def _title_words(risk: Dict[str, Any]) -> set:
+    return set(_TITLE_WORD.findall(str(risk.get("title", "")).lower()))
+
+
+def risk_overlap(
+    original: List[Dict[str, Any]], replayed: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Match risks by category and title words; report the overlap of the two sets"""
+    candidates: List[Tuple[float, int, int]] = []
+    for i, a in enumerate(original):
+        for j, b in enumerate(replayed):
+            if a.get("category") != b.get("category"):
+                continue
+            a_words, b_words = _title_words(a), _title_words(b)
+            union = a_words | b_words
+            similarity = len(a_words & b_words) / len(union) if union else 1.0
+            if similarity >= TITLE_MATCH_THRESHOLD:
+                candidates.append((similarity, i, j))
+
+    # Best-matching pairs first, each risk used once
+    matched_original, matched_replayed = set(), set()
+    for _, i, j in sorted(candidates, reverse=True):
+        if i not in matched_original and j not in matched_replayed:
+            matched_original.add(i)
+            matched_replayed.add(j)
+
+    matched = len(matched_original)
+    union = len(original) + len(replayed) - matched
+    return {
+        "matched": matched,
+        "overlap": round(matched / union, 4) if union else 1.0,
+        "removed": [
+            risk.get("title") for i, risk in enumerate(original) if i not in matched_original
+        ],
+        "added": [
+            risk.get("title") for j, risk in enumerate(replayed) if j not in matched_replayed
+        ],
+    }
+
+
+def _total_tokens(response: Dict[str, Any]) -> Optional[int]:
+    usage = (response.get("metadata") or {}).get("token_usage")
+    return usage.get("total_tokens") if usage else None
+
+
+def compare(original: Dict[str, Any], replayed: Dict[str, Any]) -> Dict[str, Any]:
+    """Latency, token and risk-set differences of a replayed response"""
+    original_seconds = original.get("processing_time")
+    replayed_seconds = replayed.get("processing_time")
+    original_tokens = _total_tokens(original)
+    replayed_tokens = _total_tokens(replayed)
+    return {
+        "latency_seconds": [original_seconds, replayed_seconds],
+        "latency_delta_seconds": (
+            round(replayed_seconds - original_seconds, 3)
+            if original_seconds is not None and replayed_seconds is not None
+            else None
+        ),
+        "tokens": [original_tokens, replayed_tokens],
+        "token_delta": (
+            replayed_tokens - original_tokens
+            if original_tokens is not None and replayed_tokens is not None
+            else None
+        ),
+        "models": [
+            (original.get("metadata") or {}).get("model"),
+            (replayed.get("metadata") or {}).get("model"),
+        ],
+        "prompt_versions": [
+            (original.get("metadata") or {}).get("prompt_version"),
+            (replayed.get("metadata") or {}).get("prompt_version"),
+        ],
+        "risks": risk_overlap(
+            original.get("identified_risk", []), replayed.get("identified_risk", [])
+        ),
+    }
+
+
+async def replay(
+    records: List[Dict[str, Any]],
+    overrides: Dict[str, Any],
+    concurrency: int,
+) -> List[Dict[str, Any]]:
+    """Replay each record, returning one comparison per record in input order"""
+    from app.services.risk_analysis_engine import risk_analysis_engine
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def replay_one(record: Dict[str, Any]) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"record_id": record.get("record_id")}
+        async with semaphore:
+            _stub_response.set(record["response"])
+            with bind_request_context(RequestContext("replay", RequestPriority.BATCH)):
+                try:
+                    document_input = DocumentInput(**{**record["request"], **overrides})
+                    response = await risk_analysis_engine.analyze_document(document_input)
+                except Exception as e:
+                    logger.warning(f"Replay of {result['record_id']} failed: {e}")
+                    result.update(status="error", error=str(e))
+                    return result
+
+        result.update(
+            status="ok",
+            **compare(record["response"], response.model_dump(mode="json")),
+        )
+        return result
+
+    return await asyncio.gather(*(replay_one(record) for record in records))
+
+
+def _signed(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:+}"
+
+
+def summarize(results: List[Dict[str, Any]]) -> str:
+    ok = [result for result in results if result["status"] == "ok"]
+    if not ok:
+        return f"0/{len(results)} records replayed"
+
+    def median(values: List[Optional[float]]) -> str:
+        present = [value for value in values if value is not None]
+        return _signed(round(statistics.median(present), 3) if present else None)
+
+    return (
+        f"{len(ok)}/{len(results)} records replayed; median latency delta "
+        f"{median([r['latency_delta_seconds'] for r in ok])}s, median token delta "
+        f"{median([r['token_delta'] for r in ok])}, mean risk overlap "
+        f"{statistics.mean(r['risks']['overlap'] for r in ok):.2f}"
+    )
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Replay recorded analyze traffic and compare the results"
+    )
+    parser.add_argument("records", type=Path, help="Shadow recording JSONL")
+    parser.add_argument("--model", default=None, help="Model to replay with")
+    parser.add_argument(
+        "--system-prompt",
+        type=Path,
+        default=None,
+        help="File with the system prompt version to replay with",
+    )
+    parser.add_argument(
+        "--profile", default=None, help="Analysis profile (fast, standard, deep)"
+    )
+    parser.add_argument(
+        "--stub", action="store_true", help="Answer locally instead of calling the provider"
+    )
+    parser.add_argument(
+        "--stub-latency", type=float, default=0.0, help="Seconds each stub call takes"
+    )
+    parser.add_argument("--limit", type=int, default=None, help="Replay the first N records")
+    parser.add_argument("--concurrency", type=int, default=4, help="Replays in flight")
+    parser.add_argument(
+        "-o", "--output", type=Path, default=None, help="Write per-request results as JSONL"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=settings.LOG_LEVEL, format=settings.LOG_FORMAT)
+
+    # Replays must not be stored, reused, billed or recorded again
+    settings.ANALYSIS_HISTORY_ENABLED = False
+    settings.NEAR_DUPLICATE_ENABLED = False
+    settings.TOKEN_ACCOUNTING_ENABLED = False
+    settings.SHADOW_RECORDING_ENABLED = False
+
+    from app.services.openai_service import openai_service
+
+    if args.model:
+        openai_service.model = args.model
+    if args.system_prompt:
+        openai_service.system_prompt = args.system_prompt.read_text(encoding="utf-8")
+    if args.stub:
+        # The stub answers in the regular schema
+        openai_service.compact_output = False
+        openai_service.client = StubClient(args.stub_latency)
+
+    overrides: Dict[str, Any] = {}
+    if args.profile:
+        overrides["analysis_profile"] = args.profile
+
+    records = load_records(args.records, args.limit)
+    logger.info(
+        f"Replaying {len(records)} records with model {args.model or openai_service.model}, "
+        f"prompt {openai_service.prompt_version}"
+        + (f", profile {args.profile}" if args.profile else "")
+        + (" (stub)" if args.stub else "")
+    )
+
+    start = time.monotonic()
+    results = asyncio.run(replay(records, overrides, args.concurrency))
+    for result in results:
+        if result["status"] == "ok":
+            risks = result["risks"]
+            logger.info(
+                f"{result['record_id']}: latency {_signed(result['latency_delta_seconds'])}s, "
+                f"tokens {_signed(result['token_delta'])}, overlap {risks['overlap']:.2f} "
+                f"(+{len(risks['added'])}/-{len(risks['removed'])} risks)"
+            )
+
+    if args.output:
+        with args.output.open("w", encoding="utf-8") as handle:
+            for result in results:
+                handle.write(json.dumps(result) + "\n")
+
+    logger.info(f"{summarize(results)} in {time.monotonic() - start:.1f}s")
+    if any(result["status"] != "ok" for result in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
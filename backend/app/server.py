@@ -0,0 +1,218 @@
+"""
+Production server entry point.
+
+    python -m app.server [--host 0.0.0.0] [--port 8000] [--workers N]
+
+- Sizes the worker count from available CPUs and memory (SERVER_WORKERS overrides)
+- Uses uvloop and httptools when they are installed
+- Runs under gunicorn with a preloaded app when gunicorn is available,
+  otherwise under uvicorn's own process manager
+- On SIGTERM each worker stops accepting work and drains in-flight requests
+  and LLM calls for up to SERVER_DRAIN_TIMEOUT seconds
+"""
+
+import argparse
+import importlib.util
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+import uvicorn
+
+from app.config import settings
+from app.services.lifecycle_service import lifecycle_service
+
+logger = logging.getLogger(__name__)
+
+APP_IMPORT_STRING = "app.main:app"
+
+
+def available_cpus() -> int:
+    """CPUs this process may use, honouring affinity and cgroup quotas"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    # cgroup v2 quota, e.g. "200000 100000" for 2 CPUs
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+
+    return max(1, cpus)
+
+
+def available_memory_bytes() -> Optional[int]:
+    """Memory available to this process (cgroup limit or MemAvailable)"""
+    try:
+        limit = Path("/sys/fs/cgroup/memory.max").read_text().strip()
+        if limit != "max":
+            return int(limit)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        for line in Path("/proc/meminfo").read_text().splitlines():
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+
+    return None
+
+
+def compute_worker_count(cpus: int, memory_bytes: Optional[int]) -> int:
+    """Workers that fit both the CPU count and the memory budget"""
+    if settings.SERVER_WORKERS:
+        return settings.SERVER_WORKERS
+
+    workers = cpus * settings.SERVER_WORKERS_PER_CPU
+    if memory_bytes:
+        per_worker = settings.SERVER_WORKER_MEMORY_MB * 1024 * 1024
+        workers = min(workers, memory_bytes // per_worker)
+
+    return int(max(1, min(workers, settings.SERVER_MAX_WORKERS)))
+
+
+def select_loop() -> str:
+    """Prefer uvloop when installed (not available on Windows)"""
+    if sys.platform != "win32" and importlib.util.find_spec("uvloop"):
+        return "uvloop"
+    return "asyncio"
+
+
+def select_http() -> str:
+    """Prefer the httptools parser when installed"""
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that flips the app into draining mode on shutdown signals"""
+
+    def handle_exit(self, sig, frame) -> None:
+        lifecycle_service.start_draining()
+        super().handle_exit(sig, frame)
+
+
+def run_uvicorn(host: str, port: int, workers: int) -> None:
+    """Serve with uvicorn's process manager (no fork preloading)"""
+    config = uvicorn.Config(
+        APP_IMPORT_STRING,
+        host=host,
+        port=port,
+        workers=workers,
+        loop=select_loop(),
+        http=select_http(),
+        timeout_keep_alive=settings.SERVER_KEEPALIVE,
+        timeout_graceful_shutdown=settings.SERVER_DRAIN_TIMEOUT,
+        proxy_headers=True,
+        log_level=settings.LOG_LEVEL.lower(),
+    )
+    server = DrainingServer(config=config)
+
+    if workers > 1:
+        from uvicorn.supervisors import Multiprocess
+
+        sock = config.bind_socket()
+        Multiprocess(config, target=server.run, sockets=[sock]).run()
+    else:
+        server.run()
+
+
+def run_gunicorn(host: str, port: int, workers: int) -> None:
+    """Serve with gunicorn, preloading the app in the master before forking"""
+    from gunicorn.app.base import BaseApplication
+    from gunicorn.arbiter import Arbiter
+    from uvicorn_worker import UvicornWorker
+
+    class DrainingUvicornWorker(UvicornWorker):
+        CONFIG_KWARGS = {
+            "loop": select_loop(),
+            "http": select_http(),
+            "timeout_graceful_shutdown": settings.SERVER_DRAIN_TIMEOUT,
+        }
+
+        async def _serve(self) -> None:
+            self.config.app = self.wsgi
+            server = DrainingServer(config=self.config)
+            self._install_sigquit_handler()
+            await server.serve(sockets=self.sockets)
+            if not server.started:
+                sys.exit(Arbiter.WORKER_BOOT_ERROR)
+
+    class GunicornApplication(BaseApplication):
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self) -> None:
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+
+            return app
+
+    GunicornApplication(
+        {
+            "bind": f"{host}:{port}",
+            "workers": workers,
+            "worker_class": DrainingUvicornWorker,
+            "preload_app": True,
+            "keepalive": settings.SERVER_KEEPALIVE,
+            # Leave room for the drain deadline plus the provider timeout
+            "graceful_timeout": settings.SERVER_DRAIN_TIMEOUT + 5,
+            "timeout": settings.OPENAI_TIMEOUT + settings.SERVER_DRAIN_TIMEOUT,
+            "loglevel": settings.LOG_LEVEL.lower(),
+        }
+    ).run()
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the API in production mode")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument(
+        "--port", type=int, default=int(os.environ.get("PORT", settings.SERVER_PORT))
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--server",
+        choices=["auto", "gunicorn", "uvicorn"],
+        default="auto",
+        help="Process manager (auto uses gunicorn when installed)",
+    )
+    args = parser.parse_args(argv)
+
+    cpus = available_cpus()
+    memory_bytes = available_memory_bytes()
+    workers = args.workers or compute_worker_count(cpus, memory_bytes)
+
+    use_gunicorn = args.server == "gunicorn" or (
+        args.server == "auto"
+        and sys.platform != "win32"
+        and importlib.util.find_spec("gunicorn") is not None
+    )
+
+    logging.basicConfig(level=settings.LOG_LEVEL)
+    logger.info(
+        f"Starting {workers} worker(s) with {'gunicorn' if use_gunicorn else 'uvicorn'} "
+        f"(cpus={cpus}, memory={memory_bytes // (1024 * 1024) if memory_bytes else 'unknown'}MB, "
+        f"loop={select_loop()}, http={select_http()})"
+    )
+
+    if use_gunicorn:
+        run_gunicorn(args.host, args.port, workers)
+    else:
+        # Import once up front so configuration errors fail before workers spawn
+        importlib.import_module("app.main")
+        run_uvicorn(args.host, args.port, workers)
+
+
+if __name__ == "__main__":
+    main()
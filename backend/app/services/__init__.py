@@ -1,12 +1,89 @@
+from .lifecycle_service import (
+    LifecycleService,
+    ClientDisconnectedError,
+    lifecycle_service,
+)
 from .openai_service import OpenAIService, openai_service
+from .incremental_analysis_service import (
+    ContentDefinedChunker,
+    IncrementalAnalysisService,
+    incremental_analysis_service,
+)
 from .risk_analysis_engine import RiskAnalysisEngine, risk_analysis_engine
-from .file_processing_service import FileProcessorService, file_processing_service
+from .file_processing_service import (
+    ExtractedText,
+    FileProcessorService,
+    file_processing_service,
+)
+from .analysis_store import AnalysisStore, analysis_store
+from .metrics_service import MetricsService, metrics_service
+from .admission_service import (
+    AdmissionService,
+    AdmissionRejectedError,
+    admission_service,
+)
+from .near_duplicate_service import NearDuplicateService, near_duplicate_service
+from .response_parser import ModelResponseParser, response_parser
+from .analysis_profiles import resolve_analysis_config
+from .passage_selector import PassageSelector, passage_selector
+from .transcript_compactor import TranscriptCompactor, transcript_compactor
+from .usage_service import UsageService, TokenBudgetExceededError, usage_service
+from .fault_injection import FaultInjector, FaultPlan, fault_injector
+from .shadow_recorder import ShadowRecorder, shadow_recorder
+from .warmup_service import WarmupService, warmup_service
+from .profiling_service import ProfilingService, profiling_service
+from .memory_service import MemoryService, memory_service
+from .request_context import (
+    RequestContext,
+    bind_request_context,
+    current_request_context,
+)
 
 __all__ = [
+    "LifecycleService",
+    "ClientDisconnectedError",
+    "lifecycle_service",
     "OpenAIService",
     "openai_service",
+    "ContentDefinedChunker",
+    "IncrementalAnalysisService",
+    "incremental_analysis_service",
     "RiskAnalysisEngine",
     "risk_analysis_engine",
+    "ExtractedText",
     "FileProcessorService",
     "file_processing_service",
+    "AnalysisStore",
+    "analysis_store",
+    "MetricsService",
+    "metrics_service",
+    "AdmissionService",
+    "AdmissionRejectedError",
+    "admission_service",
+    "NearDuplicateService",
+    "near_duplicate_service",
+    "ModelResponseParser",
+    "response_parser",
+    "resolve_analysis_config",
+    "PassageSelector",
+    "passage_selector",
+    "TranscriptCompactor",
+    "transcript_compactor",
+    "UsageService",
+    "TokenBudgetExceededError",
+    "usage_service",
+    "FaultInjector",
+    "FaultPlan",
+    "fault_injector",
+    "ShadowRecorder",
+    "shadow_recorder",
+    "WarmupService",
+    "warmup_service",
+    "ProfilingService",
+    "profiling_service",
+    "MemoryService",
+    "memory_service",
+    "RequestContext",
+    "bind_request_context",
+    "current_request_context",
 ]
@@ -0,0 +1,229 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from loguru import logger
+
+from app.config import settings
+from app.services.metrics_service import metrics_service
+from app.services.request_context import RequestContext, current_request_context
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a bulkhead's queue is full"""
+
+    def __init__(self, bulkhead: str, retry_after: int):
+        self.bulkhead = bulkhead
+        self.retry_after = retry_after
+        super().__init__(
+            f"Server is at capacity for {bulkhead} work. Retry after {retry_after}s."
+        )
+
+
+class FairQueue:
+    """Weighted fair queue of slot waiters, one flow per (priority, tenant)
+
+    Each waiter gets a virtual finish tag of max(virtual clock, its flow's last
+    tag) + 1 / weight and the smallest tag is served next. A flow's weight is
+    its priority class weight times its tenant weight, so interactive calls
+    overtake a tenant's bulk backlog, other tenants keep their share, and
+    background work still advances instead of starving.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, asyncio.Future]] = []
+        self._flow_tags: Dict[Tuple[str, str], float] = {}
+        self._sequence = itertools.count()
+        self.virtual_time = 0.0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @staticmethod
+    def weight(context: RequestContext) -> float:
+        priority_weight = settings.PRIORITY_WEIGHTS.get(context.priority.value, 1.0)
+        tenant_weight = settings.API_KEY_WEIGHTS.get(context.tenant, 1.0)
+        return max(priority_weight * tenant_weight, 1e-6)
+
+    def push(self, waiter: asyncio.Future, context: RequestContext) -> None:
+        flow = (context.priority.value, context.tenant)
+        start = max(self.virtual_time, self._flow_tags.get(flow, 0.0))
+        tag = start + 1.0 / self.weight(context)
+        self._flow_tags[flow] = tag
+        heapq.heappush(self._heap, (tag, next(self._sequence), waiter))
+
+    def pop(self) -> Optional[asyncio.Future]:
+        """Next waiter to serve, advancing the virtual clock to its tag"""
+        if not self._heap:
+            return None
+        tag, _, waiter = heapq.heappop(self._heap)
+        self.virtual_time = tag
+        if not self._heap:
+            # Idle flows keep no credit or debt into the next busy period
+            self._flow_tags.clear()
+        return waiter
+
+    def remove(self, waiter: asyncio.Future) -> None:
+        for index, entry in enumerate(self._heap):
+            if entry[2] is waiter:
+                self._heap[index] = self._heap[-1]
+                self._heap.pop()
+                heapq.heapify(self._heap)
+                return
+
+
+class Bulkhead:
+    """Concurrency pool with a bounded wait queue and a service-time estimate"""
+
+    # Weight of the newest sample in the service-time moving average
+    EWMA_ALPHA = 0.2
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int,
+        max_queue: int,
+        initial_service_time: float,
+    ):
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.active = 0
+        self.service_time = initial_service_time
+        self._waiters = FairQueue()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until a new arrival could expect to get a slot"""
+        ahead = self.queued + 1
+        return max(1, math.ceil(ahead / self.max_concurrent * self.service_time))
+
+    def expected_seconds(self) -> float:
+        """Expected queue wait plus service time for a new arrival"""
+        wait = 0.0
+        if self.active >= self.max_concurrent:
+            wait = (self.queued + 1) / self.max_concurrent * self.service_time
+        return wait + self.service_time
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block, queueing if needed"""
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            self._record_wait(current_request_context(), 0.0)
+        else:
+            if self.queued >= self.max_queue:
+                retry_after = self.retry_after()
+                metrics_service.increment(f"admission.{self.name}.rejected")
+                logger.warning(
+                    f"Rejecting {self.name} work: {self.active} active, "
+                    f"{self.queued} queued, retry after {retry_after}s"
+                )
+                raise AdmissionRejectedError(self.name, retry_after)
+            await self._wait_for_slot()
+
+        metrics_service.increment(f"admission.{self.name}.admitted")
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            self.service_time += self.EWMA_ALPHA * (elapsed - self.service_time)
+            metrics_service.observe(f"admission.{self.name}.service_seconds", elapsed)
+            self._release()
+
+    async def _wait_for_slot(self) -> None:
+        """Queue in the request's fair-share flow until a holder hands its slot over"""
+        context = current_request_context()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.push(waiter, context)
+        queued_at = time.monotonic()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we were cancelled
+                self._release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+        finally:
+            self._record_wait(context, time.monotonic() - queued_at)
+
+    def _record_wait(self, context: RequestContext, waited: float) -> None:
+        """Add queue wait to the request's timing and the per-priority metrics"""
+        context.queue_wait_seconds += waited
+        metrics_service.observe(f"admission.{self.name}.queue_wait_seconds", waited)
+        metrics_service.observe(
+            f"admission.{self.name}.queue_wait_seconds.{context.priority.value}", waited
+        )
+
+    def _release(self) -> None:
+        """Hand the slot to the next waiter in fair-share order, or free it"""
+        while self._waiters:
+            waiter = self._waiters.pop()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "service_time_seconds": round(self.service_time, 3),
+            "retry_after_seconds": self.retry_after(),
+        }
+
+
+class AdmissionService:
+    """Separate bulkheads for CPU-bound extraction and IO-bound LLM calls"""
+
+    def __init__(self):
+        self.extraction = Bulkhead(
+            "extraction",
+            max_concurrent=settings.EXTRACTION_MAX_CONCURRENCY,
+            max_queue=settings.EXTRACTION_MAX_QUEUE,
+            initial_service_time=1.0,
+        )
+        self.llm = Bulkhead(
+            "llm",
+            max_concurrent=settings.LLM_MAX_CONCURRENCY,
+            max_queue=settings.LLM_MAX_QUEUE,
+            initial_service_time=float(settings.OPENAI_TIMEOUT) / 4,
+        )
+
+    @asynccontextmanager
+    async def _bulkhead(self, bulkhead: Bulkhead) -> AsyncIterator[None]:
+        if not settings.ADMISSION_CONTROL_ENABLED:
+            yield
+            return
+        async with bulkhead.acquire():
+            yield
+
+    def extraction_slot(self):
+        """Slot in the extraction bulkhead (no-op when admission control is off)"""
+        return self._bulkhead(self.extraction)
+
+    def llm_slot(self):
+        """Slot in the LLM bulkhead (no-op when admission control is off)"""
+        return self._bulkhead(self.llm)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.ADMISSION_CONTROL_ENABLED,
+            "extraction": self.extraction.get_stats(),
+            "llm": self.llm.get_stats(),
+        }
+
+
+# Global admission instance
+admission_service = AdmissionService()
@@ -0,0 +1,73 @@
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.models import AnalysisConfig, AnalysisProfile, DocumentInput
+
+
+# Settings each named profile applies on top of the configured defaults
+PROFILE_OVERRIDES: Dict[AnalysisProfile, Dict[str, Any]] = {
+    # Quick triage: a handful of significant risks in one call, no mitigation or quotes
+    AnalysisProfile.FAST: {
+        "max_risks": 3,
+        "min_risk_score": 5.0,
+        "include_evidence": False,
+        "detailed_mitigation": False,
+        "detail_level": "brief",
+        "category_sharding": False,
+    },
+    AnalysisProfile.STANDARD: {},
+    AnalysisProfile.DEEP: {
+        "max_risks": 20,
+        "min_risk_score": 2.0,
+        "include_evidence": True,
+        "detailed_mitigation": True,
+        "detail_level": "detailed",
+    },
+}
+
+# Continuations cost a full extra round trip, which triage cannot afford
+PROFILE_MAX_CONTINUATIONS = {AnalysisProfile.FAST: 0}
+
+
+def resolve_profile(document_input: DocumentInput) -> AnalysisProfile:
+    """Profile a request runs with (standard when none is given)"""
+    return document_input.analysis_profile or AnalysisProfile.STANDARD
+
+
+def resolve_analysis_config(document_input: DocumentInput) -> AnalysisConfig:
+    """Effective configuration: settings defaults, then the profile, then request fields"""
+    values: Dict[str, Any] = {
+        "max_risks": min(settings.DEFAULT_MAX_RISKS, 20),
+        "min_risk_score": settings.DEFAULT_MIN_RISK_SCORE,
+        "include_evidence": True,
+        "detailed_mitigation": True,
+        "detail_level": settings.ANALYSIS_DETAIL_LEVEL,
+        "category_sharding": settings.CATEGORY_SHARDING_ENABLED,
+    }
+    values.update(PROFILE_OVERRIDES[resolve_profile(document_input)])
+
+    # Only fields the client actually sent override the profile
+    if document_input.analysis_config is not None:
+        values.update(
+            document_input.analysis_config.model_dump(
+                include=document_input.analysis_config.model_fields_set
+            )
+        )
+
+    return AnalysisConfig(**values)
+
+
+def resolve_profile_model(document_input: DocumentInput) -> Optional[str]:
+    """Model configured for a request's profile, if it has its own"""
+    profile_models: Dict[AnalysisProfile, Optional[str]] = {
+        AnalysisProfile.FAST: settings.FAST_PROFILE_MODEL,
+        AnalysisProfile.DEEP: settings.DEEP_PROFILE_MODEL,
+    }
+    return profile_models.get(resolve_profile(document_input))
+
+
+def resolve_max_continuations(document_input: DocumentInput) -> int:
+    """Continuation requests allowed for a request's profile"""
+    return PROFILE_MAX_CONTINUATIONS.get(
+        resolve_profile(document_input), settings.MAX_CONTINUATIONS
+    )
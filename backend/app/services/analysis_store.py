@@ -0,0 +1,690 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+
+from app.config import settings
+from app.models import (
+    DocumentInput,
+    RiskAnalysisResponse,
+    AnalysisMetadata,
+    DocumentAnalysis,
+    IdentifiedRisk,
+    RiskSummary,
+    RiskDistribution,
+    AnalysisHistoryItem,
+    StoredRiskItem,
+    TokenUsage,
+    TokenUsageAggregate,
+)
+from app.services.analysis_profiles import resolve_analysis_config
+
+
+SCHEMA_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS analyses (
+        analysis_id TEXT PRIMARY KEY,
+        document_type TEXT NOT NULL,
+        industry TEXT,
+        industry_key TEXT,
+        company_scale TEXT NOT NULL,
+        analysis_timestamp TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        document_length INTEGER NOT NULL,
+        total_risks INTEGER NOT NULL,
+        overall_risk_score REAL NOT NULL,
+        processing_time REAL,
+        risk_distribution TEXT NOT NULL,
+        top_categories TEXT NOT NULL,
+        key_concerns TEXT NOT NULL,
+        faults_injected INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS risks (
+        analysis_id TEXT NOT NULL REFERENCES analyses(analysis_id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        risk_id TEXT NOT NULL,
+        title TEXT NOT NULL,
+        description TEXT NOT NULL,
+        category TEXT NOT NULL,
+        severity TEXT NOT NULL,
+        probability TEXT NOT NULL,
+        risk_score REAL NOT NULL,
+        impact_areas TEXT NOT NULL,
+        mitigation_recommendations TEXT NOT NULL,
+        context_evidence TEXT,
+        PRIMARY KEY (analysis_id, position)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS chunk_findings (
+        cache_key TEXT PRIMARY KEY,
+        findings TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_used_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS document_fingerprints (
+        analysis_id TEXT PRIMARY KEY REFERENCES analyses(analysis_id) ON DELETE CASCADE,
+        context_key TEXT NOT NULL,
+        simhash INTEGER NOT NULL,
+        band0 INTEGER NOT NULL,
+        band1 INTEGER NOT NULL,
+        band2 INTEGER NOT NULL,
+        band3 INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS token_usage (
+        request_id TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        api_key TEXT NOT NULL,
+        model TEXT NOT NULL,
+        document_type TEXT NOT NULL,
+        analysis_id TEXT,
+        calls INTEGER NOT NULL,
+        prompt_tokens INTEGER NOT NULL,
+        completion_tokens INTEGER NOT NULL,
+        cached_tokens INTEGER NOT NULL,
+        PRIMARY KEY (request_id, model)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_analyses_created ON analyses(created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_analyses_industry ON analyses(industry_key, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_analyses_scale ON analyses(company_scale, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_analyses_doctype ON analyses(document_type, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_risks_category ON risks(category, severity)",
+    "CREATE INDEX IF NOT EXISTS idx_risks_severity ON risks(severity)",
+    "CREATE INDEX IF NOT EXISTS idx_fingerprints_band0 ON document_fingerprints(context_key, band0)",
+    "CREATE INDEX IF NOT EXISTS idx_fingerprints_band1 ON document_fingerprints(context_key, band1)",
+    "CREATE INDEX IF NOT EXISTS idx_fingerprints_band2 ON document_fingerprints(context_key, band2)",
+    "CREATE INDEX IF NOT EXISTS idx_fingerprints_band3 ON document_fingerprints(context_key, band3)",
+    "CREATE INDEX IF NOT EXISTS idx_token_usage_key ON token_usage(api_key, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_token_usage_created ON token_usage(created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_chunk_findings_used ON chunk_findings(last_used_at)",
+]
+
+# Columns added after a table was first released: (table, column, definition)
+ADDED_COLUMNS = [
+    ("analyses", "faults_injected", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+# Columns a token usage report may be grouped by
+TOKEN_USAGE_DIMENSIONS = ("api_key", "model", "document_type")
+
+# A 64-bit fingerprint is split into 4 bands of 16 bits. Fingerprints within
+# 3 differing bits always share at least one band, so band lookups are exact
+# up to that distance; wider thresholds fall back to a scan of the context.
+FINGERPRINT_BANDS = 4
+FINGERPRINT_BAND_BITS = 16
+
+# Least often the chunk cache is pruned on write
+CHUNK_CACHE_PRUNE_INTERVAL_SECONDS = 300
+
+
+class AnalysisStore:
+    """SQLite-backed persistence for completed risk analyses"""
+
+    def __init__(self, database_url: Optional[str] = None):
+        self.database_url = database_url or settings.DATABASE_URL
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._chunks_pruned_at = 0.0
+
+    @staticmethod
+    def _resolve_sqlite_path(database_url: str) -> str:
+        """Turn a sqlite:/// URL into a filesystem path sqlite3 can open"""
+        prefix = "sqlite:///"
+        if not database_url.startswith(prefix):
+            raise ValueError(
+                f"Unsupported DATABASE_URL '{database_url}'. Only sqlite:/// URLs are supported"
+            )
+
+        path = database_url[len(prefix):]
+        if path in ("", ":memory:"):
+            return ":memory:"
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database lazily and make sure the schema exists"""
+        if self._connection is None:
+            path = self._resolve_sqlite_path(self.database_url)
+            connection = sqlite3.connect(path, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA foreign_keys = ON")
+            if path != ":memory:":
+                connection.execute("PRAGMA journal_mode = WAL")
+                connection.execute("PRAGMA synchronous = NORMAL")
+            for statement in SCHEMA_STATEMENTS:
+                connection.execute(statement)
+            for table, column, definition in ADDED_COLUMNS:
+                existing = {
+                    row["name"]
+                    for row in connection.execute(f"PRAGMA table_info({table})")
+                }
+                if column not in existing:
+                    connection.execute(
+                        f"ALTER TABLE {table} ADD COLUMN {column} {definition}"
+                    )
+            connection.commit()
+            self._connection = connection
+            logger.info(f"Analysis store ready at {self.database_url}")
+        return self._connection
+
+    def close(self) -> None:
+        """Close the underlying connection"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def save_analysis(self, response: RiskAnalysisResponse) -> str:
+        """Persist an analysis and its risks, return the analysis id"""
+        analysis_id = response.analysis_id or uuid.uuid4().hex
+        document = response.document_analysis
+        summary = response.risk_summary
+
+        analysis_row = (
+            analysis_id,
+            document.document_type.value,
+            document.industry,
+            self._industry_key(document.industry),
+            document.company_scale.value,
+            document.analysis_timestamp.isoformat(),
+            document.analysis_timestamp.timestamp(),
+            document.document_length,
+            summary.total_risks,
+            summary.overall_risk_score,
+            response.processing_time,
+            json.dumps(summary.risk_distribution.model_dump()),
+            json.dumps(summary.top_categories),
+            json.dumps(summary.key_concerns),
+            int(response.metadata.faults_injected),
+        )
+        risk_rows = [
+            (
+                analysis_id,
+                position,
+                risk.risk_id,
+                risk.title,
+                risk.description,
+                risk.category.value,
+                risk.severity.value,
+                risk.probability.value,
+                risk.risk_score,
+                json.dumps(risk.impact_areas),
+                json.dumps(risk.mitigation_recommendations),
+                risk.context_evidence,
+            )
+            for position, risk in enumerate(response.identified_risk)
+        ]
+
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    analysis_row,
+                )
+                connection.execute(
+                    "DELETE FROM risks WHERE analysis_id = ?", (analysis_id,)
+                )
+                connection.executemany(
+                    "INSERT INTO risks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    risk_rows,
+                )
+
+        return analysis_id
+
+    def get_analysis(self, analysis_id: str) -> Optional[RiskAnalysisResponse]:
+        """Rebuild a full analysis response from its stored rows"""
+        with self._lock:
+            connection = self._connect()
+            analysis = connection.execute(
+                "SELECT * FROM analyses WHERE analysis_id = ?", (analysis_id,)
+            ).fetchone()
+            if analysis is None:
+                return None
+            risks = connection.execute(
+                "SELECT * FROM risks WHERE analysis_id = ? ORDER BY position",
+                (analysis_id,),
+            ).fetchall()
+
+        return RiskAnalysisResponse(
+            analysis_id=analysis["analysis_id"],
+            document_analysis=DocumentAnalysis(
+                document_type=analysis["document_type"],
+                industry=analysis["industry"],
+                company_scale=analysis["company_scale"],
+                analysis_timestamp=datetime.fromisoformat(
+                    analysis["analysis_timestamp"]
+                ),
+                document_length=analysis["document_length"],
+            ),
+            identified_risk=[self._row_to_risk(row) for row in risks],
+            risk_summary=RiskSummary(
+                total_risks=analysis["total_risks"],
+                risk_distribution=RiskDistribution(
+                    **json.loads(analysis["risk_distribution"])
+                ),
+                top_categories=json.loads(analysis["top_categories"]),
+                overall_risk_score=analysis["overall_risk_score"],
+                key_concerns=json.loads(analysis["key_concerns"]),
+            ),
+            processing_time=analysis["processing_time"],
+            metadata=AnalysisMetadata(faults_injected=bool(analysis["faults_injected"])),
+        )
+
+    def list_analyses(
+        self,
+        industry: Optional[str] = None,
+        company_scale: Optional[str] = None,
+        document_type: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> Tuple[List[AnalysisHistoryItem], int]:
+        """List stored analyses newest first, return (items, total)"""
+        where, params = self._analysis_filters(
+            "", industry, company_scale, document_type, since, until
+        )
+
+        with self._lock:
+            connection = self._connect()
+            total = connection.execute(
+                f"SELECT COUNT(*) FROM analyses {where}", params
+            ).fetchone()[0]
+            rows = connection.execute(
+                f"SELECT * FROM analyses {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                params + [page_size, (page - 1) * page_size],
+            ).fetchall()
+
+        items = [
+            AnalysisHistoryItem(
+                analysis_id=row["analysis_id"],
+                document_type=row["document_type"],
+                industry=row["industry"],
+                company_scale=row["company_scale"],
+                analysis_timestamp=datetime.fromisoformat(row["analysis_timestamp"]),
+                document_length=row["document_length"],
+                total_risks=row["total_risks"],
+                overall_risk_score=row["overall_risk_score"],
+                processing_time=row["processing_time"],
+                faults_injected=bool(row["faults_injected"]),
+            )
+            for row in rows
+        ]
+        return items, total
+
+    def list_risks(
+        self,
+        category: Optional[str] = None,
+        severity: Optional[str] = None,
+        industry: Optional[str] = None,
+        company_scale: Optional[str] = None,
+        document_type: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        min_risk_score: Optional[float] = None,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> Tuple[List[StoredRiskItem], int]:
+        """List stored risks across analyses newest first, return (items, total)"""
+        where, params = self._analysis_filters(
+            "a.", industry, company_scale, document_type, since, until
+        )
+        clauses = [where[len("WHERE "):]] if where else []
+        if category:
+            clauses.append("r.category = ?")
+            params.append(category)
+        if severity:
+            clauses.append("r.severity = ?")
+            params.append(severity)
+        if min_risk_score is not None:
+            clauses.append("r.risk_score >= ?")
+            params.append(min_risk_score)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        joined = "FROM risks r JOIN analyses a ON a.analysis_id = r.analysis_id"
+
+        with self._lock:
+            connection = self._connect()
+            total = connection.execute(
+                f"SELECT COUNT(*) {joined} {where}", params
+            ).fetchone()[0]
+            rows = connection.execute(
+                f"SELECT r.*, a.analysis_timestamp, a.document_type, a.industry, a.company_scale "
+                f"{joined} {where} ORDER BY a.created_at DESC, r.position LIMIT ? OFFSET ?",
+                params + [page_size, (page - 1) * page_size],
+            ).fetchall()
+
+        items = [
+            StoredRiskItem(
+                analysis_id=row["analysis_id"],
+                analysis_timestamp=datetime.fromisoformat(row["analysis_timestamp"]),
+                document_type=row["document_type"],
+                industry=row["industry"],
+                company_scale=row["company_scale"],
+                risk=self._row_to_risk(row),
+            )
+            for row in rows
+        ]
+        return items, total
+
+    def _analysis_filters(
+        self,
+        alias: str,
+        industry: Optional[str],
+        company_scale: Optional[str],
+        document_type: Optional[str],
+        since: Optional[datetime],
+        until: Optional[datetime],
+    ) -> Tuple[str, List[Any]]:
+        """Build the WHERE clause for the indexed analysis columns"""
+        clauses: List[str] = []
+        params: List[Any] = []
+
+        if industry:
+            clauses.append(f"{alias}industry_key = ?")
+            params.append(self._industry_key(industry))
+        if company_scale:
+            clauses.append(f"{alias}company_scale = ?")
+            params.append(company_scale)
+        if document_type:
+            clauses.append(f"{alias}document_type = ?")
+            params.append(document_type)
+        if since:
+            clauses.append(f"{alias}created_at >= ?")
+            params.append(since.timestamp())
+        if until:
+            clauses.append(f"{alias}created_at < ?")
+            params.append(until.timestamp())
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    @staticmethod
+    def _industry_key(industry: Optional[str]) -> Optional[str]:
+        """Normalize industry names so filters are case-insensitive"""
+        return industry.strip().lower() if industry else None
+
+    @staticmethod
+    def _row_to_risk(row: sqlite3.Row) -> IdentifiedRisk:
+        """Convert a risks row back into an IdentifiedRisk"""
+        return IdentifiedRisk(
+            risk_id=row["risk_id"],
+            title=row["title"],
+            description=row["description"],
+            category=row["category"],
+            severity=row["severity"],
+            probability=row["probability"],
+            risk_score=row["risk_score"],
+            impact_areas=json.loads(row["impact_areas"]),
+            mitigation_recommendations=json.loads(row["mitigation_recommendations"]),
+            context_evidence=row["context_evidence"],
+        )
+
+    def get_chunk_findings(self, cache_keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get cached per-chunk model findings for the given keys"""
+        if not cache_keys:
+            return {}
+
+        placeholders = ", ".join("?" for _ in cache_keys)
+        with self._lock:
+            connection = self._connect()
+            rows = connection.execute(
+                f"SELECT cache_key, findings FROM chunk_findings WHERE cache_key IN ({placeholders})"
+                " AND last_used_at >= ?",
+                [*cache_keys, self._chunk_cutoff()],
+            ).fetchall()
+            if rows:
+                with connection:
+                    connection.executemany(
+                        "UPDATE chunk_findings SET last_used_at = ? WHERE cache_key = ?",
+                        [(time.time(), row["cache_key"]) for row in rows],
+                    )
+
+        return {row["cache_key"]: json.loads(row["findings"]) for row in rows}
+
+    def save_chunk_findings(self, cache_key: str, findings: Dict[str, Any]) -> None:
+        """Cache the model findings for a single chunk"""
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO chunk_findings VALUES (?, ?, ?, ?)",
+                    (cache_key, json.dumps(findings), now, now),
+                )
+            if now - self._chunks_pruned_at >= CHUNK_CACHE_PRUNE_INTERVAL_SECONDS:
+                self._chunks_pruned_at = now
+                self.prune_chunk_findings()
+
+    @staticmethod
+    def _chunk_cutoff() -> float:
+        """Cached chunks last used before this time are expired"""
+        if settings.CHUNK_CACHE_TTL_HOURS <= 0:
+            return 0.0
+        return time.time() - settings.CHUNK_CACHE_TTL_HOURS * 3600
+
+    def prune_chunk_findings(self) -> int:
+        """Drop expired cached chunks, then the least recently used over the limit"""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                removed = connection.execute(
+                    "DELETE FROM chunk_findings WHERE last_used_at < ?",
+                    (self._chunk_cutoff(),),
+                ).rowcount
+                if settings.CHUNK_CACHE_MAX_ENTRIES > 0:
+                    removed += connection.execute(
+                        """
+                        DELETE FROM chunk_findings WHERE cache_key IN (
+                            SELECT cache_key FROM chunk_findings
+                            ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+                        )
+                        """,
+                        (settings.CHUNK_CACHE_MAX_ENTRIES,),
+                    ).rowcount
+        if removed:
+            logger.info(f"Pruned {removed} cached chunk findings")
+        return removed
+
+    @staticmethod
+    def context_key(document_input: DocumentInput, model: str) -> str:
+        """Key for the analysis context that makes findings comparable"""
+        return json.dumps(
+            [
+                model,
+                document_input.document_type.value,
+                (document_input.industry or "").strip().lower(),
+                document_input.company_scale.value
+                if document_input.company_scale
+                else None,
+                (document_input.analysis_focus or "").strip().lower(),
+                resolve_analysis_config(document_input).model_dump(mode="json"),
+            ]
+        )
+
+    @staticmethod
+    def _fingerprint_bands(fingerprint: int) -> List[int]:
+        """Split a fingerprint into its lookup bands"""
+        mask = (1 << FINGERPRINT_BAND_BITS) - 1
+        return [
+            (fingerprint >> (band * FINGERPRINT_BAND_BITS)) & mask
+            for band in range(FINGERPRINT_BANDS)
+        ]
+
+    @staticmethod
+    def _to_signed(value: int) -> int:
+        """SQLite integers are signed 64-bit"""
+        return value - (1 << 64) if value >= (1 << 63) else value
+
+    @staticmethod
+    def _to_unsigned(value: int) -> int:
+        return value + (1 << 64) if value < 0 else value
+
+    def save_fingerprint(
+        self, analysis_id: str, context_key: str, fingerprint: int
+    ) -> None:
+        """Index the fingerprint of an analyzed document"""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO document_fingerprints VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        analysis_id,
+                        context_key,
+                        self._to_signed(fingerprint),
+                        *self._fingerprint_bands(fingerprint),
+                    ),
+                )
+
+    def find_fingerprint_candidates(
+        self, context_key: str, fingerprint: int, max_distance: int
+    ) -> List[Tuple[str, int]]:
+        """Get (analysis_id, fingerprint) pairs that may be within max_distance bits"""
+        if max_distance < FINGERPRINT_BANDS:
+            bands = self._fingerprint_bands(fingerprint)
+            query = " UNION ".join(
+                f"SELECT analysis_id, simhash FROM document_fingerprints "
+                f"WHERE context_key = ? AND band{band} = ?"
+                for band in range(FINGERPRINT_BANDS)
+            )
+            params: List[Any] = []
+            for band, value in enumerate(bands):
+                params.extend([context_key, value])
+        else:
+            query = "SELECT analysis_id, simhash FROM document_fingerprints WHERE context_key = ?"
+            params = [context_key]
+
+        with self._lock:
+            connection = self._connect()
+            rows = connection.execute(query, params).fetchall()
+
+        return [(row["analysis_id"], self._to_unsigned(row["simhash"])) for row in rows]
+
+    def save_token_usage(
+        self,
+        api_key: str,
+        document_type: str,
+        usage_by_model: Dict[str, TokenUsage],
+        analysis_id: Optional[str] = None,
+    ) -> None:
+        """Record one request's token usage, one row per model it called"""
+        request_id = uuid.uuid4().hex
+        created_at = time.time()
+        rows = [
+            (
+                request_id,
+                created_at,
+                api_key,
+                model,
+                document_type,
+                analysis_id,
+                usage.calls,
+                usage.prompt_tokens,
+                usage.completion_tokens,
+                usage.cached_tokens,
+            )
+            for model, usage in usage_by_model.items()
+        ]
+
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    "INSERT INTO token_usage VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+                )
+
+    def get_token_total(self, api_key: str, since: float) -> int:
+        """Prompt plus completion tokens an API key used since a timestamp"""
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT COALESCE(SUM(prompt_tokens + completion_tokens), 0) "
+                "FROM token_usage WHERE api_key = ? AND created_at >= ?",
+                (api_key, since),
+            ).fetchone()
+        return int(row[0])
+
+    def summarize_token_usage(
+        self,
+        group_by: List[str],
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        api_key: Optional[str] = None,
+    ) -> List[TokenUsageAggregate]:
+        """Token totals grouped by any of api_key, model and document_type
+
+        api_key limits the totals to a single tenant.
+        """
+        columns = [column for column in group_by if column in TOKEN_USAGE_DIMENSIONS]
+        clauses, params = [], []
+        if api_key is not None:
+            clauses.append("api_key = ?")
+            params.append(api_key)
+        if since:
+            clauses.append("created_at >= ?")
+            params.append(since.timestamp())
+        if until:
+            clauses.append("created_at < ?")
+            params.append(until.timestamp())
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        select = "".join(f"{column}, " for column in columns)
+        group = f"GROUP BY {', '.join(columns)}" if columns else ""
+
+        with self._lock:
+            connection = self._connect()
+            rows = connection.execute(
+                f"SELECT {select}COUNT(DISTINCT request_id) AS analyses, "
+                f"SUM(calls) AS calls, SUM(prompt_tokens) AS prompt_tokens, "
+                f"SUM(completion_tokens) AS completion_tokens, "
+                f"SUM(cached_tokens) AS cached_tokens "
+                f"FROM token_usage {where} {group} "
+                f"ORDER BY SUM(prompt_tokens + completion_tokens) DESC",
+                params,
+            ).fetchall()
+
+        return [
+            TokenUsageAggregate(
+                **{column: row[column] for column in columns},
+                analyses=row["analyses"],
+                calls=row["calls"] or 0,
+                prompt_tokens=row["prompt_tokens"] or 0,
+                completion_tokens=row["completion_tokens"] or 0,
+                cached_tokens=row["cached_tokens"] or 0,
+                total_tokens=(row["prompt_tokens"] or 0) + (row["completion_tokens"] or 0),
+            )
+            for row in rows
+            if row["analyses"]
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get simple counts about the stored history"""
+        with self._lock:
+            connection = self._connect()
+            analyses = connection.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+            risks = connection.execute("SELECT COUNT(*) FROM risks").fetchone()[0]
+            chunks = connection.execute(
+                "SELECT COUNT(*) FROM chunk_findings"
+            ).fetchone()[0]
+        return {
+            "stored_analyses": analyses,
+            "stored_risks": risks,
+            "cached_chunks": chunks,
+        }
+
+
+# Global store instance
+analysis_store = AnalysisStore()
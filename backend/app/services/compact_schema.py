@@ -0,0 +1,98 @@
+from typing import Any, Dict, List, Optional, Sequence
+from loguru import logger
+
+
+# Positions of the fields in a compact risk row
+COMPACT_RISK_FIELDS = [
+    "title",
+    "description",
+    "category",
+    "severity",
+    "probability",
+    "risk_score",
+    "impact_areas",
+    "mitigation_recommendations",
+    "context_evidence",
+]
+
+CATEGORY_CODES = {
+    "m": "market",
+    "o": "operational",
+    "f": "financial",
+    "r": "regulatory",
+    "s": "strategic",
+    "t": "technology",
+    "l": "legal",
+}
+
+SEVERITY_CODES = {"l": "low", "m": "medium", "h": "high", "c": "critical"}
+
+PROBABILITY_CODES = {"l": "low", "m": "medium", "h": "high"}
+
+COMPACT_RESPONSE_FORMAT = """RESPONSE FORMAT (compact):
+{{
+    "r": [
+        ["Concise Risk Title", "Detailed risk description with context", "{example_category}", "h", "m", 7.5, ["specific area 1"], ["specific action 1"], "Direct quote from document"]
+    ],
+    "k": ["primary concern 1", "primary concern 2"],
+    "i": "Industry-specific risk considerations"
+}}
+
+Each entry of "r" is one risk as an array of exactly 9 elements in this order:
+title, description, category, severity, probability, risk_score, impact_areas, mitigation_recommendations, context_evidence
+- category: {category_codes}
+- severity: l=low, m=medium, h=high, c=critical
+- probability: l=low, m=medium, h=high
+"k" holds the key concerns and "i" the industry insights."""
+
+
+def compact_response_format(categories: Optional[Sequence[str]] = None) -> str:
+    """The compact schema, offering only the given category values when set"""
+    codes = [
+        (code, value)
+        for code, value in CATEGORY_CODES.items()
+        if not categories or value in categories
+    ]
+    return COMPACT_RESPONSE_FORMAT.format(
+        example_category="f" if not categories else codes[0][0],
+        category_codes=", ".join(f"{code}={value}" for code, value in codes),
+    )
+
+
+def is_compact_response(data: Dict[str, Any]) -> bool:
+    """Whether a parsed response uses the compact wire schema"""
+    return "identified_risks" not in data and isinstance(data.get("r"), list)
+
+
+def expand_compact_response(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Expand a compact response into the regular identified_risks shape
+
+    Rows with the wrong number of elements (e.g. the tail of a truncated
+    response) are dropped rather than guessed at.
+    """
+    identified_risks: List[Dict[str, Any]] = []
+
+    for index, row in enumerate(data.get("r", [])):
+        if not isinstance(row, list) or len(row) != len(COMPACT_RISK_FIELDS):
+            logger.warning(f"Dropping malformed compact risk row {index + 1}")
+            continue
+
+        risk = dict(zip(COMPACT_RISK_FIELDS, row))
+        risk["risk_id"] = f"RISK_{len(identified_risks) + 1:03d}"
+        risk["category"] = _expand_code(CATEGORY_CODES, risk["category"])
+        risk["severity"] = _expand_code(SEVERITY_CODES, risk["severity"])
+        risk["probability"] = _expand_code(PROBABILITY_CODES, risk["probability"])
+        identified_risks.append(risk)
+
+    return {
+        "identified_risks": identified_risks,
+        "key_concerns": data.get("k", []),
+        "industry_insights": data.get("i", ""),
+    }
+
+
+def _expand_code(codes: Dict[str, str], value: Any) -> Any:
+    """Map an enum code to its full value, passing full values through"""
+    if isinstance(value, str):
+        return codes.get(value.strip().lower(), value)
+    return value
@@ -0,0 +1,259 @@
+import asyncio
+import json
+import random
+import types
+from typing import Any, Dict, List, NamedTuple, Optional
+from loguru import logger
+
+from app.config import settings
+from app.services.metrics_service import metrics_service
+from app.services.request_context import RequestContext, current_request_context
+
+FAULT_KINDS = ("latency", "error", "truncate", "invalid_risks")
+
+# Share of the content kept by a truncate fault without a value
+DEFAULT_TRUNCATE_FRACTION = 0.5
+
+# (field, value) changes that break the risk schema; None removes the field
+SCHEMA_VIOLATIONS = [
+    ("severity", "catastrophic"),
+    ("category", "unknown"),
+    ("risk_score", "very high"),
+    ("probability", None),
+    ("title", None),
+    ("impact_areas", "everything"),
+]
+
+
+def _number(text: str, what: str) -> float:
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(f"{what} must be a number, got '{text}'") from None
+
+
+class Fault(NamedTuple):
+    kind: str
+    value: Optional[str]
+    rate: float
+
+
+class FaultPlan:
+    """Faults to inject into a request's provider calls
+
+    Parsed from a spec such as "latency=2.5@0.5,error=503@0.2,truncate=0.4,
+    invalid_risks,seed=7": comma-separated faults, each optionally with a value
+    and an @rate (default 1). With a seed, the same calls get the same faults
+    on every run.
+    """
+
+    def __init__(self, faults: List[Fault], seed: Optional[int] = None):
+        self.faults = faults
+        self.random = random.Random(seed)
+
+    @classmethod
+    def parse(cls, spec: str) -> "FaultPlan":
+        """Parse a fault spec, raising ValueError on anything it does not understand"""
+        faults: List[Fault] = []
+        seed = None
+        for item in spec.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            item, _, rate_text = item.partition("@")
+            kind, _, value = item.partition("=")
+            kind, value = kind.strip().lower(), value.strip()
+
+            if kind == "seed":
+                seed = int(_number(value, "seed"))
+                continue
+            if kind not in FAULT_KINDS:
+                raise ValueError(
+                    f"Unknown fault '{kind}'; expected one of: {', '.join(FAULT_KINDS)}"
+                )
+
+            rate = _number(rate_text, "Fault rate") if rate_text else 1.0
+            if not 0.0 <= rate <= 1.0:
+                raise ValueError(f"Fault rate must be between 0 and 1, got {rate}")
+            if kind == "latency" and _number(value or "0", "latency") <= 0:
+                raise ValueError("latency needs a number of seconds, e.g. latency=2.5")
+            if kind == "error" and value != "timeout" and not (
+                400 <= _number(value or "0", "error") <= 599
+            ):
+                raise ValueError("error needs an HTTP status (400-599) or 'timeout'")
+            if kind == "truncate" and value and not (
+                0.0 < _number(value, "truncate") < 1.0
+            ):
+                raise ValueError("truncate takes the share of content to keep, e.g. 0.4")
+
+            faults.append(Fault(kind, value or None, rate))
+        return cls(faults, seed)
+
+    def draw(self) -> Dict[str, Fault]:
+        """Faults that fire for one provider call"""
+        return {
+            fault.kind: fault for fault in self.faults if self.random.random() < fault.rate
+        }
+
+
+def _provider_error(status: str) -> Exception:
+    """The exception the OpenAI client raises for an HTTP status or a timeout"""
+    import httpx
+    import openai
+
+    request = httpx.Request("POST", "https://fault-injection.invalid/chat/completions")
+    if status == "timeout":
+        return openai.APITimeoutError(request=request)
+
+    code = int(float(status))
+    error_classes = {
+        400: openai.BadRequestError,
+        401: openai.AuthenticationError,
+        403: openai.PermissionDeniedError,
+        404: openai.NotFoundError,
+        409: openai.ConflictError,
+        422: openai.UnprocessableEntityError,
+        429: openai.RateLimitError,
+    }
+    error_class = error_classes.get(
+        code, openai.InternalServerError if code >= 500 else openai.APIStatusError
+    )
+    return error_class(
+        f"Injected HTTP {code}",
+        response=httpx.Response(code, request=request),
+        body=None,
+    )
+
+
+class _FaultInjectingCompletions:
+    def __init__(self, completions: Any, injector: "FaultInjector"):
+        self._completions = completions
+        self._injector = injector
+
+    async def create(self, **kwargs) -> Any:
+        return await self._injector.create(self._completions, **kwargs)
+
+
+class FaultInjectingClient:
+    """Provider client wrapper that applies the current request's fault plan"""
+
+    def __init__(self, client: Any, injector: "FaultInjector"):
+        self._client = client
+        self.chat = types.SimpleNamespace(
+            completions=_FaultInjectingCompletions(client.chat.completions, injector)
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+class FaultInjector:
+    """Injects provider latency, errors and malformed output outside production
+
+    Each request's plan comes from its X-Fault-Injection header, or from
+    FAULT_INJECTION_DEFAULT when the header is absent. Latency beyond
+    OPENAI_TIMEOUT surfaces as a client timeout; errors are raised as the
+    OpenAI client's own exception types.
+    """
+
+    def __init__(self):
+        self._default_spec: Optional[str] = None
+        self._default_plan: Optional[FaultPlan] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.FAULT_INJECTION_ENABLED and settings.ENVIRONMENT != "production"
+
+    def wrap(self, client: Any) -> Any:
+        return FaultInjectingClient(client, self) if self.enabled else client
+
+    def plan_for(self, context: RequestContext) -> Optional[FaultPlan]:
+        if context.faults is not None:
+            return context.faults
+        if not settings.FAULT_INJECTION_DEFAULT:
+            return None
+        # One plan for all default traffic, so a seed gives a repeatable sequence
+        if self._default_spec != settings.FAULT_INJECTION_DEFAULT:
+            self._default_plan = FaultPlan.parse(settings.FAULT_INJECTION_DEFAULT)
+            self._default_spec = settings.FAULT_INJECTION_DEFAULT
+        return self._default_plan
+
+    def faults_active(self) -> bool:
+        """Whether the current request's provider calls may be given faults
+
+        Such results must not be cached, reused or offered for reuse.
+        """
+        return self.enabled and self.plan_for(current_request_context()) is not None
+
+    async def create(self, completions: Any, **kwargs) -> Any:
+        """Make a completion call with the request's faults applied"""
+        plan = self.plan_for(current_request_context())
+        faults = plan.draw() if plan is not None else {}
+        if not faults:
+            return await completions.create(**kwargs)
+
+        for kind in faults:
+            metrics_service.increment(f"faults.injected.{kind}")
+        logger.info(f"Injecting provider faults: {', '.join(faults)}")
+
+        if "latency" in faults:
+            delay = float(faults["latency"].value)
+            await asyncio.sleep(min(delay, settings.OPENAI_TIMEOUT))
+            if delay >= settings.OPENAI_TIMEOUT:
+                raise _provider_error("timeout")
+        if "error" in faults:
+            raise _provider_error(faults["error"].value)
+
+        response = await completions.create(**kwargs)
+        if "truncate" not in faults and "invalid_risks" not in faults:
+            return response
+
+        choice = response.choices[0]
+        content = choice.message.content or ""
+        finish_reason = getattr(choice, "finish_reason", None)
+        if "invalid_risks" in faults:
+            content = self._break_a_risk(content, plan.random)
+        if "truncate" in faults:
+            fraction = float(faults["truncate"].value or DEFAULT_TRUNCATE_FRACTION)
+            content = content[: int(len(content) * fraction)]
+            finish_reason = "length"
+
+        return types.SimpleNamespace(
+            choices=[
+                types.SimpleNamespace(
+                    message=types.SimpleNamespace(content=content),
+                    finish_reason=finish_reason,
+                )
+            ],
+            usage=getattr(response, "usage", None),
+        )
+
+    @staticmethod
+    def _break_a_risk(content: str, rng: random.Random) -> str:
+        """Make one risk violate the schema (regular or compact rows)"""
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError:
+            return content
+        if not isinstance(data, dict):
+            return content
+
+        risks = data.get("identified_risks", data.get("r"))
+        if not isinstance(risks, list) or not risks:
+            return content
+
+        index = rng.randrange(len(risks))
+        risk = risks[index]
+        if isinstance(risk, dict):
+            field, value = rng.choice(SCHEMA_VIOLATIONS)
+            if value is None:
+                risk.pop(field, None)
+            else:
+                risk[field] = value
+        elif isinstance(risk, list) and risk:
+            risk[rng.randrange(len(risk))] = None
+        return json.dumps(data)
+
+
+# Global injector instance
+fault_injector = FaultInjector()
@@ -1,21 +1,202 @@
 import io
+import re
 import base64
-from typing import Union
+import importlib
+from collections import Counter
+from typing import List, NamedTuple, Union
 import logging
 
-# Required dependencies: pip install pypdf python-docx
-try:
-    import pypdf
-    from docx import Document
-
-    FILE_PROCESSING_AVAILABLE = True
-except ImportError as e:
-    logging.error("Missing dependencies. Install with: pip install pypdf python-docx")
-    FILE_PROCESSING_AVAILABLE = False
-    raise e
+from app.services.memory_service import memory_service
 
 logger = logging.getLogger(__name__)
 
+# Lines at the top and bottom of a page checked for running headers and footers
+PAGE_EDGE_LINES = 3
+
+# An edge line on at least this share of pages is a running header or footer
+BOILERPLATE_PAGE_SHARE = 0.5
+
+# Fewer pages than this are too few to tell boilerplate from content
+BOILERPLATE_MIN_PAGES = 3
+
+_PAGE_NUMBER_LINE = re.compile(
+    r"^\s*(?:page\s*)?[-–]?\s*\d{1,3}\s*[-–]?(?:\s*(?:of|/)\s*\d{1,3})?\s*$",
+    re.IGNORECASE,
+)
+# A number alone on a line is a page number only as part of a sequence
+_BARE_NUMBER_LINE = re.compile(r"^\s*(\d{1,3})\s*$")
+_DIGITS = re.compile(r"\d+")
+_DOT_LEADER = re.compile(r"\s*(?:\.\s?){4,}\s*|\s*(?:…\s?){2,}\s*")
+_LINE_END_HYPHEN = re.compile(r"(?<=[a-z])-\n(?=[a-z])")
+_INLINE_SPACE = re.compile(r"[ \t\u00a0]+")
+_BLANK_LINES = re.compile(r"\n\s*\n\s*")
+
+
+def _import_parser(module_name: str, package_name: str):
+    """Import a parser library the first time a file that needs it arrives"""
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        logger.error(f"Missing dependency. Install with: pip install {package_name}")
+        raise RuntimeError(
+            f"File processing dependency '{package_name}' not installed. "
+            f"Run: pip install {package_name}"
+        ) from e
+
+
+class ExtractedText(NamedTuple):
+    """Extracted text with statistics gathered while it was built"""
+
+    text: str
+    word_count: int
+    line_count: int
+
+
+class _TextBuilder:
+    """Joins extracted pieces, counting words and lines as each one is added
+
+    Counts match str.split() and str.splitlines() on the joined text, so the
+    full text never has to be scanned a second time.
+    """
+
+    def __init__(self, separator: str = "\n\n"):
+        self.separator = separator
+        self.pieces: List[str] = []
+        self.word_count = 0
+        self.line_count = 0
+        # Whether the text so far ends inside a line, or with a lone "\r"
+        self._ends_open = False
+        self._ends_cr = False
+
+    def _count_lines(self, text: str) -> None:
+        if not text:
+            return
+        lines = len(text.splitlines())
+        # The first line continues the open last line, or a leading "\n"
+        # completes a "\r\n" break that was already counted
+        if self._ends_open or (self._ends_cr and text[0] == "\n"):
+            lines -= 1
+        self.line_count += lines
+        last = text[-1]
+        self._ends_cr = last == "\r"
+        self._ends_open = len(f"{last}.".splitlines()) == 1
+
+    def add(self, piece: str) -> None:
+        if self.pieces:
+            self._count_lines(self.separator)
+        self.pieces.append(piece)
+        self.word_count += len(piece.split())
+        self._count_lines(piece)
+
+    def build(self) -> ExtractedText:
+        return ExtractedText(
+            self.separator.join(self.pieces), self.word_count, self.line_count
+        )
+
+
+def _edge_key(line: str) -> str:
+    """Line identity for boilerplate detection; page numbers inside it are ignored"""
+    return _DIGITS.sub("#", " ".join(line.lower().split()))
+
+
+def _strip_page_boilerplate(pages: List[List[str]]) -> List[List[str]]:
+    """Remove page numbers and lines repeated at the edges of many pages
+
+    Each page is a list of non-blank lines. Labelled page numbers ("Page 3",
+    "- 3 -", "3 of 10") are always removed. A bare number is removed only
+    when the bare edge numbers of most pages count up with the page index,
+    so a lone figure at the edge of a page is kept.
+    """
+    threshold = max(2, len(pages) * BOILERPLATE_PAGE_SHARE)
+    boilerplate = set()
+    if len(pages) >= BOILERPLATE_MIN_PAGES:
+        edge_counts = Counter()
+        for lines in pages:
+            edges = lines[:PAGE_EDGE_LINES] + lines[-PAGE_EDGE_LINES:]
+            edge_counts.update({_edge_key(line) for line in edges})
+        boilerplate = {key for key, count in edge_counts.items() if count >= threshold}
+
+    # Page number minus page index, for every bare number at a page edge
+    offset_counts = Counter()
+    for index, lines in enumerate(pages):
+        edges = lines[:PAGE_EDGE_LINES] + lines[-PAGE_EDGE_LINES:]
+        offset_counts.update(
+            {
+                int(match.group(1)) - index
+                for match in map(_BARE_NUMBER_LINE.match, edges)
+                if match
+            }
+        )
+    page_number_offsets = {
+        offset for offset, count in offset_counts.items() if count >= threshold
+    }
+
+    def is_noise(line: str, index: int) -> bool:
+        bare = _BARE_NUMBER_LINE.match(line)
+        if bare:
+            return int(bare.group(1)) - index in page_number_offsets
+        return _edge_key(line) in boilerplate or bool(_PAGE_NUMBER_LINE.match(line))
+
+    stripped = []
+    for index, lines in enumerate(pages):
+        top, bottom = 0, len(lines)
+        while top < min(bottom, PAGE_EDGE_LINES) and is_noise(lines[top], index):
+            top += 1
+        while bottom > max(top, len(lines) - PAGE_EDGE_LINES) and is_noise(
+            lines[bottom - 1], index
+        ):
+            bottom -= 1
+        stripped.append(lines[top:bottom])
+    return stripped
+
+
+def _compact_layout(text: str) -> str:
+    """Drop dot leaders and squeeze whitespace"""
+    text = _DOT_LEADER.sub(" ", text)
+    lines = (_INLINE_SPACE.sub(" ", line).strip() for line in text.splitlines())
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def _normalize_pdf_pages(page_texts: List[str]) -> List[str]:
+    """Page texts without running headers, footers, page numbers or layout noise"""
+    # Words broken after a hyphen are joined first so both halves are judged as
+    # one line. The hyphen is kept: "risk-based" must not become "riskbased".
+    # Blank lines are dropped so running headers and footers sit at the page edges
+    pages = [
+        [
+            line
+            for line in _LINE_END_HYPHEN.sub("-", page_text).splitlines()
+            if line.strip()
+        ]
+        for page_text in page_texts
+    ]
+    return [
+        _compact_layout("\n".join(lines)) for lines in _strip_page_boilerplate(pages)
+    ]
+
+
+def _encode_docx_table(table) -> str:
+    """Compact table encoding: one line per row, cells separated by '|'
+
+    Merged cells are listed once, empty cells keep their place so columns stay
+    aligned, and empty rows and trailing empty cells are dropped.
+    """
+    rows = []
+    for row in table.rows:
+        cells = []
+        previous = None
+        for cell in row.cells:
+            # A horizontally merged cell is returned once per grid column
+            if cell._tc is previous:
+                continue
+            previous = cell._tc
+            cells.append(" ".join(cell.text.split()).replace("|", "/"))
+        while cells and not cells[-1]:
+            cells.pop()
+        if cells:
+            rows.append("|".join(cells))
+    return "\n".join(rows)
+
 
 class FileProcessorService:
     """Service for processing uploaded files and extracting text content"""
@@ -25,66 +206,89 @@ class FileProcessorService:
         file_data: str, file_type: str, filename: str = None
     ) -> str:
         """Extract text from base64 encoded file data"""
-        if not FILE_PROCESSING_AVAILABLE:
-            raise RuntimeError(
-                "File processing dependencies not installed. Run: pip install PyPDF2 python-docx"
-            )
+        return FileProcessorService.extract_with_stats(
+            file_data, file_type, filename
+        ).text
 
+    @staticmethod
+    def extract_with_stats(
+        file_data: str, file_type: str, filename: str = None
+    ) -> ExtractedText:
+        """Extract text from base64 encoded file data, counting words and lines in the same pass"""
         try:
-            # Decode base64 to bytes
-            file_bytes = base64.b64decode(file_data)
+            kind = file_type.lower()
+            if kind not in ("pdf", "txt", "docx", "doc"):
+                raise ValueError(f"Unsupported file type: {file_type}")
 
-            logger.info(
-                f"Processing {file_type.upper()} file: {filename or 'unnamed'} ({len(file_bytes)} bytes)"
-            )
+            with memory_service.track(f"extract.{kind}"):
+                # Decode base64 to bytes
+                memory_service.note_size("base64", file_data)
+                file_bytes = base64.b64decode(file_data)
+                memory_service.note_size("decoded", file_bytes)
+                memory_service.note_input(len(file_bytes))
 
-            if file_type.lower() == "pdf":
-                return FileProcessorService._extract_pdf_text(file_bytes)
-            elif file_type.lower() == "txt":
-                return FileProcessorService._extract_txt_text(file_bytes)
-            elif file_type.lower() in ["docx", "doc"]:
-                return FileProcessorService._extract_docx_text(file_bytes)
-            else:
-                raise ValueError(f"Unsupported file type: {file_type}")
+                logger.info(
+                    f"Processing {file_type.upper()} file: {filename or 'unnamed'} ({len(file_bytes)} bytes)"
+                )
+
+                if kind == "pdf":
+                    return FileProcessorService._extract_pdf_text(file_bytes)
+                elif kind == "txt":
+                    return FileProcessorService._extract_txt_text(file_bytes)
+                else:
+                    return FileProcessorService._extract_docx_text(file_bytes)
+
+        except RuntimeError:
+            # Missing parser dependency, not a problem with the file
+            raise
 
         except Exception as e:
             logger.error(f"Error processing {file_type} file {filename}: {e}")
             raise ValueError(f"Failed to extract text from {file_type} file: {str(e)}")
 
     @staticmethod
-    def _extract_pdf_text(file_bytes: bytes) -> str:
+    def _extract_pdf_text(file_bytes: bytes) -> ExtractedText:
         """Extract text from PDF bytes"""
+        pypdf = _import_parser("pypdf", "pypdf")
+
         try:
             pdf_file = io.BytesIO(file_bytes)
+            memory_service.note_size("bytesio", pdf_file)
             pdf_reader = pypdf.PdfReader(pdf_file)
 
-            text_content = []
+            page_texts = []
             for page_num, page in enumerate(pdf_reader.pages):
                 try:
-                    page_text = page.extract_text()
-                    if page_text.strip():
-                        text_content.append(f"--- Page {page_num + 1} ---\n{page_text}")
+                    page_texts.append(page.extract_text())
                 except Exception as e:
                     logger.warning(
                         f"Error extracting text from page {page_num + 1}: {e}"
                     )
                     continue
 
-            extracted_text = "\n\n".join(text_content)
+            memory_service.note_size("pages", *page_texts)
+
+            text_content = _TextBuilder()
+            for page_text in _normalize_pdf_pages(page_texts):
+                if page_text:
+                    text_content.add(page_text)
 
-            if not extracted_text.strip():
+            extracted = text_content.build()
+            memory_service.note_size("text", extracted.text)
+
+            if not extracted.text.strip():
                 raise ValueError("No readable text found in PDF")
 
             logger.info(
-                f"Successfully extracted {len(extracted_text)} characters from PDF"
+                f"Successfully extracted {len(extracted.text)} characters from PDF"
             )
-            return extracted_text
+            return extracted
 
         except Exception as e:
             raise ValueError(f"PDF processing error: {str(e)}")
 
     @staticmethod
-    def _extract_txt_text(file_bytes: bytes) -> str:
+    def _extract_txt_text(file_bytes: bytes) -> ExtractedText:
         """Extract text from TXT bytes"""
         try:
             # Try different encodings
@@ -93,8 +297,9 @@ class FileProcessorService:
             for encoding in encodings:
                 try:
                     text = file_bytes.decode(encoding)
+                    memory_service.note_size("text", text)
                     logger.info(f"Successfully decoded TXT with {encoding} encoding")
-                    return text
+                    return ExtractedText(text, len(text.split()), len(text.splitlines()))
                 except UnicodeDecodeError:
                     continue
 
@@ -104,41 +309,36 @@ class FileProcessorService:
             raise ValueError(f"TXT processing error: {str(e)}")
 
     @staticmethod
-    def _extract_docx_text(file_bytes: bytes) -> str:
+    def _extract_docx_text(file_bytes: bytes) -> ExtractedText:
         """Extract text from DOCX bytes"""
+        docx = _import_parser("docx", "python-docx")
+
         try:
             doc_file = io.BytesIO(file_bytes)
-            doc = Document(doc_file)
-
-            text_content = []
-
-            # Extract paragraph text
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_content.append(paragraph.text)
-
-            # Extract table text
-            for table in doc.tables:
-                table_text = []
-                for row in table.rows:
-                    row_text = []
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            row_text.append(cell.text.strip())
-                    if row_text:
-                        table_text.append(" | ".join(row_text))
-                if table_text:
-                    text_content.append("\n--- Table ---\n" + "\n".join(table_text))
-
-            extracted_text = "\n\n".join(text_content)
-
-            if not extracted_text.strip():
+            memory_service.note_size("bytesio", doc_file)
+            doc = docx.Document(doc_file)
+
+            text_content = _TextBuilder()
+
+            # Paragraphs and tables in document order
+            for block in doc.iter_inner_content():
+                if isinstance(block, docx.table.Table):
+                    table_text = _encode_docx_table(block)
+                    if table_text:
+                        text_content.add(f"[Table]\n{table_text}")
+                elif block.text.strip():
+                    text_content.add(block.text)
+
+            extracted = text_content.build()
+            memory_service.note_size("text", extracted.text)
+
+            if not extracted.text.strip():
                 raise ValueError("No readable text found in DOCX")
 
             logger.info(
-                f"Successfully extracted {len(extracted_text)} characters from DOCX"
+                f"Successfully extracted {len(extracted.text)} characters from DOCX"
             )
-            return extracted_text
+            return extracted
 
         except Exception as e:
             raise ValueError(f"DOCX processing error: {str(e)}")
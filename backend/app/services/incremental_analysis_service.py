@@ -0,0 +1,253 @@
+import re
+import asyncio
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+
+from app.config import settings
+from app.models import DocumentInput, AnalysisMetadata
+from app.services.openai_service import openai_service
+from app.services.analysis_store import analysis_store, AnalysisStore
+from app.services.admission_service import admission_service
+from app.services.fault_injection import fault_injector
+from app.services.metrics_service import metrics_service
+
+
+# Bump when the prompt or chunking changes so stale findings are not reused
+CHUNK_CACHE_VERSION = "2"
+
+# Chunks shorter than this are too small to analyze on their own
+MIN_ANALYZABLE_CHUNK_CHARS = 50
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
+class ContentDefinedChunker:
+    """Split text into chunks whose boundaries depend only on local content
+
+    The text is cut into units (lines, or sentences for very long lines) and a
+    chunk ends after a unit whose hash hits the boundary condition. An edit
+    therefore only changes the chunk it falls in; every other chunk keeps the
+    same text and the same cache key.
+    """
+
+    def __init__(
+        self,
+        min_chars: Optional[int] = None,
+        max_chars: Optional[int] = None,
+        boundary_divisor: Optional[int] = None,
+    ):
+        self.min_chars = min_chars or settings.INCREMENTAL_CHUNK_MIN_CHARS
+        self.max_chars = max_chars or settings.INCREMENTAL_CHUNK_MAX_CHARS
+        self.boundary_divisor = max(
+            1, boundary_divisor or settings.INCREMENTAL_CHUNK_BOUNDARY_DIVISOR
+        )
+
+    def _split_units(self, text: str) -> List[str]:
+        """Split text into lines, breaking long lines at sentence ends"""
+        units = []
+        for line in text.splitlines(keepends=True):
+            if len(line) <= self.min_chars:
+                units.append(line)
+                continue
+            parts = SENTENCE_BOUNDARY.split(line)
+            for index, part in enumerate(parts):
+                units.append(part if index == len(parts) - 1 else part + " ")
+        return units
+
+    def _is_boundary(self, unit: str) -> bool:
+        """Decide from the unit's own content whether a chunk may end after it"""
+        digest = hashlib.blake2b(unit.strip().encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big") % self.boundary_divisor == 0
+
+    def chunk(self, text: str) -> List[str]:
+        """Split text into content-defined chunks"""
+        chunks: List[str] = []
+        current: List[str] = []
+        size = 0
+
+        for unit in self._split_units(text):
+            # Hard split units that alone exceed the maximum size
+            while len(unit) > self.max_chars:
+                if current:
+                    chunks.append("".join(current))
+                    current, size = [], 0
+                chunks.append(unit[: self.max_chars])
+                unit = unit[self.max_chars :]
+
+            # Close the chunk before a unit that would take it past the maximum
+            if current and size + len(unit) > self.max_chars:
+                chunks.append("".join(current))
+                current, size = [], 0
+
+            current.append(unit)
+            size += len(unit)
+
+            if size >= self.max_chars or (
+                size >= self.min_chars and self._is_boundary(unit)
+            ):
+                chunks.append("".join(current))
+                current, size = [], 0
+
+        if current:
+            chunks.append("".join(current))
+
+        # Fold a tiny tail into the previous chunk instead of analyzing it alone
+        if (
+            len(chunks) > 1
+            and len(chunks[-1].strip()) < MIN_ANALYZABLE_CHUNK_CHARS
+            and len(chunks[-2]) + len(chunks[-1]) <= self.max_chars
+        ):
+            chunks[-2] += chunks.pop()
+
+        return [chunk for chunk in chunks if chunk.strip()]
+
+
+class IncrementalAnalysisService:
+    """Revision-aware analysis that only sends changed chunks to the model"""
+
+    def __init__(self):
+        self.openai_service = openai_service
+        self.analysis_store = analysis_store
+        self.chunker = ContentDefinedChunker()
+
+    def _context_key(self, document_input: DocumentInput) -> str:
+        """Everything besides the chunk text that influences the findings"""
+        return json.dumps(
+            [
+                CHUNK_CACHE_VERSION,
+                AnalysisStore.context_key(
+                    document_input, self.openai_service.model_for(document_input)
+                ),
+            ]
+        )
+
+    def _cache_key(self, context_key: str, chunk: str) -> str:
+        """Build the cache key for a chunk"""
+        digest = hashlib.sha256()
+        digest.update(context_key.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(chunk.strip().encode("utf-8"))
+        return digest.hexdigest()
+
+    async def analyze(
+        self,
+        document_input: DocumentInput,
+        document_content: str,
+        progress: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Tuple[Dict[str, Any], AnalysisMetadata]:
+        """Analyze a document, reusing cached findings for unchanged chunks
+
+        When progress is given it is filled with the findings of each chunk as
+        they become available, so a caller that runs out of time can merge the
+        chunks finished so far.
+        """
+        chunks = self.chunker.chunk(document_content)
+        context_key = self._context_key(document_input)
+        cache_keys = [self._cache_key(context_key, chunk) for chunk in chunks]
+
+        # Fault-injected calls must reach the provider, and their output is not
+        # a chunk's real findings
+        use_cache = not fault_injector.faults_active()
+
+        cached: Dict[str, Dict[str, Any]] = {}
+        if use_cache:
+            try:
+                cached = await asyncio.to_thread(
+                    self.analysis_store.get_chunk_findings, list(set(cache_keys))
+                )
+            except Exception as e:
+                logger.warning(f"Chunk cache unavailable, analyzing all chunks: {e}")
+
+        if progress is not None:
+            progress.update(cached)
+
+        missing = {
+            key: chunk
+            for key, chunk in zip(cache_keys, chunks)
+            if key not in cached
+        }
+        logger.info(
+            f"Incremental analysis: {len(chunks)} chunks, "
+            f"{len(chunks) - len(missing)} reused, {len(missing)} to analyze"
+        )
+
+        semaphore = asyncio.Semaphore(max(1, settings.INCREMENTAL_MAX_CONCURRENCY))
+
+        async def analyze_chunk(key: str, chunk: str) -> None:
+            async with semaphore, admission_service.llm_slot():
+                findings = await self.openai_service.analyze_document_risks(
+                    document_input, chunk
+                )
+            cached[key] = findings
+            if progress is not None:
+                progress[key] = findings
+            if not use_cache:
+                return
+            if findings.get("risks_salvaged"):
+                # Partly recovered output; let a later run analyze the chunk again
+                metrics_service.increment("incremental.salvaged_not_cached")
+                return
+            try:
+                await asyncio.to_thread(
+                    self.analysis_store.save_chunk_findings, key, findings
+                )
+            except Exception as e:
+                logger.warning(f"Failed to cache chunk findings: {e}")
+
+        await asyncio.gather(
+            *(analyze_chunk(key, chunk) for key, chunk in missing.items())
+        )
+
+        ai_response = self.merge_findings([cached[key] for key in cache_keys])
+        metadata = AnalysisMetadata(
+            analysis_mode="incremental",
+            chunks_total=len(chunks),
+            chunks_reused=sum(1 for key in cache_keys if key not in missing),
+        )
+        return ai_response, metadata
+
+    @staticmethod
+    def merge_findings(findings: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine per-chunk findings into a single model-shaped response"""
+        risks_by_title: Dict[str, Dict[str, Any]] = {}
+        key_concerns: List[str] = []
+        risks_salvaged = 0
+
+        for chunk_findings in findings:
+            risks_salvaged += chunk_findings.get("risks_salvaged", 0)
+            for risk in chunk_findings.get("identified_risks", []):
+                title_key = " ".join(
+                    re.findall(r"[a-z0-9]+", str(risk.get("title", "")).lower())
+                )
+                existing = risks_by_title.get(title_key)
+                if existing is None or _score(risk) > _score(existing):
+                    risks_by_title[title_key] = risk
+
+            for concern in chunk_findings.get("key_concerns", []):
+                if concern not in key_concerns:
+                    key_concerns.append(concern)
+
+        # Risk ids from different chunks collide, so renumber them
+        merged_risks = []
+        for index, risk in enumerate(risks_by_title.values()):
+            merged_risks.append({**risk, "risk_id": f"RISK_{index + 1:03d}"})
+
+        return {
+            "identified_risks": merged_risks,
+            "key_concerns": key_concerns,
+            "risks_salvaged": risks_salvaged,
+        }
+
+
+def _score(risk: Dict[str, Any]) -> float:
+    """Best-effort numeric risk score for comparing duplicate findings"""
+    try:
+        return float(risk.get("risk_score") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# Global service instance
+incremental_analysis_service = IncrementalAnalysisService()
@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+from contextlib import contextmanager, suppress
+from typing import Any, Awaitable, Dict, Iterator, TypeVar
+from loguru import logger
+from starlette.requests import Request
+
+from app.services.metrics_service import metrics_service
+
+T = TypeVar("T")
+
+
+class ClientDisconnectedError(Exception):
+    """Raised when the client went away before its request finished"""
+
+
+class LifecycleService:
+    """Tracks in-flight work so a shutting-down worker can drain it"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._draining = False
+        self._draining_since: float = 0.0
+        self._requests = 0
+        self._llm_calls = 0
+
+    @property
+    def is_draining(self) -> bool:
+        return self._draining
+
+    def start_draining(self) -> None:
+        """Stop accepting new work; in-flight work keeps running
+
+        Called from signal handlers, so it must not take locks or log.
+        """
+        if not self._draining:
+            self._draining_since = time.time()
+            self._draining = True
+
+    @contextmanager
+    def track_request(self) -> Iterator[None]:
+        """Count an HTTP request as in flight"""
+        with self._lock:
+            self._requests += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._requests -= 1
+
+    @contextmanager
+    def track_llm_call(self) -> Iterator[None]:
+        """Count a provider call as in flight (safe to use from worker threads)"""
+        with self._lock:
+            self._llm_calls += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._llm_calls -= 1
+
+    async def cancel_on_disconnect(self, request: Request, work: Awaitable[T]) -> T:
+        """Run work for a request, cancelling it if the client disconnects
+
+        Cancellation propagates into the work, so bulkhead slots are released,
+        queued extraction is abandoned and outbound provider calls are closed.
+        """
+        task = asyncio.ensure_future(work)
+        watcher = asyncio.ensure_future(self._wait_for_disconnect(request))
+        try:
+            await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            watcher.cancel()
+
+        if task.done():
+            return task.result()
+
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+        metrics_service.increment("requests.cancelled")
+        logger.info(f"Client disconnected, cancelled {request.method} {request.url.path}")
+        raise ClientDisconnectedError()
+
+    @staticmethod
+    async def _wait_for_disconnect(request: Request) -> None:
+        """Block until the server reports the client connection closed
+
+        Request.is_disconnected() cannot see disconnects through the
+        function-style HTTP middlewares, so wait on receive() instead; the body
+        has already been read, so the next message is the disconnect.
+        """
+        while True:
+            message = await request.receive()
+            if message["type"] == "http.disconnect":
+                return
+
+    def _is_idle(self) -> bool:
+        with self._lock:
+            return self._requests == 0 and self._llm_calls == 0
+
+    async def wait_until_idle(self, timeout: float) -> bool:
+        """Wait for in-flight work to finish, return False if the deadline passed
+
+        The deadline counts from when draining started, so time already spent
+        waiting for open connections is not granted twice.
+        """
+        deadline = (self._draining_since or time.time()) + timeout
+        logger.info(
+            f"Draining: {self._requests} requests and {self._llm_calls} LLM calls in flight"
+        )
+        while not self._is_idle():
+            if time.time() >= deadline:
+                logger.warning(
+                    f"Drain deadline of {timeout}s reached with "
+                    f"{self._requests} requests and {self._llm_calls} LLM calls in flight"
+                )
+                return False
+            await asyncio.sleep(0.1)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """In-flight counters for health and metrics endpoints"""
+        with self._lock:
+            return {
+                "draining": self._draining,
+                "draining_since": self._draining_since or None,
+                "in_flight_requests": self._requests,
+                "in_flight_llm_calls": self._llm_calls,
+            }
+
+
+# Global lifecycle instance
+lifecycle_service = LifecycleService()
@@ -0,0 +1,254 @@
+import os
+import sys
+import threading
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from loguru import logger
+
+from app.config import settings
+from app.services.metrics_service import metrics_service
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Allocations made by tracemalloc itself and by imports are not request memory
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class MemoryUsage:
+    """Memory figures of one tracked block (an upload or an extraction)
+
+    peak_bytes is the traced high-water mark above what was allocated when the
+    block started, or None when tracemalloc is off. tracemalloc counts the
+    whole process, so overlapped is set when another tracked block that is not
+    nested in this one ran at the same time; its allocations are included.
+    """
+
+    def __init__(self, label: str, parent: Optional["MemoryUsage"]):
+        self.label = label
+        self.parent = parent
+        self.stages: Dict[str, int] = {}
+        self.input_bytes: Optional[int] = None
+        self.baseline = 0
+        self.peak_bytes: Optional[int] = None
+        self.overlapped = False
+        self._peak = 0
+
+    def is_nested_in(self, other: "MemoryUsage") -> bool:
+        parent = self.parent
+        while parent is not None:
+            if parent is other:
+                return True
+            parent = parent.parent
+        return False
+
+
+_current_usage: ContextVar[Optional[MemoryUsage]] = ContextVar(
+    "memory_usage", default=None
+)
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size (Linux only)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _max_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class MemoryService:
+    """Peak memory of uploads and extractions, and tracemalloc snapshots
+
+    Tracked blocks always record the size of what they hold at each stage
+    (base64 string, decoded bytes, page strings, final text). With
+    MEMORY_TRACING_ENABLED, tracemalloc also runs, which gives each block its
+    peak and lets admins diff snapshots. Tracing slows allocations down, so
+    it is off by default.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active: List[MemoryUsage] = []
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start_tracing(self) -> None:
+        if not self.tracing:
+            tracemalloc.start(max(1, settings.MEMORY_TRACE_FRAMES))
+            logger.info(f"tracemalloc started ({settings.MEMORY_TRACE_FRAMES} frames)")
+
+    def _fold_peak(self) -> None:
+        """Credit the traced peak so far to every active block, then reset it"""
+        _, peak = tracemalloc.get_traced_memory()
+        for usage in self._active:
+            usage._peak = max(usage._peak, peak)
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def track(self, label: str) -> Iterator[Optional[MemoryUsage]]:
+        """Track the memory of a block; stages are noted with note_size()"""
+        if not settings.MEMORY_TRACKING_ENABLED:
+            yield None
+            return
+
+        usage = MemoryUsage(label, _current_usage.get())
+        with self._lock:
+            if self.tracing:
+                self._fold_peak()
+                usage.baseline = tracemalloc.get_traced_memory()[0]
+            for other in self._active:
+                if not usage.is_nested_in(other):
+                    other.overlapped = usage.overlapped = True
+            self._active.append(usage)
+
+        token = _current_usage.set(usage)
+        try:
+            yield usage
+        finally:
+            _current_usage.reset(token)
+            with self._lock:
+                if self.tracing:
+                    self._fold_peak()
+                    usage.peak_bytes = max(0, usage._peak - usage.baseline)
+                self._active.remove(usage)
+            self._record(usage)
+
+    def note_size(self, stage: str, *values: Any) -> None:
+        """Record the size of the objects the current block holds at a stage"""
+        usage = _current_usage.get()
+        if usage is not None:
+            usage.stages[stage] = sum(sys.getsizeof(value) for value in values)
+
+    def note_input(self, size: int) -> None:
+        """Record the size of the file the current block processes"""
+        usage = _current_usage.get()
+        if usage is not None:
+            usage.input_bytes = size
+
+    def _record(self, usage: MemoryUsage) -> None:
+        prefix = f"memory.{usage.label}"
+        for stage, size in usage.stages.items():
+            metrics_service.observe(f"{prefix}.{stage}_bytes", size)
+        if usage.overlapped:
+            metrics_service.increment(f"{prefix}.overlapped")
+        if usage.peak_bytes is None:
+            return
+
+        metrics_service.observe(f"{prefix}.peak_bytes", usage.peak_bytes)
+        if usage.input_bytes:
+            metrics_service.observe(
+                f"{prefix}.peak_per_input_byte", usage.peak_bytes / usage.input_bytes
+            )
+        logger.info(
+            f"Memory {usage.label}: peak {usage.peak_bytes} bytes"
+            + (f" for {usage.input_bytes} input bytes" if usage.input_bytes else "")
+            + (" (overlapped)" if usage.overlapped else "")
+        )
+
+    def take_snapshot(self) -> Dict[str, Any]:
+        """Take and keep a tracemalloc snapshot; the oldest are dropped"""
+        if not self.tracing:
+            raise RuntimeError("Memory tracing is off (MEMORY_TRACING_ENABLED)")
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        info = {
+            "snapshot_id": uuid.uuid4().hex[:12],
+            "taken_at": datetime.utcnow(),
+            "pid": os.getpid(),
+            "traced_bytes": sum(stat.size for stat in snapshot.statistics("filename")),
+        }
+        with self._lock:
+            self._snapshots[info["snapshot_id"]] = {**info, "snapshot": snapshot}
+            while len(self._snapshots) > settings.MEMORY_MAX_SNAPSHOTS:
+                del self._snapshots[next(iter(self._snapshots))]
+        return info
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {key: value for key, value in entry.items() if key != "snapshot"}
+                for entry in self._snapshots.values()
+            ]
+
+    def diff(
+        self,
+        snapshot_id: str,
+        against: Optional[str] = None,
+        key_type: str = "lineno",
+        limit: int = 20,
+    ) -> Optional[Dict[str, Any]]:
+        """Largest allocation changes from a snapshot to another one (or to now)
+
+        Returns None when either snapshot is unknown in this worker.
+        """
+        with self._lock:
+            base = self._snapshots.get(snapshot_id)
+            target = self._snapshots.get(against) if against else None
+        if base is None or (against and target is None):
+            return None
+
+        if target is None:
+            if not self.tracing:
+                raise RuntimeError("Memory tracing is off (MEMORY_TRACING_ENABLED)")
+            current = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        else:
+            current = target["snapshot"]
+
+        stats = current.compare_to(base["snapshot"], key_type)
+        return {
+            "snapshot_id": snapshot_id,
+            "against": against,
+            "key_type": key_type,
+            "total_diff_bytes": sum(stat.size_diff for stat in stats),
+            "items": [
+                {
+                    "frames": [
+                        f"{frame.filename}:{frame.lineno}" for frame in stat.traceback
+                    ],
+                    "size_bytes": stat.size,
+                    "size_diff_bytes": stat.size_diff,
+                    "count": stat.count,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in stats[:limit]
+            ],
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "tracking": settings.MEMORY_TRACKING_ENABLED,
+            "tracing": self.tracing,
+            "rss_bytes": _rss_bytes(),
+            "max_rss_bytes": _max_rss_bytes(),
+            "snapshots": len(self._snapshots),
+        }
+        if self.tracing:
+            stats["traced_bytes"] = tracemalloc.get_traced_memory()[0]
+        return stats
+
+
+# Global memory instance
+memory_service = MemoryService()
@@ -0,0 +1,91 @@
+import threading
+from collections import defaultdict
+from typing import Any, Dict
+
+
+class TimingStats:
+    """Running count/sum/min/max for an observed value"""
+
+    __slots__ = ("count", "total", "minimum", "maximum", "last")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float("inf")
+        self.maximum = 0.0
+        self.last = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        self.last = value
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 4) if self.count else 0.0,
+            "min": round(self.minimum, 4) if self.count else 0.0,
+            "max": round(self.maximum, 4),
+            "last": round(self.last, 4),
+        }
+
+
+class MetricsService:
+    """In-process counters, gauges and value observations"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._observations: Dict[str, TimingStats] = defaultdict(TimingStats)
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Add to a counter"""
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set a gauge to its current value"""
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a single observation (e.g. a duration in seconds)"""
+        with self._lock:
+            self._observations[name].add(value)
+
+    def get_counter(self, name: str) -> float:
+        """Get the current value of a counter"""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def ratio(self, numerator: str, denominator: str) -> float:
+        """Ratio of two counters, 0 when the denominator is empty"""
+        with self._lock:
+            total = self._counters.get(denominator, 0)
+            return round(self._counters.get(numerator, 0) / total, 4) if total else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get a copy of all recorded metrics"""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "observations": {
+                    name: stats.to_dict()
+                    for name, stats in self._observations.items()
+                },
+            }
+
+    def reset(self) -> None:
+        """Clear all recorded metrics"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._observations.clear()
+
+
+# Global metrics instance
+metrics_service = MetricsService()
@@ -0,0 +1,125 @@
+import re
+import hashlib
+from collections import Counter
+from typing import Optional, Tuple
+from loguru import logger
+
+from app.config import settings
+from app.models import DocumentInput
+from app.services.analysis_store import analysis_store, AnalysisStore
+from app.services.metrics_service import metrics_service
+
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def simhash(text: str, shingle_size: int = SHINGLE_SIZE) -> int:
+    """64-bit SimHash over word shingles of the text"""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) <= shingle_size:
+        shingles = Counter([" ".join(tokens)])
+    else:
+        shingles = Counter(
+            " ".join(tokens[i : i + shingle_size])
+            for i in range(len(tokens) - shingle_size + 1)
+        )
+
+    hashed = [
+        (
+            int.from_bytes(
+                hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(),
+                "big",
+            ),
+            weight,
+        )
+        for shingle, weight in shingles.items()
+    ]
+    total_weight = sum(weight for _, weight in hashed)
+
+    fingerprint = 0
+    for bit in range(FINGERPRINT_BITS):
+        mask = 1 << bit
+        bit_weight = sum(weight for value, weight in hashed if value & mask)
+        if bit_weight * 2 > total_weight:
+            fingerprint |= mask
+    return fingerprint
+
+
+def similarity(a: int, b: int) -> float:
+    """Fraction of matching bits between two fingerprints"""
+    return 1.0 - bin(a ^ b).count("1") / FINGERPRINT_BITS
+
+
+class NearDuplicateService:
+    """Fingerprint index that finds previously analyzed near-duplicate documents"""
+
+    def __init__(self):
+        self.analysis_store = analysis_store
+
+    @property
+    def threshold(self) -> float:
+        return settings.NEAR_DUPLICATE_THRESHOLD
+
+    def fingerprint(self, document_content: str) -> int:
+        """Compute the fingerprint of a document"""
+        return simhash(document_content)
+
+    def find_match(
+        self,
+        document_input: DocumentInput,
+        fingerprint: int,
+        model: str,
+        threshold: Optional[float] = None,
+    ) -> Optional[Tuple[str, float]]:
+        """Find the most similar stored analysis above the threshold"""
+        threshold = threshold or self.threshold
+        context_key = AnalysisStore.context_key(document_input, model)
+        max_distance = int((1.0 - threshold) * FINGERPRINT_BITS)
+
+        metrics_service.increment("near_duplicate.lookups")
+        candidates = self.analysis_store.find_fingerprint_candidates(
+            context_key, fingerprint, max_distance
+        )
+
+        best: Optional[Tuple[str, float]] = None
+        for analysis_id, candidate in candidates:
+            score = similarity(fingerprint, candidate)
+            if score >= threshold and (best is None or score > best[1]):
+                best = (analysis_id, score)
+
+        if best:
+            metrics_service.increment("near_duplicate.hits")
+            logger.info(
+                f"Near-duplicate of analysis {best[0]} found (similarity {best[1]:.3f})"
+            )
+        return best
+
+    def register(
+        self,
+        analysis_id: str,
+        document_input: DocumentInput,
+        fingerprint: int,
+        model: str,
+    ) -> None:
+        """Add an analyzed document to the fingerprint index"""
+        self.analysis_store.save_fingerprint(
+            analysis_id, AnalysisStore.context_key(document_input, model), fingerprint
+        )
+
+    def get_stats(self) -> dict:
+        """Threshold and reuse rate for the metrics endpoint"""
+        return {
+            "enabled": settings.NEAR_DUPLICATE_ENABLED,
+            "threshold": self.threshold,
+            "lookups": int(metrics_service.get_counter("near_duplicate.lookups")),
+            "hits": int(metrics_service.get_counter("near_duplicate.hits")),
+            "reuse_rate": metrics_service.ratio(
+                "near_duplicate.hits", "near_duplicate.lookups"
+            ),
+        }
+
+
+# Global service instance
+near_duplicate_service = NearDuplicateService()
@@ -1,32 +1,111 @@
 import json
+import math
+import hashlib
+import time
 import asyncio
-from typing import Dict, Any, Optional
-from openai import OpenAI
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from loguru import logger
 
 from app.config import settings
-from app.models import DocumentInput, RiskAnalysisResponse, DocumentType, CompanyScale
+from app.models import (
+    AnalysisConfig,
+    DocumentInput,
+    RiskAnalysisResponse,
+    DocumentType,
+    CompanyScale,
+    RiskCategory,
+)
 from .file_processing_service import FileProcessorService
+from .lifecycle_service import lifecycle_service
+from .metrics_service import metrics_service
+from .response_parser import response_parser
+from .request_context import current_request_context
+from .passage_selector import passage_selector
+from .fault_injection import fault_injector
+from .usage_service import TokenBudgetExceededError, usage_service
+from .compact_schema import (
+    compact_response_format,
+    expand_compact_response,
+    is_compact_response,
+)
+from .analysis_profiles import (
+    resolve_analysis_config,
+    resolve_max_continuations,
+    resolve_profile_model,
+)
+
+
+# Output tokens per risk relative to the standard detail level
+DETAIL_LEVEL_MULTIPLIERS = {"brief": 0.6, "standard": 1.0, "detailed": 1.5}
+
+# Share of a risk's output tokens spent on recommendations and evidence quotes
+MITIGATION_TOKEN_SHARE = 0.3
+EVIDENCE_TOKEN_SHARE = 0.15
+
+# Output tokens of a compact response relative to the regular schema
+COMPACT_OUTPUT_TOKEN_FACTOR = 0.7
+
+DETAIL_LEVEL_INSTRUCTIONS = {
+    "brief": "Keep each description to one or two sentences and give at most two recommendations per risk",
+    "detailed": "Give thorough descriptions and at least three specific recommendations per risk",
+}
+
+# Category groups analyzed by concurrent completions in sharded mode
+CATEGORY_SHARDS: Tuple[Tuple[RiskCategory, ...], ...] = (
+    (RiskCategory.FINANCIAL, RiskCategory.MARKET),
+    (RiskCategory.OPERATIONAL, RiskCategory.TECHNOLOGY),
+    (RiskCategory.REGULATORY, RiskCategory.LEGAL, RiskCategory.STRATEGIC),
+)
+
+CONTINUATION_PROMPT = (
+    "Your previous reply was cut off. Continue the JSON exactly where it stopped. "
+    "Output only the remaining text, without repeating anything or adding commentary."
+)
 
 
 class OpenAIService:
     """Service for OpenAI API integration and risk analysis"""
 
     def __init__(self):
-        self.client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=settings.OPENAI_API_KEY,
-            timeout=settings.OPENAI_TIMEOUT,
-        )
+        self._client = None
         self.model = settings.OPENAI_MODEL
         self.max_tokens = settings.OPENAI_MAX_TOKENS
         self.temperature = settings.OPENAI_TEMPERATURE
         self.timeout = settings.OPENAI_TIMEOUT
+        self.compact_output = settings.COMPACT_OUTPUT_ENABLED
+        # Replaces the built-in system prompt (prompt experiments and replays)
+        self.system_prompt: Optional[str] = None
         self.file_processor = FileProcessorService()
 
-    def _build_system_prompt(self) -> str:
-        """Build comprehensive system prompt for risk analysis"""
-        return """You are an expert business risk analyst with deep knowledge across multiple industries. Your task is to analyze business documents and identify potential risks with high accuracy and actionable insights.
+    @property
+    def client(self):
+        """Provider client, created on first use to keep imports and cold starts cheap
+
+        The async client lets a cancelled request abort its outbound call.
+        Outside production it may be wrapped to inject faults for testing.
+        """
+        if self._client is None:
+            from openai import AsyncOpenAI
+
+            self._client = AsyncOpenAI(
+                base_url="https://openrouter.ai/api/v1",
+                api_key=settings.OPENAI_API_KEY,
+                timeout=settings.OPENAI_TIMEOUT,
+            )
+        return fault_injector.wrap(self._client)
+
+    @client.setter
+    def client(self, client) -> None:
+        self._client = client
+
+    def _build_system_prompt(
+        self, categories: Optional[Sequence[RiskCategory]] = None
+    ) -> str:
+        """Build comprehensive system prompt for risk analysis
+
+        With categories, the schema only offers those categories.
+        """
+        prompt = self.system_prompt or """You are an expert business risk analyst with deep knowledge across multiple industries. Your task is to analyze business documents and identify potential risks with high accuracy and actionable insights.
 
 ANALYSIS FRAMEWORK:
 - Consider industry-specific risks and market dynamics
@@ -65,6 +144,24 @@ RESPONSE FORMAT:
     "industry_insights": "Industry-specific risk considerations"
 }"""
 
+        # Short keys and enum codes cut output tokens; expanded after parsing
+        if self.compact_output and "RESPONSE FORMAT:" in prompt:
+            prompt = prompt[: prompt.index("RESPONSE FORMAT:")] + compact_response_format(
+                [category.value for category in categories] if categories else None
+            )
+        elif categories:
+            prompt = prompt.replace(
+                "market|operational|financial|regulatory|strategic|technology|legal",
+                "|".join(category.value for category in categories),
+            )
+
+        return prompt
+
+    @property
+    def prompt_version(self) -> str:
+        """Short hash of the system prompt, to tell results of prompt revisions apart"""
+        return hashlib.sha256(self._build_system_prompt().encode("utf-8")).hexdigest()[:12]
+
     def _process_document_input(self, document_input: DocumentInput) -> str:
         """Process document input and extract text content, return text string"""
         try:
@@ -109,7 +206,11 @@ RESPONSE FORMAT:
             raise
 
     def _build_user_prompt(
-        self, document_input: DocumentInput, document_content: str
+        self,
+        document_input: DocumentInput,
+        document_content: str,
+        config: AnalysisConfig,
+        categories: Optional[Sequence[RiskCategory]] = None,
     ) -> str:
         """Build user prompt with document context"""
         prompt = f"""
@@ -130,8 +231,8 @@ RESPONSE FORMAT:
     {document_content}
 
     SPECIFIC INSTRUCTIONS:
-    1. Identify TOP {settings.DEFAULT_MAX_RISKS} most significant risks
-    2. Focus on risks with score ≥ {settings.DEFAULT_MIN_RISK_SCORE}
+    1. Identify TOP {config.max_risks} most significant risks
+    2. Focus on risks with score ≥ {config.min_risk_score}
     3. Prioritize {document_input.document_type.value.replace('_', ' ')} specific risks
     4. Consider {document_input.company_scale.value if document_input.company_scale else 'SME'} company challenges
     """
@@ -142,12 +243,179 @@ RESPONSE FORMAT:
         if document_input.analysis_focus:
             prompt += f"6. Emphasize: {document_input.analysis_focus}\n"
 
+        detail_instruction = DETAIL_LEVEL_INSTRUCTIONS.get(config.detail_level.value)
+        if detail_instruction:
+            prompt += f"7. {detail_instruction}\n"
+
+        if not config.detailed_mitigation:
+            prompt += "8. Return an empty list of mitigation recommendations for every risk\n"
+
+        if not config.include_evidence:
+            prompt += "9. Return an empty evidence quote for every risk\n"
+
+        if categories:
+            names = ", ".join(category.value for category in categories)
+            prompt += f"10. Only report {names} risks; other categories are analyzed separately\n"
+
         prompt += "\nProvide analysis in the specified JSON format only."
 
         return prompt
 
-    def analyze_document_risks(self, document_input: DocumentInput) -> Dict[str, Any]:
-        """Main method to analyze document and identify risks"""
+    def model_for(self, document_input: DocumentInput) -> str:
+        """Model that serves the request's analysis profile"""
+        return resolve_profile_model(document_input) or self.model
+
+    @staticmethod
+    def shard_config(
+        config: AnalysisConfig, categories: Sequence[RiskCategory]
+    ) -> AnalysisConfig:
+        """Config for one category group, with its share of max_risks plus one
+
+        The spare risk lets a group with many findings contribute more; the
+        engine trims the merged result back to max_risks.
+        """
+        share = math.ceil(config.max_risks * len(categories) / len(RiskCategory)) + 1
+        return config.model_copy(update={"max_risks": min(config.max_risks, share)})
+
+    def _output_budget(self, document_content: str, config: AnalysisConfig) -> int:
+        """Size max_tokens from the expected risk count and the detail level
+
+        Short documents support fewer risks than max_risks, so they get a
+        smaller reservation; rich documents get room for every risk.
+        """
+        if not settings.ADAPTIVE_MAX_TOKENS_ENABLED:
+            return self.max_tokens
+
+        expected_risks = min(
+            config.max_risks,
+            max(3, math.ceil(len(document_content) / settings.OUTPUT_CHARS_PER_RISK)),
+        )
+        per_risk = settings.OUTPUT_TOKENS_PER_RISK * DETAIL_LEVEL_MULTIPLIERS.get(
+            config.detail_level.value, 1.0
+        )
+        if not config.detailed_mitigation:
+            per_risk *= 1 - MITIGATION_TOKEN_SHARE
+        if not config.include_evidence:
+            per_risk *= 1 - EVIDENCE_TOKEN_SHARE
+        if self.compact_output:
+            per_risk *= COMPACT_OUTPUT_TOKEN_FACTOR
+        budget = settings.OUTPUT_TOKENS_BASE + expected_risks * per_risk
+        return int(min(max(budget, settings.OUTPUT_MIN_TOKENS), settings.OUTPUT_MAX_TOKENS))
+
+    async def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        model: str,
+        json_mode: bool = True,
+    ) -> Tuple[str, Optional[str]]:
+        """Make one provider call, returning (content, finish_reason)
+
+        The call is refused up front when the request's API key is out of
+        tokens, and its usage is added to the request context afterwards.
+        """
+        request_context = current_request_context()
+        await usage_service.check_budget(request_context)
+
+        extra_args: Dict[str, Any] = {}
+        if json_mode:
+            extra_args["response_format"] = {"type": "json_object"}
+
+        start = time.perf_counter()
+        try:
+            with lifecycle_service.track_llm_call():
+                response = await self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=self.temperature,
+                    **extra_args,
+                )
+        except asyncio.CancelledError:
+            # The client went away; closing the connection stops the generation
+            metrics_service.increment("llm.cancelled")
+            logger.info(f"Cancelled provider call after {time.perf_counter() - start:.2f}s")
+            raise
+        metrics_service.observe("analysis.provider_seconds", time.perf_counter() - start)
+
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+            completion_tokens = getattr(usage, "completion_tokens", None) or 0
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached_tokens = getattr(details, "cached_tokens", None) or 0
+            request_context.record_usage(
+                model, prompt_tokens, completion_tokens, cached_tokens
+            )
+            metrics_service.observe("analysis.output_tokens", completion_tokens)
+            metrics_service.increment("tokens.prompt", prompt_tokens)
+            metrics_service.increment("tokens.completion", completion_tokens)
+            metrics_service.increment("tokens.cached", cached_tokens)
+
+        choice = response.choices[0]
+        return choice.message.content or "", getattr(choice, "finish_reason", None)
+
+    async def _complete_with_continuation(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        model: str,
+        max_continuations: int,
+    ) -> str:
+        """Call the provider, continuing responses that stop at max_tokens"""
+        content, finish_reason = await self._complete(messages, max_tokens, model)
+
+        continuations = 0
+        while finish_reason == "length" and continuations < max_continuations:
+            continuations += 1
+            metrics_service.increment("analysis.continuations")
+            logger.warning(
+                f"Model response hit max_tokens ({max_tokens}), "
+                f"requesting continuation {continuations}/{max_continuations}"
+            )
+            # The partial JSON is not a valid object, so JSON mode is off here
+            continuation, finish_reason = await self._complete(
+                messages
+                + [
+                    {"role": "assistant", "content": content},
+                    {"role": "user", "content": CONTINUATION_PROMPT},
+                ],
+                max_tokens,
+                model,
+                json_mode=False,
+            )
+            content = response_parser.stitch(content, continuation)
+
+        if finish_reason == "length":
+            logger.warning(
+                f"Model response still truncated after {continuations} continuation(s), "
+                f"salvaging complete risks"
+            )
+
+        return content
+
+    def get_document_content(self, document_input: DocumentInput) -> str:
+        """Get the text to analyze (extracting it from the file if needed)"""
+        document_content = self._process_document_input(document_input)
+
+        # Validate content length
+        if len(document_content.strip()) < 50:
+            raise ValueError("Document content must be at least 50 characters long")
+
+        return document_content
+
+    async def analyze_document_risks(
+        self,
+        document_input: DocumentInput,
+        document_content: Optional[str] = None,
+        categories: Optional[Sequence[RiskCategory]] = None,
+    ) -> Dict[str, Any]:
+        """Main method to analyze document and identify risks
+
+        When document_content is given it is analyzed instead of the input's own
+        content, e.g. a single chunk of a revised document. When categories is
+        given only those categories are requested, with a matching output budget.
+        """
         try:
             logger.info(
                 f"Starting risk analysis for document type: {document_input.document_type.value}, "
@@ -157,31 +425,67 @@ RESPONSE FORMAT:
             )
 
             # Process document input (extract text from file if needed)
-            document_content = self._process_document_input(document_input)
+            if document_content is None:
+                document_content = await asyncio.to_thread(
+                    self.get_document_content, document_input
+                )
 
-            # Validate content length
-            if len(document_content.strip()) < 50:
-                raise ValueError("Document content must be at least 50 characters long")
+            # Keep only the most risk-relevant passages of an over-long document
+            selection = None
+            if (
+                settings.PASSAGE_SELECTION_ENABLED
+                and passage_selector.estimate_tokens(document_content)
+                > settings.PROMPT_DOCUMENT_TOKEN_BUDGET
+            ):
+                selection = passage_selector.select(
+                    document_content, settings.PROMPT_DOCUMENT_TOKEN_BUDGET
+                )
+                document_content = selection.text
+                metrics_service.observe(
+                    "analysis.selection.signal_coverage", selection.coverage.signal_coverage
+                )
+                logger.info(
+                    f"Selected {selection.coverage.passages_kept}/"
+                    f"{selection.coverage.passages_total} passages "
+                    f"({selection.coverage.selected_tokens}/"
+                    f"{selection.coverage.original_tokens} tokens, "
+                    f"{selection.coverage.signal_coverage:.0%} of risk signals)"
+                )
 
-            # Build prompts
-            system_prompt = self._build_system_prompt()
-            user_prompt = self._build_user_prompt(document_input, document_content)
+            # Build prompts for the request's profile and overrides
+            config = resolve_analysis_config(document_input)
+            if categories:
+                config = self.shard_config(config, categories)
+            system_prompt = self._build_system_prompt(categories)
+            user_prompt = self._build_user_prompt(
+                document_input, document_content, config, categories
+            )
 
-            # Call DeepSeek API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
+            # Call DeepSeek API with an output budget sized for this request
+            max_tokens = self._output_budget(document_content, config)
+            metrics_service.observe("analysis.output_budget_tokens", max_tokens)
+            content = await self._complete_with_continuation(
+                [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt},
                 ],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                response_format={"type": "json_object"},
+                max_tokens,
+                self.model_for(document_input),
+                resolve_max_continuations(document_input),
             )
 
-            # Parse Response
-            content = response.choices[0].message.content
-            risk_data = json.loads(content)
+            # Parse Response (salvaging complete risks from truncated output)
+            risk_data, salvaged = response_parser.parse(content)
+            if is_compact_response(risk_data):
+                risk_data = expand_compact_response(risk_data)
+            if salvaged:
+                risk_data["risks_salvaged"] = len(risk_data.get("identified_risks", []))
+                metrics_service.increment("analysis.parse.salvaged")
+                metrics_service.increment(
+                    "analysis.parse.risks_salvaged", risk_data["risks_salvaged"]
+                )
+            if selection is not None:
+                risk_data["passage_selection"] = selection.coverage.model_dump()
 
             logger.info(
                 f"Successfully analyzed document, found {len(risk_data.get('identified_risks', []))} risks"
@@ -189,7 +493,11 @@ RESPONSE FORMAT:
 
             return risk_data
 
+        except TokenBudgetExceededError:
+            raise
+
         except json.JSONDecodeError as e:
+            metrics_service.increment("analysis.parse.failed")
             logger.error(f"Failed to parse DeepSeek JSON response: {e}")
             raise ValueError("Invalid JSON response from AI model")
 
@@ -200,7 +508,7 @@ RESPONSE FORMAT:
     async def validate_api_connection(self) -> bool:
         """Test DeepSeek API connection"""
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": "Test connection"}],
                 max_tokens=10,
@@ -217,6 +525,9 @@ RESPONSE FORMAT:
             "provider": "DeepSeek",
             "model": self.model,
             "max_tokens": self.max_tokens,
+            "adaptive_max_tokens": settings.ADAPTIVE_MAX_TOKENS_ENABLED,
+            "output_max_tokens": settings.OUTPUT_MAX_TOKENS,
+            "compact_output": self.compact_output,
             "temperature": self.temperature,
             "api_configured": bool(getattr(settings, "DEEPSEEK_API_KEY", None)),
         }
@@ -0,0 +1,215 @@
+import math
+import re
+from typing import List, NamedTuple, Tuple
+
+from app.models import PassageCoverage
+
+
+# Rough English average; good enough to size a prompt without a tokenizer
+CHARS_PER_TOKEN = 4
+
+# Passages longer than this are split at sentence ends, and sentences longer
+# than this at whitespace
+MAX_PASSAGE_CHARS = 1200
+
+# Marks text left out between two kept passages
+OMISSION_MARKER = "[...]"
+
+# Words added to every passage's length so a single hit in a one-line
+# passage does not outrank a paragraph full of signals
+DENSITY_SMOOTHING_WORDS = 20
+
+# Extra score for the opening passage, which usually says what the document is
+OPENING_PASSAGE_BONUS = 1.0
+
+# (pattern, weight) per kind of risk signal
+RISK_SIGNALS: List[Tuple[re.Pattern, float]] = [
+    # Financial figures: amounts, percentages, magnitudes
+    (
+        re.compile(
+            r"[$€£¥]\s?\d|\b\d[\d,.]*\s?(?:%|percent|k\b|m\b|bn\b|million|billion|thousand)",
+            re.IGNORECASE,
+        ),
+        2.0,
+    ),
+    # Deadlines and dates
+    (
+        re.compile(
+            r"\b(?:deadline|due|overdue|by (?:the )?end of|within \d+ (?:days|weeks|months)"
+            r"|q[1-4]\b|fy\d{2,4}|(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.? \d"
+            r"|20\d\d\b)",
+            re.IGNORECASE,
+        ),
+        1.5,
+    ),
+    # Negative sentiment and risk language
+    (
+        re.compile(
+            r"\b(?:risk|risks|loss|losses|decline|declining|shortfall|short of|delay|delayed"
+            r"|behind|concern|concerns|worried|fail|failed|failure|problem|problems|issue|issues"
+            r"|tight|churn|debt|default|breach|threat|uncertain|uncertainty|dependen\w*"
+            r"|shortage|unable|cannot|miss|missed|drop|dropped|negative|exposure|vulnerab\w*)\b",
+            re.IGNORECASE,
+        ),
+        1.0,
+    ),
+    # Regulatory and legal terms
+    (
+        re.compile(
+            r"\b(?:regulat\w*|complian\w*|gdpr|hipaa|sox|licen[cs]\w*|permit\w*|audit\w*"
+            r"|legal|lawsuit|litigation|liabilit\w*|contract\w*|sanction\w*|tax\w*|fine|fines"
+            r"|penalt\w*|intellectual property|patent\w*)\b",
+            re.IGNORECASE,
+        ),
+        1.5,
+    ),
+]
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class PassageSelection(NamedTuple):
+    text: str
+    coverage: PassageCoverage
+
+
+class PassageSelector:
+    """Extractive selection of the passages most likely to contain risks
+
+    Long documents are split into passages, each scored locally by the
+    density of risk signals (figures, deadlines, negative and regulatory
+    language). The best passages are packed into the token budget and
+    returned in document order, so the model reads less but keeps the
+    parts that matter.
+    """
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+    @staticmethod
+    def truncate(text: str, max_chars: int) -> str:
+        """Head of text up to max_chars, cut at the last whitespace when there is one"""
+        if len(text) <= max_chars:
+            return text
+        head = text[: max_chars + 1]
+        cut = head.rstrip().rfind(" ")
+        return head[:cut].rstrip() if cut > 0 else text[:max_chars]
+
+    def hard_split(self, text: str) -> List[str]:
+        """Pieces of at most MAX_PASSAGE_CHARS, cut at whitespace where possible"""
+        pieces = []
+        text = _WHITESPACE.sub(" ", text).strip()
+        while len(text) > MAX_PASSAGE_CHARS:
+            piece = self.truncate(text, MAX_PASSAGE_CHARS)
+            pieces.append(piece)
+            text = text[len(piece) :].lstrip()
+        if text:
+            pieces.append(text)
+        return pieces
+
+    def split_passages(self, text: str) -> List[str]:
+        """Paragraphs, with long paragraphs split into groups of sentences
+
+        A sentence longer than MAX_PASSAGE_CHARS (a paragraph with no sentence
+        ends, such as a table or a transcript without punctuation) is split at
+        whitespace, so no passage is ever too large to fit a budget.
+        """
+        passages = []
+        for paragraph in _PARAGRAPH_BREAK.split(text):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if len(paragraph) <= MAX_PASSAGE_CHARS:
+                passages.append(paragraph)
+                continue
+
+            current = ""
+            sentences = [
+                piece
+                for sentence in _SENTENCE_END.split(paragraph)
+                for piece in (
+                    self.hard_split(sentence)
+                    if len(sentence) > MAX_PASSAGE_CHARS
+                    else [sentence]
+                )
+            ]
+            for sentence in sentences:
+                if current and len(current) + len(sentence) + 1 > MAX_PASSAGE_CHARS:
+                    passages.append(current)
+                    current = ""
+                current = f"{current} {sentence}" if current else sentence
+            if current:
+                passages.append(current)
+        return passages
+
+    @staticmethod
+    def signal_score(passage: str) -> float:
+        """Weighted count of risk signals in a passage"""
+        return sum(
+            weight * len(pattern.findall(passage)) for pattern, weight in RISK_SIGNALS
+        )
+
+    def select(self, text: str, budget_tokens: int) -> PassageSelection:
+        """Keep the highest-density passages that fit budget_tokens, in document order"""
+        passages = self.split_passages(text)
+        scores = [self.signal_score(passage) for passage in passages]
+        if passages:
+            scores[0] += OPENING_PASSAGE_BONUS
+
+        densities = [
+            score / (len(passage.split()) + DENSITY_SMOOTHING_WORDS)
+            for passage, score in zip(passages, scores)
+        ]
+        ranked = sorted(range(len(passages)), key=lambda i: densities[i], reverse=True)
+
+        budget_chars = budget_tokens * CHARS_PER_TOKEN
+        separator_chars = len(OMISSION_MARKER) + 4
+        kept: List[int] = []
+        used_chars = 0
+        for index in ranked:
+            cost = len(passages[index]) + separator_chars
+            if used_chars + cost > budget_chars:
+                continue
+            kept.append(index)
+            used_chars += cost
+        kept.sort()
+
+        total_chars = sum(len(passage) for passage in passages) or 1
+        total_signal = sum(scores) or 1.0
+        if not kept and passages:
+            # Budget below one passage: keep the head of the best one rather
+            # than sending nothing
+            best = ranked[0]
+            passages[best] = self.truncate(
+                passages[best], max(budget_chars - separator_chars, 1)
+            )
+            scores[best] = min(scores[best], self.signal_score(passages[best]))
+            kept.append(best)
+
+        parts: List[str] = []
+        previous = -1
+        for index in kept:
+            if index != previous + 1:
+                parts.append(OMISSION_MARKER)
+            parts.append(passages[index])
+            previous = index
+        if kept and previous != len(passages) - 1:
+            parts.append(OMISSION_MARKER)
+        selected_text = "\n\n".join(parts)
+
+        coverage = PassageCoverage(
+            passages_total=len(passages),
+            passages_kept=len(kept),
+            original_tokens=self.estimate_tokens(text),
+            selected_tokens=self.estimate_tokens(selected_text),
+            content_coverage=round(sum(len(passages[i]) for i in kept) / total_chars, 4),
+            signal_coverage=round(sum(scores[i] for i in kept) / total_signal, 4),
+        )
+        return PassageSelection(selected_text, coverage)
+
+
+# Global selector instance
+passage_selector = PassageSelector()
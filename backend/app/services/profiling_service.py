@@ -0,0 +1,210 @@
+import asyncio
+import json
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from types import FrameType
+from typing import Any, Dict, List, Optional
+from loguru import logger
+
+from app.config import settings
+from app.services.metrics_service import metrics_service
+
+# Routes a profile can be requested on
+PROFILED_PATHS = ("/api/v1/analyze", "/api/v1/file-processor/")
+
+# Deeper stacks are cut at the root end
+MAX_STACK_DEPTH = 128
+
+# (module, function) of innermost frames of threads with nothing to do
+IDLE_FRAMES = {
+    ("concurrent.futures.thread", "_worker"),
+    ("threading", "wait"),
+}
+
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _frame_label(frame: FrameType) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+
+
+def _collapse(frame: FrameType) -> Optional[str]:
+    """A thread's stack as root;...;leaf, or None for an idle thread"""
+    if (frame.f_globals.get("__name__"), frame.f_code.co_name) in IDLE_FRAMES:
+        return None
+    labels: List[str] = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class _Sampler(threading.Thread):
+    """Samples the stacks of every other thread until stopped"""
+
+    def __init__(self, interval: float, max_seconds: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+        self._thread_names: Dict[int, str] = {}
+
+    def _thread_name(self, thread_id: int) -> str:
+        if thread_id not in self._thread_names:
+            self._thread_names = {
+                thread.ident: thread.name for thread in threading.enumerate()
+            }
+        return self._thread_names.get(thread_id, f"thread-{thread_id}")
+
+    def run(self) -> None:
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop_event.wait(self.interval) and time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = _collapse(frame)
+                if stack is not None:
+                    self.stacks[f"{self._thread_name(thread_id)};{stack}"] += 1
+            self.samples += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class ProfileCapture:
+    """One request being profiled"""
+
+    def __init__(self, label: str):
+        self.profile_id = uuid.uuid4().hex
+        self.label = label
+        self.created_at = datetime.utcnow()
+        self.started = time.monotonic()
+        self.sampler = _Sampler(
+            settings.PROFILING_SAMPLE_INTERVAL_MS / 1000, settings.PROFILING_MAX_SECONDS
+        )
+
+
+class ProfilingService:
+    """On-demand sampling profiler for single requests
+
+    An admin request to the analyze or file-processor routes with an X-Profile
+    header (or ?profile=1) runs under a sampler thread that records the stacks
+    of all threads in the worker every PROFILING_SAMPLE_INTERVAL_MS. Samples
+    are wall-clock: an event loop waiting on the provider shows up in its
+    selector. Other requests in flight in the same worker are sampled too.
+
+    Profiles are stored as JSON under PROFILING_PATH and rendered as folded
+    stacks (flamegraph.pl, speedscope, inferno). Each worker captures at most
+    one profile at a time and one every PROFILING_MIN_INTERVAL_SECONDS.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active: Optional[ProfileCapture] = None
+        self._last_started: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.PROFILING_ENABLED
+
+    @staticmethod
+    def covers(path: str) -> bool:
+        return any(
+            path == prefix or (prefix.endswith("/") and path.startswith(prefix))
+            for prefix in PROFILED_PATHS
+        )
+
+    def start(self, label: str) -> Optional[ProfileCapture]:
+        """Start profiling a request, or None when the rate limit says not now"""
+        with self._lock:
+            now = time.monotonic()
+            if self._active is not None or (
+                self._last_started is not None
+                and now - self._last_started < settings.PROFILING_MIN_INTERVAL_SECONDS
+            ):
+                metrics_service.increment("profiling.rate_limited")
+                return None
+            capture = ProfileCapture(label)
+            self._active = capture
+            self._last_started = now
+
+        capture.sampler.start()
+        logger.info(f"Profiling {label} as {capture.profile_id}")
+        return capture
+
+    async def finish(
+        self, capture: ProfileCapture, status_code: Optional[int] = None
+    ) -> None:
+        """Stop sampling and store the profile"""
+        try:
+            await asyncio.to_thread(capture.sampler.stop)
+            record = {
+                "profile_id": capture.profile_id,
+                "label": capture.label,
+                "created_at": capture.created_at.isoformat(),
+                "duration_seconds": round(time.monotonic() - capture.started, 3),
+                "interval_ms": settings.PROFILING_SAMPLE_INTERVAL_MS,
+                "samples": capture.sampler.samples,
+                "status_code": status_code,
+                "stacks": dict(capture.sampler.stacks.most_common()),
+            }
+            await asyncio.to_thread(self._save, record)
+            metrics_service.increment("profiling.captured")
+            metrics_service.observe("profiling.samples", record["samples"])
+        except Exception as e:
+            logger.warning(f"Failed to store profile {capture.profile_id}: {e}")
+        finally:
+            with self._lock:
+                self._active = None
+
+    def _save(self, record: Dict[str, Any]) -> None:
+        directory = Path(settings.PROFILING_PATH)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{record['profile_id']}.json"
+        path.write_text(json.dumps(record), encoding="utf-8")
+
+        stored = sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for old in stored[: max(0, len(stored) - settings.PROFILING_MAX_STORED)]:
+            old.unlink(missing_ok=True)
+
+    def get_profile(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = Path(settings.PROFILING_PATH) / f"{profile_id}.json"
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """Stored profiles without their stacks, newest first"""
+        directory = Path(settings.PROFILING_PATH)
+        if not directory.is_dir():
+            return []
+        profiles = []
+        for path in directory.glob("*.json"):
+            try:
+                record = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                continue
+            record.pop("stacks", None)
+            profiles.append(record)
+        return sorted(profiles, key=lambda record: record["created_at"], reverse=True)
+
+    @staticmethod
+    def folded(record: Dict[str, Any]) -> str:
+        """Folded stacks, one "frame;frame;frame count" line per stack"""
+        return "".join(f"{stack} {count}\n" for stack, count in record["stacks"].items())
+
+
+# Global profiler instance
+profiling_service = ProfilingService()
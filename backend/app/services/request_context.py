@@ -0,0 +1,102 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Dict, Iterator, Optional
+
+from app.config import settings
+from app.models import RequestPriority, TokenUsage
+
+if TYPE_CHECKING:
+    from app.services.fault_injection import FaultPlan
+
+
+class RequestContext:
+    """Who a request's work is scheduled for, how long it queued and what it spent
+
+    Bound once per HTTP request; tasks spawned for the request (e.g. incremental
+    chunk calls) copy the binding, so they share this object and its timings.
+    """
+
+    def __init__(
+        self,
+        tenant: str = "anonymous",
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+    ):
+        self.tenant = tenant
+        self.priority = priority
+        self.queue_wait_seconds = 0.0
+        self.usage_by_model: Dict[str, TokenUsage] = {}
+        # Provider faults requested for this request (non-production testing)
+        self.faults: Optional["FaultPlan"] = None
+        # Whether the request was made with one of ADMIN_API_KEYS
+        self.is_admin = False
+
+    @property
+    def queue_wait_ms(self) -> int:
+        return int(self.queue_wait_seconds * 1000)
+
+    def record_usage(
+        self, model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int
+    ) -> None:
+        """Add one provider call's token counts"""
+        usage = self.usage_by_model.setdefault(model, TokenUsage())
+        usage.calls += 1
+        usage.prompt_tokens += prompt_tokens
+        usage.completion_tokens += completion_tokens
+        usage.cached_tokens += cached_tokens
+        usage.total_tokens += prompt_tokens + completion_tokens
+
+    @property
+    def total_usage(self) -> TokenUsage:
+        """Token counts summed over all models"""
+        total = TokenUsage()
+        for usage in self.usage_by_model.values():
+            total.calls += usage.calls
+            total.prompt_tokens += usage.prompt_tokens
+            total.completion_tokens += usage.completion_tokens
+            total.cached_tokens += usage.cached_tokens
+            total.total_tokens += usage.total_tokens
+        return total
+
+
+_current_context: ContextVar[Optional[RequestContext]] = ContextVar(
+    "request_context", default=None
+)
+
+
+def is_admin_api_key(api_key: Optional[str]) -> bool:
+    return bool(api_key) and api_key in settings.ADMIN_API_KEYS
+
+
+def is_configured_api_key(api_key: Optional[str]) -> bool:
+    """Whether the key is one the service was configured with"""
+    return bool(api_key) and (
+        api_key == settings.API_KEY
+        or api_key in settings.CLIENT_API_KEYS
+        or api_key in settings.ADMIN_API_KEYS
+    )
+
+
+def tenant_for_api_key(api_key: Optional[str]) -> str:
+    """Identify a tenant by its key prefix, so full keys are never held or logged
+
+    Only configured keys get a tenant of their own. Any other key (accepted
+    when API_KEY_REQUIRED is off) is anonymous, so it cannot pick a fresh
+    fair-share weight or token budget by changing its prefix.
+    """
+    return api_key[:8] if is_configured_api_key(api_key) else "anonymous"
+
+
+def current_request_context() -> RequestContext:
+    """The bound context, or a default interactive one outside a request"""
+    context = _current_context.get()
+    return context if context is not None else RequestContext()
+
+
+@contextmanager
+def bind_request_context(context: RequestContext) -> Iterator[RequestContext]:
+    """Make context current for the duration of the block"""
+    token = _current_context.set(context)
+    try:
+        yield context
+    finally:
+        _current_context.reset(token)
@@ -0,0 +1,174 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+
+from app.models import IdentifiedRisk
+
+
+# Most cut points to try when closing a truncated response
+MAX_SALVAGE_ATTEMPTS = 50
+
+# Repeated text shorter than this is too likely to be a coincidence
+MIN_STITCH_OVERLAP = 8
+MAX_STITCH_OVERLAP = 200
+
+ELLIPSIS = "…"
+
+
+class ModelResponseParser:
+    """Tolerant parser for the JSON returned by the model
+
+    A response cut off at max_tokens is not valid JSON, but everything before
+    the last complete risk object usually is. Instead of discarding the whole
+    call, the parser closes the open arrays/objects after that point and keeps
+    the complete risks.
+    """
+
+    def parse(self, content: Optional[str]) -> Tuple[Dict[str, Any], bool]:
+        """Parse model output, returning (data, salvaged)
+
+        Raises json.JSONDecodeError when nothing usable can be recovered.
+        """
+        text = self._strip_wrapping(content or "")
+
+        try:
+            data, _ = json.JSONDecoder().raw_decode(text)
+            if isinstance(data, dict):
+                return data, False
+        except json.JSONDecodeError:
+            pass
+
+        data = self._salvage(text)
+        if data is None:
+            raise json.JSONDecodeError("No complete JSON object to salvage", text, 0)
+
+        risks = data.get("identified_risks", data.get("r", []))
+        logger.warning(
+            f"Salvaged {len(risks)} risks from a truncated or malformed model response"
+        )
+        return data, True
+
+    @staticmethod
+    def _strip_wrapping(text: str) -> str:
+        """Drop markdown fences or prose around the JSON object"""
+        start = text.find("{")
+        return text[start:] if start >= 0 else text.strip()
+
+    @staticmethod
+    def _cut_points(text: str) -> List[Tuple[int, str]]:
+        """Positions right after a nested risk closes, with the closers still open there"""
+        stack: List[str] = []
+        cut_points: List[Tuple[int, str]] = []
+        in_string = escaped = False
+
+        for index, char in enumerate(text):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+                continue
+
+            if char == '"':
+                in_string = True
+            elif char == "{":
+                stack.append("}")
+            elif char == "[":
+                stack.append("]")
+            elif char in "}]":
+                if not stack or stack[-1] != char:
+                    break
+                stack.pop()
+                if not stack:
+                    break
+                # Objects are risks; arrays directly inside arrays are compact risk rows
+                if char == "}" or stack[-1] == "]":
+                    cut_points.append((index + 1, "".join(reversed(stack))))
+
+        return cut_points
+
+    def _salvage(self, text: str) -> Optional[Dict[str, Any]]:
+        """Close the JSON after the last complete nested risk that parses"""
+        cut_points = self._cut_points(text)
+        for end, closers in reversed(cut_points[-MAX_SALVAGE_ATTEMPTS:]):
+            try:
+                data = json.loads(text[:end] + closers)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(data, dict):
+                return data
+        return None
+
+    def stitch(self, content: str, continuation: str) -> str:
+        """Append a continuation of a response that stopped at max_tokens
+
+        Drops markdown fences and any text the model repeated from the end of
+        the first part. A continuation that restarts the whole object replaces it.
+        """
+        # Whitespace at the start may belong inside a string, so only strip fences
+        if continuation.lstrip().startswith("```"):
+            fenced = continuation.lstrip()
+            continuation = fenced.split("\n", 1)[1] if "\n" in fenced else ""
+        if continuation.rstrip().endswith("```"):
+            continuation = continuation.rstrip()[:-3]
+
+        if continuation.lstrip().startswith("{"):
+            try:
+                json.loads(continuation)
+                return continuation
+            except json.JSONDecodeError:
+                pass
+
+        longest = min(len(content), len(continuation), MAX_STITCH_OVERLAP)
+        for size in range(longest, MIN_STITCH_OVERLAP - 1, -1):
+            if content.endswith(continuation[:size]):
+                continuation = continuation[size:]
+                break
+
+        return content + continuation
+
+    def repair_risk_fields(self, risk_data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+        """Shorten text fields that exceed the IdentifiedRisk limits
+
+        Returns the repaired copy and the number of fields changed.
+        """
+        repaired = dict(risk_data)
+        count = 0
+
+        for field, max_length in _TEXT_FIELD_LIMITS.items():
+            value = repaired.get(field)
+            if isinstance(value, str) and len(value) > max_length:
+                repaired[field] = _shorten(value, max_length)
+                count += 1
+
+        return repaired, count
+
+
+def _max_length(field: str) -> Optional[int]:
+    """Read a field's max_length constraint from the IdentifiedRisk model"""
+    for constraint in IdentifiedRisk.model_fields[field].metadata:
+        max_length = getattr(constraint, "max_length", None)
+        if max_length is not None:
+            return max_length
+    return None
+
+
+_TEXT_FIELD_LIMITS = {
+    field: _max_length(field) for field in ("title", "description", "context_evidence")
+}
+
+
+def _shorten(value: str, max_length: int) -> str:
+    """Cut text at a word boundary so it fits max_length, marking the cut"""
+    limit = max_length - len(ELLIPSIS)
+    cut = value[:limit]
+    space = cut.rfind(" ")
+    if space > limit // 2:
+        cut = cut[:space]
+    return cut.rstrip(" ,;:-") + ELLIPSIS
+
+
+# Global parser instance
+response_parser = ModelResponseParser()
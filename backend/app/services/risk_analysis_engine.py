@@ -1,12 +1,19 @@
+import re
 import time
+import asyncio
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, Awaitable, List, Optional, Tuple, TypeVar
 from collections import Counter
 from loguru import logger
 
 from app.models import (
+    AnalysisConfig,
+    AnalysisProfile,
     DocumentInput,
+    DocumentType,
     RiskAnalysisResponse,
+    AnalysisMetadata,
+    PassageCoverage,
     DocumentAnalysis,
     IdentifiedRisk,
     RiskSummary,
@@ -15,55 +22,547 @@ from app.models import (
     RiskSeverity,
     RiskProbability,
 )
-from app.services.openai_service import openai_service
+from app.services.openai_service import CATEGORY_SHARDS, openai_service
+from app.services.analysis_store import analysis_store
+from app.services.incremental_analysis_service import incremental_analysis_service
+from app.services.near_duplicate_service import near_duplicate_service
+from app.services.metrics_service import metrics_service
+from app.services.admission_service import admission_service, AdmissionRejectedError
+from app.services.response_parser import response_parser
+from app.services.analysis_profiles import resolve_analysis_config, resolve_profile
+from app.services.request_context import current_request_context
+from app.services.usage_service import usage_service, TokenBudgetExceededError
+from app.services.transcript_compactor import transcript_compactor
+from app.services.fault_injection import fault_injector
 from app.config import settings
 
+T = TypeVar("T")
+
 
 class RiskAnalysisEngine:
     """Main engine for comprehensive risk analysis"""
 
     def __init__(self):
         self.openai_service = openai_service
+        self.analysis_store = analysis_store
+        self.incremental_service = incremental_analysis_service
+        self.near_duplicate_service = near_duplicate_service
 
     async def analyze_document(
-        self, document_input: DocumentInput
+        self, document_input: DocumentInput, deadline: Optional[float] = None
     ) -> RiskAnalysisResponse:
-        """Main method to perform complete risk analysis"""
+        """Main method to perform complete risk analysis
+
+        deadline is an absolute time.monotonic() value. When given, the engine
+        picks a strategy expected to finish in time and, if time still runs out,
+        returns the best degraded result available instead of failing.
+        """
         start_time = time.time()
+        budget_ms = (
+            int((deadline - time.monotonic()) * 1000) if deadline is not None else None
+        )
+        response: Optional[RiskAnalysisResponse] = None
 
         try:
             logger.info(
                 f"Starting risk analysis for {document_input.document_type.value}"
+                + (f" with a {budget_ms}ms deadline" if budget_ms is not None else "")
             )
 
-            # Step 1: Analyze document content
-            ai_response = self.openai_service.analyze_document_risks(document_input)
-
-            # Step 2: Process AI response into structured analysis
-            document_analysis = self._create_document_analysis(document_input)
-            identified_risks = self._process_identified_risks(
-                ai_response.get("identified_risks", [])
+            # Step 1: Get the document text (extracting it from the file if needed)
+            document_content = await self._get_document_content(document_input)
+            compaction = None
+            if (
+                settings.TRANSCRIPT_COMPACTION_ENABLED
+                and document_input.document_type == DocumentType.MEETING_TRANSCRIPT
+            ):
+                compacted = transcript_compactor.compact(document_content)
+                if compacted is not None:
+                    document_content, compaction = compacted
+                    metrics_service.observe(
+                        "analysis.transcript.token_reduction", compaction.token_reduction
+                    )
+                    logger.info(
+                        f"Compacted transcript from {compaction.original_tokens} to "
+                        f"{compaction.compacted_tokens} tokens "
+                        f"({compaction.turns_kept}/{compaction.turns_total} turns kept)"
+                    )
+
+            # Step 2: Reuse a stored analysis of a near-duplicate document
+            # (revision-aware requests want their edits analyzed, so they skip reuse;
+            # fault-injected requests must reach the provider and are never reused)
+            fingerprint = None
+            if self._near_duplicate_enabled and not fault_injector.faults_active():
+                fingerprint = self.near_duplicate_service.fingerprint(document_content)
+            if fingerprint is not None and not document_input.incremental:
+                reused = await self._reuse_near_duplicate(
+                    document_input, fingerprint, start_time
+                )
+                if reused is not None:
+                    return reused
+
+            # Step 3: Pick a strategy that fits the deadline
+            strategy, analysis_input, analysis_content = "full", document_input, document_content
+            if deadline is not None:
+                strategy, analysis_input, analysis_content = self._plan_for_deadline(
+                    document_input, document_content, deadline
+                )
+                metrics_service.increment(f"analysis.deadline.{strategy}")
+
+            # Step 4: Analyze document content (bounded by the deadline)
+            progress: Dict[str, Dict[str, Any]] = {}
+            result = None
+            if strategy != "none":
+                result = await self._run_until_deadline(
+                    self._run_analysis(analysis_input, analysis_content, progress),
+                    deadline,
+                )
+            if result is None:
+                response = await self._degraded_response(
+                    document_input,
+                    fingerprint,
+                    self._analysis_mode(analysis_input),
+                    progress,
+                    start_time,
+                    budget_ms,
+                )
+                return response
+            ai_response, metadata = result
+            metadata.transcript_compaction = compaction
+
+            if deadline is not None:
+                metadata.degraded = metadata.degraded or strategy != "full"
+                metadata.strategy = strategy
+                metadata.deadline_ms = budget_ms
+
+            # Step 5: Process AI response into the final response object
+            response = self._build_response(
+                analysis_input, ai_response, metadata, start_time
             )
-            risk_summary = self._create_risk_summary(identified_risks, ai_response)
 
-            # Step 3: Calculate processing time
-            processing_time = time.time() - start_time
-
-            # Step 4: Create final response object
-            response = RiskAnalysisResponse(
-                document_analysis=document_analysis,
-                identified_risk=identified_risks,
-                risk_summary=risk_summary,
-                processing_time=processing_time,
+            # Step 6: Persist the analysis for history queries (degraded results
+            # are not offered for near-duplicate reuse)
+            await self._persist_analysis(
+                response, document_input, None if metadata.degraded else fingerprint
             )
 
-            logger.info(f"Risk analysis completed in {processing_time:.2f}s")
+            metrics_service.increment(f"analysis.mode.{metadata.analysis_mode}")
+            metrics_service.observe("analysis.duration_seconds", response.processing_time)
+
+            logger.info(f"Risk analysis completed in {response.processing_time:.2f}s")
             return response
 
+        except asyncio.CancelledError:
+            # Client disconnected; bulkhead slots and provider calls are released
+            metrics_service.increment("analysis.cancelled")
+            logger.info(
+                f"Risk analysis cancelled after {time.time() - start_time:.2f}s"
+            )
+            raise
+
         except Exception as e:
+            metrics_service.increment("analysis.failed")
             logger.error(f"Risk analysis failed: {e}")
             raise
 
+        finally:
+            # Tokens are spent whether or not the analysis succeeded
+            await usage_service.record(
+                current_request_context(),
+                document_input.document_type.value,
+                response.analysis_id if response is not None else None,
+            )
+
+    @staticmethod
+    def _analysis_mode(document_input: DocumentInput) -> str:
+        """How _run_analysis will analyze the input (incremental, sharded or full)"""
+        if document_input.incremental:
+            return "incremental"
+        if resolve_analysis_config(document_input).category_sharding:
+            return "sharded"
+        return "full"
+
+    async def _run_analysis(
+        self,
+        document_input: DocumentInput,
+        document_content: str,
+        progress: Dict[str, Dict[str, Any]],
+    ) -> Tuple[Dict[str, Any], AnalysisMetadata]:
+        """Run the model analysis (incremental, sharded or in a single call)"""
+        mode = self._analysis_mode(document_input)
+        if mode == "incremental":
+            return await self.incremental_service.analyze(
+                document_input, document_content, progress
+            )
+
+        if mode == "sharded":
+            return await self._run_sharded(document_input, document_content, progress)
+
+        async with admission_service.llm_slot():
+            ai_response = await self.openai_service.analyze_document_risks(
+                document_input, document_content
+            )
+        return ai_response, AnalysisMetadata()
+
+    async def _run_sharded(
+        self,
+        document_input: DocumentInput,
+        document_content: str,
+        progress: Dict[str, Dict[str, Any]],
+    ) -> Tuple[Dict[str, Any], AnalysisMetadata]:
+        """Analyze each category group in its own concurrent completion
+
+        Each output is a fraction of a full response, so the wall-clock time
+        follows the slowest group. Groups that fail are skipped, marking the result
+        degraded, unless all do; overload and budget errors fail the request.
+        """
+
+        async def analyze_shard(categories: Tuple[RiskCategory, ...]) -> Dict[str, Any]:
+            async with admission_service.llm_slot():
+                findings = await self.openai_service.analyze_document_risks(
+                    document_input, document_content, categories
+                )
+            # Another group owns risks outside this one's categories
+            risks = findings.get("identified_risks", [])
+            findings["identified_risks"] = [
+                risk
+                for risk in risks
+                if self._map_risk_category(str(risk.get("category") or "")) in categories
+            ]
+            dropped = len(risks) - len(findings["identified_risks"])
+            if dropped:
+                metrics_service.increment("analysis.shards.off_category_risks", dropped)
+            progress["+".join(category.value for category in categories)] = findings
+            return findings
+
+        results = await asyncio.gather(
+            *(analyze_shard(categories) for categories in CATEGORY_SHARDS),
+            return_exceptions=True,
+        )
+
+        findings = [result for result in results if not isinstance(result, BaseException)]
+        failures = [result for result in results if isinstance(result, BaseException)]
+        for failure in failures:
+            # Cancellation, overload and spent budgets fail the whole request
+            if isinstance(
+                failure,
+                (asyncio.CancelledError, AdmissionRejectedError, TokenBudgetExceededError),
+            ):
+                raise failure
+        if not findings:
+            raise failures[0]
+        if failures:
+            metrics_service.increment("analysis.shards.failed", len(failures))
+            logger.warning(
+                f"{len(failures)} of {len(CATEGORY_SHARDS)} category shards failed: {failures[0]}"
+            )
+
+        metadata = AnalysisMetadata(
+            analysis_mode="sharded",
+            shards_total=len(CATEGORY_SHARDS),
+            shards_failed=len(failures),
+            # Categories of failed groups are missing from the findings
+            degraded=bool(failures),
+        )
+        return self._merge_shard_findings(findings), metadata
+
+    def _merge_shard_findings(self, findings: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Merge category-group responses, dropping risks reported by two groups
+
+        Duplicates share a title or quote the same evidence; the higher-scored
+        copy is kept.
+        """
+        merged = self.incremental_service.merge_findings(findings)
+
+        risks_by_evidence: Dict[str, Dict[str, Any]] = {}
+        unique_risks = []
+        for risk in sorted(
+            merged["identified_risks"], key=self._raw_risk_score, reverse=True
+        ):
+            evidence = " ".join(
+                re.findall(r"[a-z0-9]+", str(risk.get("context_evidence") or "").lower())
+            )
+            if evidence and evidence in risks_by_evidence:
+                continue
+            if evidence:
+                risks_by_evidence[evidence] = risk
+            unique_risks.append(risk)
+
+        merged["identified_risks"] = [
+            {**risk, "risk_id": f"RISK_{index + 1:03d}"}
+            for index, risk in enumerate(unique_risks)
+        ]
+        merged["industry_insights"] = next(
+            (f["industry_insights"] for f in findings if f.get("industry_insights")), ""
+        )
+        # Every shard saw the same selected passages
+        if findings[0].get("passage_selection"):
+            merged["passage_selection"] = findings[0]["passage_selection"]
+        return merged
+
+    @staticmethod
+    def _raw_risk_score(risk: Dict[str, Any]) -> float:
+        """Numeric score of an unprocessed risk, 0 when missing or malformed"""
+        try:
+            return float(risk.get("risk_score") or 0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _build_response(
+        self,
+        document_input: DocumentInput,
+        ai_response: Dict[str, Any],
+        metadata: AnalysisMetadata,
+        start_time: float,
+    ) -> RiskAnalysisResponse:
+        """Turn a model response into a RiskAnalysisResponse"""
+        config = resolve_analysis_config(document_input)
+        identified_risks, fields_repaired = self._process_identified_risks(
+            ai_response.get("identified_risks", []), config
+        )
+        metadata.analysis_profile = resolve_profile(document_input).value
+        metadata.model = self.openai_service.model_for(document_input)
+        metadata.prompt_version = self.openai_service.prompt_version
+        metadata.risks_salvaged = ai_response.get("risks_salvaged", 0)
+        if ai_response.get("passage_selection"):
+            metadata.passage_selection = PassageCoverage(
+                **ai_response["passage_selection"]
+            )
+        metadata.fields_repaired = fields_repaired
+        metadata.faults_injected = fault_injector.faults_active()
+        request_context = current_request_context()
+        metadata.priority = request_context.priority.value
+        metadata.queue_wait_ms = request_context.queue_wait_ms
+        if request_context.usage_by_model:
+            metadata.token_usage = request_context.total_usage
+
+        return RiskAnalysisResponse(
+            document_analysis=self._create_document_analysis(document_input),
+            identified_risk=identified_risks,
+            risk_summary=self._create_risk_summary(identified_risks, ai_response),
+            processing_time=time.time() - start_time,
+            metadata=metadata,
+        )
+
+    def _plan_for_deadline(
+        self, document_input: DocumentInput, document_content: str, deadline: float
+    ) -> Tuple[str, DocumentInput, str]:
+        """Choose the most complete strategy expected to finish before the deadline
+
+        Returns the strategy name with the input and text to analyze. The
+        expected duration comes from the LLM bulkhead's queue and service time.
+        """
+        remaining = deadline - time.monotonic() - settings.DEADLINE_SAFETY_MARGIN
+        if remaining < settings.DEADLINE_MIN_LLM_SECONDS:
+            return "none", document_input, document_content
+
+        expected = admission_service.llm.expected_seconds()
+        if remaining >= expected or document_input.incremental:
+            # Incremental requests keep their chunk cache and fall back to partial results
+            return "full", document_input, document_content
+
+        fast_input = document_input
+        if resolve_profile(document_input) != AnalysisProfile.FAST:
+            fast_input = document_input.model_copy(
+                update={"analysis_profile": AnalysisProfile.FAST}
+            )
+            expected *= settings.DEADLINE_FAST_MODEL_SPEEDUP
+        if remaining >= expected:
+            return "fast_model", fast_input, document_content
+
+        keep_chars = max(
+            settings.DEADLINE_MIN_DOCUMENT_CHARS,
+            int(len(document_content) * remaining / expected),
+        )
+        if keep_chars >= len(document_content):
+            return "fast_model", fast_input, document_content
+        return "truncated", fast_input, self._truncate_document(document_content, keep_chars)
+
+    @staticmethod
+    def _truncate_document(document_content: str, max_chars: int) -> str:
+        """Keep the start of a document, cutting at a paragraph or sentence end"""
+        head = document_content[:max_chars]
+        for separator in ("\n\n", ". ", "\n"):
+            cut = head.rfind(separator)
+            if cut > max_chars // 2:
+                return head[: cut + len(separator)].rstrip()
+        return head
+
+    async def _run_until_deadline(
+        self, work: Awaitable[T], deadline: Optional[float]
+    ) -> Optional[T]:
+        """Await work, cancelling it and returning None when the deadline passes"""
+        if deadline is None:
+            return await work
+
+        remaining = deadline - time.monotonic() - settings.DEADLINE_SAFETY_MARGIN
+        try:
+            return await asyncio.wait_for(work, timeout=max(0.0, remaining))
+        except asyncio.TimeoutError:
+            metrics_service.increment("analysis.deadline_exceeded")
+            logger.warning("Analysis deadline reached, returning a degraded result")
+            return None
+
+    async def _degraded_response(
+        self,
+        document_input: DocumentInput,
+        fingerprint: Optional[int],
+        mode: str,
+        progress: Dict[str, Dict[str, Any]],
+        start_time: float,
+        budget_ms: Optional[int],
+    ) -> RiskAnalysisResponse:
+        """Best result available when out of time
+
+        In order of preference: a stored analysis of a similar document (with a
+        relaxed threshold), the chunks or category groups analyzed so far (as
+        filled into progress by the given analysis mode), or an empty result.
+        """
+        response = None
+        if fingerprint is not None:
+            response = await self._reuse_near_duplicate(
+                document_input,
+                fingerprint,
+                start_time,
+                threshold=settings.DEADLINE_NEAR_DUPLICATE_THRESHOLD,
+                degraded=True,
+            )
+            if response is not None:
+                response.metadata.deadline_ms = budget_ms
+                return response
+
+        if progress and mode == "sharded":
+            ai_response = self._merge_shard_findings(list(progress.values()))
+            metadata = AnalysisMetadata(
+                analysis_mode="sharded",
+                shards_total=len(CATEGORY_SHARDS),
+                shards_failed=len(CATEGORY_SHARDS) - len(progress),
+            )
+            strategy = "partial"
+        elif progress:
+            ai_response = self.incremental_service.merge_findings(list(progress.values()))
+            metadata = AnalysisMetadata(
+                analysis_mode="incremental", chunks_reused=len(progress)
+            )
+            strategy = "partial"
+        else:
+            ai_response = {}
+            metadata = AnalysisMetadata()
+            strategy = "none"
+
+        metadata.degraded = True
+        metadata.strategy = strategy
+        metadata.deadline_ms = budget_ms
+        response = self._build_response(document_input, ai_response, metadata, start_time)
+
+        if response.identified_risk:
+            await self._persist_analysis(response, document_input, None)
+
+        metrics_service.increment(f"analysis.degraded.{strategy}")
+        logger.info(
+            f"Returning degraded ({strategy}) result with "
+            f"{len(response.identified_risk)} risks after {response.processing_time:.2f}s"
+        )
+        return response
+
+    async def _get_document_content(self, document_input: DocumentInput) -> str:
+        """Get the document text, extracting files inside the extraction bulkhead"""
+        if not document_input.file_data:
+            return self.openai_service.get_document_content(document_input)
+
+        async with admission_service.extraction_slot():
+            return await asyncio.to_thread(
+                self.openai_service.get_document_content, document_input
+            )
+
+    @property
+    def _near_duplicate_enabled(self) -> bool:
+        # Reuse needs the stored analyses to return
+        return settings.NEAR_DUPLICATE_ENABLED and settings.ANALYSIS_HISTORY_ENABLED
+
+    async def _reuse_near_duplicate(
+        self,
+        document_input: DocumentInput,
+        fingerprint: int,
+        start_time: float,
+        threshold: Optional[float] = None,
+        degraded: bool = False,
+    ) -> Optional[RiskAnalysisResponse]:
+        """Return an adapted copy of a stored near-duplicate analysis, if any"""
+        try:
+            match = await asyncio.to_thread(
+                self.near_duplicate_service.find_match,
+                document_input,
+                fingerprint,
+                self.openai_service.model_for(document_input),
+                threshold,
+            )
+            if match is None:
+                return None
+
+            analysis_id, similarity = match
+            stored = await asyncio.to_thread(
+                self.analysis_store.get_analysis, analysis_id
+            )
+        except Exception as e:
+            logger.warning(f"Near-duplicate lookup failed: {e}")
+            return None
+
+        if stored is None:
+            return None
+
+        # Keep the stored findings but describe the document actually submitted
+        response = RiskAnalysisResponse(
+            document_analysis=self._create_document_analysis(document_input),
+            identified_risk=stored.identified_risk,
+            risk_summary=stored.risk_summary,
+            processing_time=time.time() - start_time,
+            metadata=AnalysisMetadata(
+                analysis_mode="reused",
+                reused_from=analysis_id,
+                similarity=round(similarity, 4),
+                analysis_profile=resolve_profile(document_input).value,
+                model=self.openai_service.model_for(document_input),
+                degraded=degraded,
+                strategy="near_duplicate" if degraded else None,
+            ),
+        )
+        await self._persist_analysis(response, document_input, None)
+
+        metrics_service.increment("analysis.mode.reused")
+        metrics_service.observe("analysis.duration_seconds", response.processing_time)
+
+        logger.info(
+            f"Reused analysis {analysis_id} for near-duplicate document "
+            f"in {response.processing_time:.2f}s"
+        )
+        return response
+
+    async def _persist_analysis(
+        self,
+        response: RiskAnalysisResponse,
+        document_input: DocumentInput,
+        fingerprint: Optional[int],
+    ) -> None:
+        """Store the analysis without failing the request if storage is unavailable"""
+        if not settings.ANALYSIS_HISTORY_ENABLED:
+            return
+
+        try:
+            response.analysis_id = await asyncio.to_thread(
+                self.analysis_store.save_analysis, response
+            )
+            if fingerprint is not None:
+                await asyncio.to_thread(
+                    self.near_duplicate_service.register,
+                    response.analysis_id,
+                    document_input,
+                    fingerprint,
+                    self.openai_service.model_for(document_input),
+                )
+        except Exception as e:
+            logger.warning(f"Failed to persist analysis: {e}")
+
     def _create_document_analysis(
         self, document_input: DocumentInput
     ) -> DocumentAnalysis:
@@ -77,13 +576,20 @@ class RiskAnalysisEngine:
         )
 
     def _process_identified_risks(
-        self, raw_risk: List[Dict[str, Any]]
-    ) -> List[IdentifiedRisk]:
-        """Process and validate identified risks from AI response"""
+        self, raw_risk: List[Dict[str, Any]], config: AnalysisConfig
+    ) -> Tuple[List[IdentifiedRisk], int]:
+        """Process and validate identified risks from AI response
+
+        Returns the risks and the number of over-long fields that were shortened.
+        """
         processed_risks = []
+        fields_repaired = 0
 
         for i, risk_data in enumerate(raw_risk):
             try:
+                # Shorten over-long text fields rather than dropping the risk
+                risk_data, repaired = response_parser.repair_risk_fields(risk_data)
+
                 # Generate risk ID if not provided
                 risk_id = risk_data.get("risk_id", f"RISK_{i+1:03d}")
 
@@ -104,7 +610,7 @@ class RiskAnalysisEngine:
                 )
 
                 # Filter out Low-score risks
-                if risk_score < settings.DEFAULT_MIN_RISK_SCORE:
+                if risk_score < config.min_risk_score:
                     continue
 
                 # Create IdentifiedRisk object
@@ -119,13 +625,16 @@ class RiskAnalysisEngine:
                     impact_areas=risk_data.get("impact_areas", []),
                     mitigation_recommendations=risk_data.get(
                         "mitigation_recommendations", []
-                    ),
-                    context_evidence=risk_data.get("context_evidence", "")[
-                        :200
-                    ],  # Limit length
+                    )
+                    if config.detailed_mitigation
+                    else [],
+                    context_evidence=risk_data.get("context_evidence", "")
+                    if config.include_evidence
+                    else None,
                 )
 
                 processed_risks.append(risk)
+                fields_repaired += repaired
 
             except Exception as e:
                 logger.warning(f"Failed to process risk {i+1}: {e}")
@@ -134,8 +643,11 @@ class RiskAnalysisEngine:
         # Sort by risk score (highest first)
         processed_risks.sort(key=lambda x: x.risk_score, reverse=True)
 
+        if fields_repaired:
+            metrics_service.increment("analysis.parse.fields_repaired", fields_repaired)
+
         # limit to max risks
-        return processed_risks[: settings.DEFAULT_MAX_RISKS]
+        return processed_risks[: config.max_risks], fields_repaired
 
     def _create_risk_summary(
         self, risks: List[IdentifiedRisk], ai_response: Dict[str, Any]
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import random
+import re
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+from loguru import logger
+
+from app.config import settings
+from app.models import DocumentInput, DocumentType, RiskAnalysisResponse
+from app.services.metrics_service import metrics_service
+from app.services.transcript_compactor import transcript_compactor
+
+# Version of the record layout, bumped when fields change
+SHADOW_RECORD_VERSION = 1
+
+# Request fields a replay needs; the API key, filename, file bytes and
+# deadline are never recorded
+RECORDED_REQUEST_FIELDS = {
+    "document_content",
+    "document_type",
+    "industry",
+    "company_scale",
+    "analysis_focus",
+    "analysis_profile",
+    "analysis_config",
+}
+
+_EMAIL = re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b")
+_URL = re.compile(r"\b(?:https?://|www\.)[^\s\"'<>]+", re.IGNORECASE)
+_CONTACT_NUMBER = re.compile(r"[+(]?\d[\d \t\u00a0().-]{7,}\d")
+_IBAN = re.compile(r"\b[A-Z]{2}\d{2}(?:\s?[A-Z0-9]{4}){3,7}\b")
+# Thousands groups with optional decimals: 1 200 000, 1.200.000,50, 1 200 000.50
+_GROUPED_AMOUNT = re.compile(r"\d{1,3}(?:[ \u00a0.,]\d{3})+(?:[.,]\d{1,2})?")
+_CURRENCY_BEFORE = re.compile(r"[$€£¥]\s?$")
+_UNIT_AFTER = re.compile(
+    r"^\s?(?:[A-Z]{3}\b|%|[$€£¥]|k\b|m\b|bn\b|million|billion|thousand|percent)",
+    re.IGNORECASE,
+)
+_NUMBER_CONTINUES = re.compile(r"^[.,]\d")
+
+# Fewer digits than this is a year range or an amount, not a phone or account number
+_MIN_IDENTIFIER_DIGITS = 9
+
+
+def _redact_number(match: re.Match) -> str:
+    """[NUMBER] for phone-like or account-like numbers; amounts are kept"""
+    number = match.group()
+    digits = sum(character.isdigit() for character in number)
+    if digits < _MIN_IDENTIFIER_DIGITS:
+        return number
+    # International prefix, area code or trunk prefix: a phone number
+    if number[0] in "+(0":
+        return "[NUMBER]"
+
+    before = match.string[: match.start()]
+    after = match.string[match.end() :]
+    if (
+        _CURRENCY_BEFORE.search(before)
+        or _UNIT_AFTER.match(after)
+        or _NUMBER_CONTINUES.match(after)
+        or before.endswith((",", "."))
+        or _GROUPED_AMOUNT.fullmatch(number)
+    ):
+        return number
+    return "[NUMBER]"
+
+
+def speaker_names(document_input: DocumentInput) -> Dict[str, str]:
+    """Placeholders for the speaker labels of a meeting transcript"""
+    if document_input.document_type != DocumentType.MEETING_TRANSCRIPT:
+        return {}
+    turns = transcript_compactor.parse_turns(document_input.document_content)
+    names: Dict[str, str] = {}
+    for turn in turns:
+        if turn.speaker and turn.speaker not in names:
+            names[turn.speaker] = f"[SPEAKER {len(names) + 1}]"
+    return names
+
+
+def anonymize_text(text: str, names: Optional[Dict[str, str]] = None) -> str:
+    """Replace emails, URLs, IBANs, phone or account numbers and names with placeholders"""
+    text = _EMAIL.sub("[EMAIL]", text)
+    text = _URL.sub("[URL]", text)
+    text = _IBAN.sub("[IBAN]", text)
+    text = _CONTACT_NUMBER.sub(_redact_number, text)
+    if names:
+        pattern = "|".join(
+            re.escape(name) for name in sorted(names, key=len, reverse=True)
+        )
+        text = re.sub(
+            rf"(?<!\w)(?:{pattern})(?!\w)", lambda match: names[match.group()], text
+        )
+    return text
+
+
+def anonymize(value: Any, names: Optional[Dict[str, str]] = None) -> Any:
+    """Anonymize every string inside a JSON-like value"""
+    if isinstance(value, str):
+        return anonymize_text(value, names)
+    if isinstance(value, list):
+        return [anonymize(item, names) for item in value]
+    if isinstance(value, dict):
+        return {key: anonymize(item, names) for key, item in value.items()}
+    return value
+
+
+class ShadowRecorder:
+    """Opt-in recorder of anonymized analyze traffic for offline replay
+
+    Each successful analyze request is appended to SHADOW_RECORDING_PATH as one
+    JSON line with the request options, the analyzed text and the response it
+    got. Emails, URLs, IBANs, phone or account numbers and the speaker labels
+    of transcripts are replaced with placeholders in both. Other names in the
+    text are not detected, so records are scrubbed, not fully anonymous. `python -m app.replay` runs the records against
+    another model, prompt or profile.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.SHADOW_RECORDING_ENABLED
+
+    def build_record(
+        self, document_input: DocumentInput, response: RiskAnalysisResponse
+    ) -> Dict[str, Any]:
+        request = document_input.model_dump(
+            mode="json", include=RECORDED_REQUEST_FIELDS, exclude_none=True
+        )
+        names = speaker_names(document_input)
+        return {
+            "version": SHADOW_RECORD_VERSION,
+            "record_id": uuid.uuid4().hex,
+            "recorded_at": datetime.utcnow().isoformat(),
+            "request": anonymize(request, names),
+            "response": anonymize(response.model_dump(mode="json"), names),
+        }
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        path = Path(settings.SHADOW_RECORDING_PATH)
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("a", encoding="utf-8") as handle:
+                handle.write(line)
+
+    async def record(
+        self, document_input: DocumentInput, response: RiskAnalysisResponse
+    ) -> None:
+        """Record a request and its response when recording is on and sampled"""
+        if not self.enabled or random.random() >= settings.SHADOW_RECORDING_SAMPLE_RATE:
+            return
+        # Degraded, reused and fault-injected results say little about the
+        # model or prompt
+        metadata = response.metadata
+        if (
+            metadata.degraded
+            or metadata.analysis_mode == "reused"
+            or metadata.faults_injected
+        ):
+            return
+
+        try:
+            record = self.build_record(document_input, response)
+            await asyncio.to_thread(self._append, record)
+            metrics_service.increment("shadow.recorded")
+        except Exception as e:
+            logger.warning(f"Failed to record shadow traffic: {e}")
+
+
+# Global recorder instance
+shadow_recorder = ShadowRecorder()
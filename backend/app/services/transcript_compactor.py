@@ -0,0 +1,177 @@
+import re
+from typing import List, NamedTuple, Optional
+
+from app.models import TranscriptCompaction
+from app.services.passage_selector import PassageSelector
+
+
+# Transcripts with fewer labelled turns are left as they are
+MIN_SPEAKER_TURNS = 2
+
+# Turns of at most this many words, all of them back-channel words, are dropped
+MAX_BACKCHANNEL_WORDS = 6
+
+# Listening noises and greetings; never an answer
+BACKCHANNEL_WORDS = {
+    "mhm", "huh", "oh", "hi", "hello", "hey", "morning", "afternoon", "everyone",
+    "all", "bye", "see", "you", "thanks", "thank", "welcome", "so", "well",
+    "and", "for", "joining", "coming", "the", "call",
+}
+
+# Acknowledgements: back-channel while someone talks, but an answer (and
+# often a decision) right after another speaker's question
+ACKNOWLEDGEMENT_WORDS = {
+    "yeah", "yep", "yes", "ok", "okay", "right", "sure", "got", "it", "great",
+    "cool", "good", "nice", "exactly", "alright", "totally", "absolutely",
+    "true", "perfect", "fine", "correct",
+}
+
+# Caption cue numbers, cue timings and file headers
+_CAPTION_LINE = re.compile(
+    r"^\s*(?:\d+|WEBVTT.*|NOTE\b.*|[\d:.,]+\s*-->\s*[\d:.,]+.*)\s*$"
+)
+# A timestamp at the start of a line: 00:01:23, [12:30], (1:02:03.500), 10:15 AM
+_LEADING_TIMESTAMP = re.compile(
+    r"^\s*[\[(]?\d{1,2}:\d{2}(?::\d{2})?(?:[.,]\d{1,3})?(?:\s*[AaPp]\.?[Mm]\.?)?[\])]?"
+    r"\s*[-–]?\s*"
+)
+_SPEAKER_NAME = r"[A-Z][\w.'’-]*(?:\s+[A-Z0-9][\w.'’-]*){0,3}|[Ss]peaker\s*\d+"
+# "Alice: text", "[Alice] text", "Alice (00:01:23): text"
+_SPEAKER_LABEL = re.compile(
+    rf"^(?:\[(?P<bracketed>[^\]]{{1,40}})\]:?|(?P<name>{_SPEAKER_NAME})\s*(?:\([^)]*\))?\s*:)"
+    r"\s*(?P<text>.*)$"
+)
+# A name and timestamp alone on a line, with the turn's text on the next lines
+_SPEAKER_HEADER = re.compile(
+    rf"^(?P<name>{_SPEAKER_NAME})\s+[\[(]?\d{{1,2}}:\d{{2}}(?::\d{{2}})?[\])]?\s*$"
+)
+# WebVTT voice tags: <v Alice>text</v>
+_VOICE_TAG = re.compile(r"^<v(?:\.[\w.]+)?\s+(?P<name>[^>]+)>(?P<text>.*?)(?:</v>)?$")
+
+# Fillers take a comma before or after them along, so "we are, uh, behind" reads
+# "we are behind"; discourse markers only count when set off by a comma
+_FILLER = re.compile(
+    r"(?:,\s*)?\b(?:u+m+|u+h+|e+r+m*|a+h+|h+m+|m+h*m+|uh-huh|mm-hmm)\b,?"
+    r"|(?:,\s*)?\b(?:you know|i mean|like|basically|literally)\b,",
+    re.IGNORECASE,
+)
+_REPEATED_WORD = re.compile(r"\b(\w+)(?:[\s,]+\1\b)+", re.IGNORECASE)
+_SPACE_BEFORE_PUNCTUATION = re.compile(r"\s+([,.;:!?])")
+_DUPLICATE_PUNCTUATION = re.compile(r"([,.;:!?])[,.;:]+")
+_LEADING_PUNCTUATION = re.compile(r"^[\s,.;:-]+")
+_WORD = re.compile(r"[a-z']+")
+
+
+class Turn(NamedTuple):
+    speaker: Optional[str]
+    text: str
+
+
+class CompactedTranscript(NamedTuple):
+    text: str
+    compaction: TranscriptCompaction
+
+
+class TranscriptCompactor:
+    """Compacts meeting transcripts into one line per speaker turn
+
+    Timestamps, caption cues and filler words are removed, back-channel and
+    greeting turns ("mhm", "thanks everyone") are dropped, and consecutive
+    turns by the same speaker are merged, so the model reads what was said
+    rather than how it was said.
+    """
+
+    def parse_turns(self, text: str) -> List[Turn]:
+        """Speaker turns in order; unlabelled lines continue the previous turn"""
+        turns: List[Turn] = []
+        speaker: Optional[str] = None
+        for line in text.splitlines():
+            if not line.strip() or _CAPTION_LINE.match(line):
+                continue
+            line = _LEADING_TIMESTAMP.sub("", line, count=1).strip()
+
+            header = _SPEAKER_HEADER.match(line)
+            if header:
+                speaker = header.group("name")
+                turns.append(Turn(speaker, ""))
+                continue
+
+            label = _VOICE_TAG.match(line) or _SPEAKER_LABEL.match(line)
+            if label:
+                speaker = label.groupdict().get("bracketed") or label.group("name")
+                speaker = speaker.strip()
+                turns.append(Turn(speaker, label.group("text").strip()))
+            elif turns and turns[-1].speaker == speaker:
+                previous = turns[-1]
+                turns[-1] = Turn(speaker, f"{previous.text} {line}".strip())
+            else:
+                turns.append(Turn(speaker, line))
+        return turns
+
+    @staticmethod
+    def clean_text(text: str) -> str:
+        """Remove filler words and stutters from a turn's text"""
+        text = _FILLER.sub("", text)
+        text = _REPEATED_WORD.sub(r"\1", text)
+        text = " ".join(text.split())
+        text = _SPACE_BEFORE_PUNCTUATION.sub(r"\1", text)
+        text = _DUPLICATE_PUNCTUATION.sub(r"\1", text)
+        text = _LEADING_PUNCTUATION.sub("", text)
+        return text[:1].upper() + text[1:]
+
+    @staticmethod
+    def is_backchannel(text: str, answers_question: bool = False) -> bool:
+        """Whether a turn says nothing; acknowledgements count unless they answer"""
+        words = _WORD.findall(text.lower())
+        if len(words) > MAX_BACKCHANNEL_WORDS:
+            return False
+        if answers_question:
+            return all(word in BACKCHANNEL_WORDS for word in words)
+        return all(
+            word in BACKCHANNEL_WORDS or word in ACKNOWLEDGEMENT_WORDS
+            for word in words
+        )
+
+    def compact(self, text: str) -> Optional[CompactedTranscript]:
+        """Compact form of a transcript, or None if no speaker turns were found"""
+        turns = self.parse_turns(text)
+        if sum(1 for turn in turns if turn.speaker) < MIN_SPEAKER_TURNS:
+            return None
+
+        kept: List[Turn] = []
+        for turn in turns:
+            cleaned = self.clean_text(turn.text)
+            answers_question = bool(
+                kept
+                and kept[-1].speaker != turn.speaker
+                and kept[-1].text.rstrip().endswith("?")
+            )
+            if self.is_backchannel(cleaned, answers_question):
+                continue
+            if kept and kept[-1].speaker == turn.speaker:
+                kept[-1] = Turn(turn.speaker, f"{kept[-1].text} {cleaned}")
+            else:
+                kept.append(Turn(turn.speaker, cleaned))
+
+        compacted = "\n".join(
+            f"{turn.speaker}: {turn.text}" if turn.speaker else turn.text for turn in kept
+        )
+        original_tokens = PassageSelector.estimate_tokens(text)
+        compacted_tokens = PassageSelector.estimate_tokens(compacted)
+        return CompactedTranscript(
+            compacted,
+            TranscriptCompaction(
+                turns_total=len(turns),
+                turns_kept=len(kept),
+                speakers=len({turn.speaker for turn in kept if turn.speaker}),
+                original_tokens=original_tokens,
+                compacted_tokens=compacted_tokens,
+                token_reduction=round(
+                    1 - compacted_tokens / original_tokens if original_tokens else 0.0, 4
+                ),
+            ),
+        )
+
+
+# Global compactor instance
+transcript_compactor = TranscriptCompactor()
@@ -0,0 +1,134 @@
+import asyncio
+import math
+import time
+from typing import Any, Dict, Optional, Tuple
+from loguru import logger
+
+from app.config import settings
+from app.services.analysis_store import analysis_store
+from app.services.metrics_service import metrics_service
+from app.services.request_context import RequestContext
+
+
+class TokenBudgetExceededError(Exception):
+    """Raised before a provider call when an API key has used its token budget"""
+
+    def __init__(self, tenant: str, budget: int, used: int, retry_after: int):
+        self.tenant = tenant
+        self.budget = budget
+        self.used = used
+        self.retry_after = retry_after
+        super().__init__(
+            f"Token budget of {budget} tokens for this API key is used up ({used} used). "
+            f"Retry after {retry_after}s."
+        )
+
+
+class UsageService:
+    """Token accounting per API key, model and document type, with optional budgets
+
+    Budgets apply to fixed periods of TOKEN_BUDGET_PERIOD_HOURS. A key's stored
+    total for the period is cached briefly and combined with the tokens the
+    current request has used so far, so the check before each call stays cheap.
+    """
+
+    def __init__(self):
+        self.analysis_store = analysis_store
+        # tenant -> (period start, loaded at, tokens used in the period)
+        self._period_totals: Dict[str, Tuple[float, float, int]] = {}
+
+    @staticmethod
+    def _period_bounds(now: Optional[float] = None) -> Tuple[float, float]:
+        period = max(1, settings.TOKEN_BUDGET_PERIOD_HOURS) * 3600
+        now = time.time() if now is None else now
+        start = now - now % period
+        return start, start + period
+
+    async def _tokens_used(self, tenant: str) -> int:
+        """Tokens the tenant used this period, refreshed from the store when stale"""
+        period_start, _ = self._period_bounds()
+        cached = self._period_totals.get(tenant)
+        now = time.monotonic()
+        if (
+            cached is not None
+            and cached[0] == period_start
+            and now - cached[1] < settings.TOKEN_BUDGET_REFRESH_SECONDS
+        ):
+            return cached[2]
+
+        used = await asyncio.to_thread(
+            self.analysis_store.get_token_total, tenant, period_start
+        )
+        self._period_totals[tenant] = (period_start, now, used)
+        return used
+
+    async def check_budget(self, context: RequestContext) -> None:
+        """Raise TokenBudgetExceededError if the context's API key is out of tokens"""
+        budget = settings.API_KEY_TOKEN_BUDGETS.get(context.tenant)
+        if budget is None or not settings.TOKEN_ACCOUNTING_ENABLED:
+            return
+
+        used = await self._tokens_used(context.tenant)
+        # Tokens this request used that are not stored yet
+        used += context.total_usage.total_tokens
+        if used >= budget:
+            _, period_end = self._period_bounds()
+            retry_after = max(1, math.ceil(period_end - time.time()))
+            metrics_service.increment("usage.budget_rejected")
+            logger.warning(
+                f"Token budget exhausted for key {context.tenant}: {used}/{budget}"
+            )
+            raise TokenBudgetExceededError(context.tenant, budget, used, retry_after)
+
+    async def record(
+        self,
+        context: RequestContext,
+        document_type: str,
+        analysis_id: Optional[str] = None,
+    ) -> None:
+        """Store the usage the context gathered since it was last recorded"""
+        if not settings.TOKEN_ACCOUNTING_ENABLED or not context.usage_by_model:
+            return
+
+        usage_by_model = context.usage_by_model
+        tokens = context.total_usage.total_tokens
+        context.usage_by_model = {}
+
+        try:
+            await asyncio.to_thread(
+                self.analysis_store.save_token_usage,
+                context.tenant,
+                document_type,
+                usage_by_model,
+                analysis_id,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to record token usage: {e}")
+            return
+
+        period_start, _ = self._period_bounds()
+        cached = self._period_totals.get(context.tenant)
+        if cached is not None and cached[0] == period_start:
+            self._period_totals[context.tenant] = (
+                cached[0],
+                cached[1],
+                cached[2] + tokens,
+            )
+
+    async def preload(self) -> None:
+        """Load this period's totals for every key with a budget"""
+        if not settings.TOKEN_ACCOUNTING_ENABLED:
+            return
+        for tenant in settings.API_KEY_TOKEN_BUDGETS:
+            await self._tokens_used(tenant)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.TOKEN_ACCOUNTING_ENABLED,
+            "budgets": len(settings.API_KEY_TOKEN_BUDGETS),
+            "budget_period_hours": settings.TOKEN_BUDGET_PERIOD_HOURS,
+        }
+
+
+# Global usage instance
+usage_service = UsageService()
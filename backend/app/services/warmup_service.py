@@ -0,0 +1,185 @@
+import asyncio
+import base64
+import io
+import time
+import zipfile
+from typing import Any, Awaitable, Callable, Dict, Optional
+from loguru import logger
+
+from app.config import settings
+from app.services.analysis_store import analysis_store
+from app.services.file_processing_service import FileProcessorService
+from app.services.metrics_service import metrics_service
+from app.services.openai_service import openai_service
+from app.services.usage_service import usage_service
+
+SAMPLE_TEXT = "Warm-up sample: revenue fell 10% and the contract expires in March."
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    "</Types>"
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+    "</Relationships>"
+)
+_DOCX_DOCUMENT = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+    "<w:body><w:p><w:r><w:t>{text}</w:t></w:r></w:p>"
+    "<w:tbl><w:tr><w:tc><w:p><w:r><w:t>Risk</w:t></w:r></w:p></w:tc>"
+    "<w:tc><w:p><w:r><w:t>High</w:t></w:r></w:p></w:tc></w:tr></w:tbl>"
+    "</w:body></w:document>"
+)
+
+
+def _sample_pdf() -> bytes:
+    """A one-page PDF with a line of text"""
+    stream = f"BT /F1 10 Tf 10 20 Td ({SAMPLE_TEXT}) Tj ET".encode("latin-1")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 500 50] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = io.BytesIO()
+    pdf.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(pdf.tell())
+        pdf.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = pdf.tell()
+    pdf.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        pdf.write(b"%010d 00000 n \n" % offset)
+    pdf.write(
+        b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+        % (len(objects) + 1, xref)
+    )
+    return pdf.getvalue()
+
+
+def _sample_docx() -> bytes:
+    """A minimal DOCX with a paragraph and a one-row table"""
+    docx = io.BytesIO()
+    with zipfile.ZipFile(docx, "w") as package:
+        package.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        package.writestr("_rels/.rels", _DOCX_RELS)
+        package.writestr("word/document.xml", _DOCX_DOCUMENT.format(text=SAMPLE_TEXT))
+    return docx.getvalue()
+
+
+class WarmupService:
+    """Warms a worker up before it reports ready
+
+    Opens pooled connections to the provider, imports the file parsers and runs
+    them on tiny embedded samples, and optionally loads hot cache entries, so
+    the first requests after a deploy do not pay for any of it.
+    """
+
+    def __init__(self):
+        self.openai_service = openai_service
+        self.analysis_store = analysis_store
+        self._ready = False
+        self._started_at: Optional[float] = None
+        self._duration: Optional[float] = None
+        self._steps: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready
+
+    async def warm_up(self) -> None:
+        """Run the warm-up steps, then mark the worker ready
+
+        A failed or slow step is logged and does not keep the worker out of
+        rotation; a cancelled warm-up (shutdown) never marks it ready.
+        """
+        if not settings.WARMUP_ENABLED:
+            self._ready = True
+            return
+
+        self._started_at = time.time()
+        steps: Dict[str, Callable[[], Awaitable[None]]] = {
+            "provider": self._connect_provider,
+            "parsers": self._prime_parsers,
+        }
+        if settings.WARMUP_PRELOAD_CACHES:
+            steps["caches"] = self._preload_caches
+
+        logger.info(f"Warming up: {', '.join(steps)}")
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(self._run_step(name, step) for name, step in steps.items())),
+                settings.WARMUP_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Warm-up did not finish within {settings.WARMUP_TIMEOUT_SECONDS}s"
+            )
+
+        self._duration = time.time() - self._started_at
+        self._ready = True
+        metrics_service.observe("warmup.duration_seconds", self._duration)
+        logger.info(f"Warm-up finished in {self._duration:.2f}s, ready for traffic")
+
+    async def _run_step(self, name: str, step: Callable[[], Awaitable[None]]) -> None:
+        start = time.time()
+        try:
+            await step()
+            self._steps[name] = {"ok": True}
+        except Exception as e:
+            logger.warning(f"Warm-up step '{name}' failed: {e}")
+            self._steps[name] = {"ok": False, "error": str(e)}
+        self._steps[name]["seconds"] = round(time.time() - start, 3)
+
+    async def _connect_provider(self) -> None:
+        """Open pooled TLS connections to the provider without spending tokens"""
+        if not settings.OPENAI_API_KEY:
+            return
+        client = self.openai_service.client
+        await asyncio.gather(
+            *(
+                client.models.list()
+                for _ in range(max(1, settings.WARMUP_PROVIDER_CONNECTIONS))
+            )
+        )
+
+    async def _prime_parsers(self) -> None:
+        """Import the PDF and DOCX parsers and extract the embedded samples"""
+        await asyncio.to_thread(self._extract_samples)
+
+    @staticmethod
+    def _extract_samples() -> None:
+        for file_type, sample in (("pdf", _sample_pdf()), ("docx", _sample_docx())):
+            FileProcessorService.extract_text_from_base64(
+                base64.b64encode(sample).decode("utf-8"), file_type, f"warmup.{file_type}"
+            )
+
+    async def _preload_caches(self) -> None:
+        """Open the store and load the token totals of keys with budgets"""
+        await asyncio.to_thread(self.analysis_store.get_stats)
+        await usage_service.preload()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.WARMUP_ENABLED,
+            "ready": self._ready,
+            "started_at": self._started_at,
+            "duration_seconds": (
+                round(self._duration, 3) if self._duration is not None else None
+            ),
+            "steps": self._steps,
+        }
+
+
+# Global warm-up instance
+warmup_service = WarmupService()
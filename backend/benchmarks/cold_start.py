@@ -0,0 +1,100 @@
+"""
+Cold start benchmark for scale-to-zero deployments.
+
+Measures, each in a fresh interpreter:
+- import time of ``app.main``
+- startup time: import + lifespan startup + first ``/ping`` response
+
+and checks that heavy optional libraries are not imported at startup.
+Exits with status 1 when a budget is exceeded, so it can guard CI.
+
+Usage (from the backend directory):
+    python benchmarks/cold_start.py
+    python benchmarks/cold_start.py --runs 7 --max-import-ms 800 --max-startup-ms 1500
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Libraries that must only be imported when they are actually needed
+DEFERRED_MODULES = ["openai", "pypdf", "docx", "uvicorn"]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (DEFERRED_MODULES,)
+
+STARTUP_SCRIPT = """
+import json, time
+start = time.perf_counter()
+from fastapi.testclient import TestClient
+import app.main
+with TestClient(app.main.app) as client:
+    response = client.get("/ping")
+    assert response.status_code == 200, response.status_code
+    elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": elapsed}))
+"""
+
+
+def run_script(script: str) -> dict:
+    """Run a snippet in a fresh interpreter and return its JSON output"""
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "benchmark-placeholder-key")
+    env.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    env["PYTHONPATH"] = str(BACKEND_DIR)
+
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=1000.0)
+    parser.add_argument("--max-startup-ms", type=float, default=2000.0)
+    args = parser.parse_args()
+
+    import_runs = [run_script(IMPORT_SCRIPT) for _ in range(args.runs)]
+    startup_runs = [run_script(STARTUP_SCRIPT) for _ in range(args.runs)]
+
+    import_ms = statistics.median(run["ms"] for run in import_runs)
+    startup_ms = statistics.median(run["ms"] for run in startup_runs)
+    loaded = sorted({module for run in import_runs for module in run["loaded"]})
+
+    print(f"import app.main   median {import_ms:8.1f} ms (budget {args.max_import_ms:.0f} ms)")
+    print(f"startup + /ping   median {startup_ms:8.1f} ms (budget {args.max_startup_ms:.0f} ms)")
+    print(f"deferred modules loaded at import: {loaded or 'none'}")
+
+    failures = []
+    if import_ms > args.max_import_ms:
+        failures.append("import time over budget")
+    if startup_ms > args.max_startup_ms:
+        failures.append("startup time over budget")
+    if loaded:
+        failures.append(f"deferred modules imported eagerly: {', '.join(loaded)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
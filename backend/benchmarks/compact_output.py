@@ -0,0 +1,110 @@
+"""
+A/B benchmark for the compact model output schema.
+
+Runs the same analysis against the configured provider with the regular and
+the compact output schema, alternating between them, and reports output
+tokens, latency and risks found for each. Needs a real OPENAI_API_KEY.
+
+Usage (from the backend directory):
+    python benchmarks/compact_output.py
+    python benchmarks/compact_output.py --runs 5 --document path/to/plan.txt --profile fast
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.models import AnalysisProfile, DocumentInput, DocumentType, CompanyScale  # noqa: E402
+from app.services import metrics_service, openai_service  # noqa: E402
+
+SAMPLE_DOCUMENT = """
+Business plan summary: we intend to open three new regional warehouses next year,
+financed with a short-term credit line that must be renegotiated every six months.
+Our largest customer accounts for 45% of revenue and its contract ends in March.
+The logistics software we rely on is an unsupported legacy system maintained by a
+single contractor. We plan to expand into two EU markets without local legal advice,
+and new data protection rules will apply to the customer records we collect there.
+Hiring has been slow: the operations team is down four people and overtime costs are
+rising. Fuel prices are volatile and our delivery contracts have fixed pricing.
+A competitor recently launched same-day delivery in our core region at lower prices.
+"""
+
+
+async def run_once(document_input: DocumentInput, compact: bool) -> dict:
+    """Analyze the document once and collect the provider-side numbers"""
+    openai_service.compact_output = compact
+    metrics_service.reset()
+
+    start = time.perf_counter()
+    risk_data = await openai_service.analyze_document_risks(document_input)
+    elapsed = time.perf_counter() - start
+
+    output_tokens = metrics_service.snapshot()["observations"].get("analysis.output_tokens", {})
+    return {
+        "seconds": elapsed,
+        "output_tokens": output_tokens.get("avg", 0) * output_tokens.get("count", 0),
+        "risks": len(risk_data.get("identified_risks", [])),
+    }
+
+
+async def run_all(document_input: DocumentInput, runs: int) -> dict:
+    """Alternate the modes so provider-side drift affects both equally"""
+    results = {False: [], True: []}
+    for _ in range(runs):
+        for compact in (False, True):
+            results[compact].append(await run_once(document_input, compact))
+    return results
+
+
+def summarize(label: str, runs: list) -> dict:
+    summary = {
+        "tokens": statistics.median(run["output_tokens"] for run in runs),
+        "seconds": statistics.median(run["seconds"] for run in runs),
+        "risks": statistics.median(run["risks"] for run in runs),
+    }
+    print(
+        f"{label:<8} median output tokens {summary['tokens']:7.0f}   "
+        f"median latency {summary['seconds']:6.2f} s   median risks {summary['risks']:4.1f}"
+    )
+    return summary
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compact output schema A/B benchmark")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--document", type=Path, default=None)
+    parser.add_argument(
+        "--profile", choices=[profile.value for profile in AnalysisProfile], default="standard"
+    )
+    args = parser.parse_args()
+
+    content = args.document.read_text() if args.document else SAMPLE_DOCUMENT.strip()
+    document_input = DocumentInput(
+        document_content=content,
+        document_type=DocumentType.BUSINESS_PLAN,
+        company_scale=CompanyScale.MEDIUM,
+        industry="logistics",
+        analysis_profile=AnalysisProfile(args.profile),
+    )
+
+    results = asyncio.run(run_all(document_input, args.runs))
+
+    regular = summarize("regular", results[False])
+    compact = summarize("compact", results[True])
+
+    if regular["tokens"] and regular["seconds"]:
+        print(
+            f"savings  output tokens {1 - compact['tokens'] / regular['tokens']:7.1%}   "
+            f"latency {1 - compact['seconds'] / regular['seconds']:14.1%}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import os
+
+# Settings require a provider key; tests never call the provider
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
@@ -0,0 +1,250 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.models import RequestPriority
+from app.services.admission_service import (
+    AdmissionRejectedError,
+    Bulkhead,
+    FairQueue,
+)
+from app.services.request_context import RequestContext, bind_request_context
+
+INTERACTIVE = RequestPriority.INTERACTIVE
+BATCH = RequestPriority.BATCH
+BACKGROUND = RequestPriority.BACKGROUND
+
+
+@pytest.fixture(autouse=True)
+def weights(monkeypatch):
+    monkeypatch.setattr(
+        settings,
+        "PRIORITY_WEIGHTS",
+        {"interactive": 8.0, "batch": 2.0, "background": 1.0},
+    )
+    monkeypatch.setattr(settings, "API_KEY_WEIGHTS", {})
+
+
+def drain(queue):
+    order = []
+    while len(queue):
+        order.append(queue.pop())
+    return order
+
+
+def push_all(queue, waiters):
+    """Push (name, tenant, priority) waiters in order; the name is the waiter"""
+    for name, tenant, priority in waiters:
+        queue.push(name, RequestContext(tenant, priority))
+
+
+class TestFairQueue:
+    def test_interactive_overtakes_a_batch_backlog(self):
+        queue = FairQueue()
+        push_all(queue, [(f"batch{i}", "a", BATCH) for i in range(4)])
+        push_all(queue, [("interactive", "a", INTERACTIVE)])
+        assert drain(queue) == ["interactive", "batch0", "batch1", "batch2", "batch3"]
+
+    def test_mixed_priorities_and_tenants_follow_finish_tags(self):
+        queue = FairQueue()
+        push_all(
+            queue,
+            [
+                ("a-bg", "a", BACKGROUND),  # tag 1
+                ("a-batch1", "a", BATCH),  # tag 0.5
+                ("a-batch2", "a", BATCH),  # tag 1.0
+                ("b-int1", "b", INTERACTIVE),  # tag 0.125
+                ("b-int2", "b", INTERACTIVE),  # tag 0.25
+                ("c-batch", "c", BATCH),  # tag 0.5
+            ],
+        )
+        # Equal tags are served in arrival order
+        assert drain(queue) == [
+            "b-int1", "b-int2", "a-batch1", "c-batch", "a-bg", "a-batch2"
+        ]
+
+    def test_background_advances_behind_interactive_load(self):
+        queue = FairQueue()
+        push_all(queue, [("bg", "a", BACKGROUND)])
+        push_all(queue, [(f"int{i}", "b", INTERACTIVE) for i in range(20)])
+        # Background's tag of 1 ties with the 8th interactive one and arrived first
+        assert drain(queue).index("bg") == 7
+
+    def test_equal_tenants_share_equally(self):
+        queue = FairQueue()
+        push_all(queue, [("a", "a", BATCH)] * 10)
+        push_all(queue, [("b", "b", BATCH)] * 10)
+        order = drain(queue)
+        assert order[:6] == ["a", "b", "a", "b", "a", "b"]
+        for served in range(2, 21, 2):
+            assert order[:served].count("a") == order[:served].count("b")
+
+    def test_tenant_weight_scales_the_share(self, monkeypatch):
+        monkeypatch.setattr(settings, "API_KEY_WEIGHTS", {"big": 3.0})
+        queue = FairQueue()
+        push_all(queue, [("small", "small", BATCH)] * 8)
+        push_all(queue, [("big", "big", BATCH)] * 8)
+        assert drain(queue)[:8].count("big") == 6
+
+    def test_late_flow_gets_no_credit_for_idle_time(self):
+        queue = FairQueue()
+        push_all(queue, [("a", "a", BATCH)] * 6)
+        served = [queue.pop() for _ in range(4)]
+        push_all(queue, [("b", "b", BATCH)] * 2)
+        # b starts at the virtual clock, so it alternates with a's remainder
+        assert served + drain(queue) == ["a"] * 4 + ["a", "b", "a", "b"]
+
+    def test_removed_waiter_is_not_served(self):
+        queue = FairQueue()
+        push_all(queue, [("a", "a", BATCH), ("b", "b", BATCH), ("c", "c", BATCH)])
+        queue.remove("b")
+        assert drain(queue) == ["a", "c"]
+
+
+async def hold(bulkhead, context, acquired, release, order=None, name=None):
+    with bind_request_context(context):
+        async with bulkhead.acquire():
+            if order is not None:
+                order.append(name)
+            acquired.set()
+            await release.wait()
+
+
+def make_bulkhead(max_queue=10, service_time=1.0):
+    return Bulkhead(
+        "test", max_concurrent=1, max_queue=max_queue, initial_service_time=service_time
+    )
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestBulkhead:
+    @pytest.mark.asyncio
+    async def test_waiters_get_the_slot_in_fair_share_order(self):
+        bulkhead = make_bulkhead()
+        release = asyncio.Event()
+        holder_acquired = asyncio.Event()
+        holder = asyncio.create_task(
+            hold(bulkhead, RequestContext("a"), holder_acquired, asyncio.Event())
+        )
+        await holder_acquired.wait()
+
+        order = []
+        waiters = [
+            asyncio.create_task(
+                hold(
+                    bulkhead,
+                    RequestContext(tenant, priority),
+                    asyncio.Event(),
+                    release,
+                    order,
+                    f"{tenant}-{priority.value}",
+                )
+            )
+            for tenant, priority in [
+                ("a", BACKGROUND), ("a", BATCH), ("b", INTERACTIVE), ("c", BATCH)
+            ]
+        ]
+        await settle()
+        assert bulkhead.queued == 4
+
+        release.set()
+        holder.cancel()
+        await asyncio.gather(*waiters)
+        assert order == ["b-interactive", "a-batch", "c-batch", "a-background"]
+        assert bulkhead.active == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        bulkhead = make_bulkhead()
+        acquired, release = asyncio.Event(), asyncio.Event()
+        holder = asyncio.create_task(
+            hold(bulkhead, RequestContext(), acquired, release)
+        )
+        await acquired.wait()
+
+        waiter = asyncio.create_task(
+            hold(bulkhead, RequestContext(), asyncio.Event(), asyncio.Event())
+        )
+        await settle()
+        assert bulkhead.queued == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert bulkhead.queued == 0
+
+        release.set()
+        await holder
+        assert bulkhead.active == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_holder_releases_its_slot(self):
+        bulkhead = make_bulkhead()
+        acquired = asyncio.Event()
+        holder = asyncio.create_task(
+            hold(bulkhead, RequestContext(), acquired, asyncio.Event())
+        )
+        await acquired.wait()
+        assert bulkhead.active == 1
+
+        holder.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await holder
+        assert bulkhead.active == 0
+
+    @pytest.mark.asyncio
+    async def test_slot_handed_to_a_cancelled_waiter_passes_on(self):
+        bulkhead = make_bulkhead()
+        # A holder is inside its block
+        bulkhead.active = 1
+
+        first_acquired, second_acquired = asyncio.Event(), asyncio.Event()
+        second_release = asyncio.Event()
+        first = asyncio.create_task(
+            hold(bulkhead, RequestContext(), first_acquired, asyncio.Event())
+        )
+        await settle()
+        second = asyncio.create_task(
+            hold(bulkhead, RequestContext(), second_acquired, second_release)
+        )
+        await settle()
+
+        # Leaving the holder's block hands the slot to the first waiter, which
+        # is cancelled before it gets to run
+        bulkhead._release()
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert not first_acquired.is_set()
+
+        await asyncio.wait_for(second_acquired.wait(), timeout=1)
+        assert bulkhead.active == 1
+        second_release.set()
+        await second
+        assert bulkhead.active == 0
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects(self):
+        bulkhead = make_bulkhead(max_queue=1, service_time=2)
+        acquired, release = asyncio.Event(), asyncio.Event()
+        holder = asyncio.create_task(
+            hold(bulkhead, RequestContext(), acquired, release)
+        )
+        await acquired.wait()
+        waiter = asyncio.create_task(
+            hold(bulkhead, RequestContext(), asyncio.Event(), release)
+        )
+        await settle()
+
+        with pytest.raises(AdmissionRejectedError) as rejected:
+            async with bulkhead.acquire():
+                pass
+        assert rejected.value.retry_after == 4
+
+        release.set()
+        await asyncio.gather(holder, waiter)
+        assert bulkhead.active == 0
@@ -0,0 +1,17 @@
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+
+
+def test_ready_needs_no_api_key(monkeypatch):
+    monkeypatch.setattr(settings, "API_KEY_REQUIRED", True)
+    # Without the lifespan, warm-up has not run and the worker is not ready
+    response = TestClient(app).get("/ready")
+    assert response.status_code == 503
+    assert response.json()["detail"] == "Service is warming up"
+
+
+def test_other_routes_still_need_an_api_key(monkeypatch):
+    monkeypatch.setattr(settings, "API_KEY_REQUIRED", True)
+    assert TestClient(app).get("/health").status_code in (401, 403)
@@ -0,0 +1,200 @@
+import random
+
+import pytest
+
+from app.models import CompanyScale, DocumentInput, DocumentType
+from app.services.analysis_store import AnalysisStore
+from app.services.fault_injection import fault_injector
+from app.services.incremental_analysis_service import (
+    MIN_ANALYZABLE_CHUNK_CHARS,
+    ContentDefinedChunker,
+    IncrementalAnalysisService,
+)
+
+MIN_CHARS, MAX_CHARS = 300, 900
+
+WORDS = (
+    "revenue margin supplier contract churn audit deadline cash runway hiring "
+    "pricing launch backlog license budget forecast pipeline vendor risk"
+).split()
+
+
+def document(lines=120, seed=7):
+    rng = random.Random(seed)
+    return "".join(
+        f"{index}: " + " ".join(rng.choices(WORDS, k=rng.randint(4, 12))) + ".\n"
+        for index in range(lines)
+    )
+
+
+@pytest.fixture
+def chunker():
+    return ContentDefinedChunker(MIN_CHARS, MAX_CHARS, boundary_divisor=4)
+
+
+@pytest.fixture
+def service():
+    service = IncrementalAnalysisService()
+    service.chunker = ContentDefinedChunker(MIN_CHARS, MAX_CHARS, boundary_divisor=4)
+    service.analysis_store = AnalysisStore("sqlite:///:memory:")
+    service.openai_service = FakeOpenAIService()
+    return service
+
+
+class FakeOpenAIService:
+    def __init__(self):
+        self.chunks = []
+        self.risks_salvaged = 0
+
+    def model_for(self, document_input):
+        return "test-model"
+
+    async def analyze_document_risks(self, document_input, chunk):
+        self.chunks.append(chunk)
+        title = chunk.split(":", 1)[0]
+        return {
+            "identified_risks": [{"title": f"Risk {title}", "risk_score": 5}],
+            "key_concerns": [],
+            "risks_salvaged": self.risks_salvaged,
+        }
+
+
+def document_input(content):
+    return DocumentInput(
+        document_content=content,
+        document_type=DocumentType.BUSINESS_PLAN,
+        company_scale=CompanyScale.SMALL,
+        industry="technology",
+    )
+
+
+def cache_keys(service, content):
+    context_key = service._context_key(document_input(content))
+    chunks = service.chunker.chunk(content)
+    return [service._cache_key(context_key, chunk) for chunk in chunks]
+
+
+class TestChunker:
+    def test_chunks_cover_the_text(self, chunker):
+        text = document()
+        assert "".join(chunker.chunk(text)) == text
+
+    def test_chunk_sizes_stay_within_bounds(self, chunker):
+        for seed in range(20):
+            chunks = chunker.chunk(document(seed=seed))
+            assert all(len(chunk) <= MAX_CHARS for chunk in chunks)
+            assert all(len(chunk) >= MIN_CHARS for chunk in chunks[:-1])
+            assert len(chunks[-1].strip()) >= MIN_ANALYZABLE_CHUNK_CHARS
+
+    def test_long_lines_are_split_to_the_maximum(self, chunker):
+        text = "x" * (MAX_CHARS * 2 + 100) + "\n" + document(lines=20)
+        chunks = chunker.chunk(text)
+        assert "".join(chunks) == text
+        assert all(len(chunk) <= MAX_CHARS for chunk in chunks)
+
+    def test_edit_changes_only_its_own_chunk(self, service):
+        text = document()
+        lines = text.splitlines(keepends=True)
+        original = cache_keys(service, text)
+        assert len(original) >= 5
+
+        # Same length and same boundary decision, so only this chunk may change
+        index = len(lines) // 2
+        edited_line = next(
+            candidate
+            for candidate in (
+                lines[index].replace("risk", word, 1)
+                for word in ("loss", "debt", "fees", "cost", "fine")
+            )
+            if candidate != lines[index]
+            and service.chunker._is_boundary(candidate)
+            == service.chunker._is_boundary(lines[index])
+        )
+        edited = cache_keys(
+            service, "".join(lines[:index] + [edited_line] + lines[index + 1 :])
+        )
+
+        assert len(edited) == len(original)
+        assert sum(a != b for a, b in zip(original, edited)) == 1
+
+    def test_insertion_resynchronizes_after_the_edit(self, service):
+        text = document()
+        lines = text.splitlines(keepends=True)
+        original = cache_keys(service, text)
+
+        index = len(lines) // 2
+        new_line = "A new line about a vendor dispute.\n"
+        lines.insert(index, new_line)
+        edited = cache_keys(service, "".join(lines))
+
+        unchanged = set(original) & set(edited)
+        # At most the chunk with the insertion and its neighbour are new
+        assert len(set(edited) - unchanged) <= 2
+        assert len(unchanged) >= len(original) - 2
+
+
+class TestChunkCache:
+    @pytest.mark.asyncio
+    async def test_second_run_reuses_every_chunk(self, service):
+        content = document()
+        _, first = await service.analyze(document_input(content), content)
+        calls = len(service.openai_service.chunks)
+
+        _, second = await service.analyze(document_input(content), content)
+        assert first.chunks_reused == 0
+        assert second.chunks_reused == second.chunks_total == calls
+        assert len(service.openai_service.chunks) == calls
+
+    @pytest.mark.asyncio
+    async def test_salvaged_findings_are_not_cached(self, service):
+        content = document()
+        service.openai_service.risks_salvaged = 1
+        await service.analyze(document_input(content), content)
+        assert service.analysis_store.get_stats()["cached_chunks"] == 0
+
+        service.openai_service.risks_salvaged = 0
+        _, metadata = await service.analyze(document_input(content), content)
+        assert metadata.chunks_reused == 0
+
+    @pytest.mark.asyncio
+    async def test_fault_injected_runs_skip_the_cache(self, service, monkeypatch):
+        content = document()
+        await service.analyze(document_input(content), content)
+        cached = service.analysis_store.get_stats()["cached_chunks"]
+
+        monkeypatch.setattr(fault_injector, "faults_active", lambda: True)
+        service.analysis_store.save_chunk_findings = pytest.fail
+        _, metadata = await service.analyze(document_input(content), content)
+        assert metadata.chunks_reused == 0
+        assert service.analysis_store.get_stats()["cached_chunks"] == cached
+
+
+class TestMergeFindings:
+    def test_duplicates_by_normalized_title_keep_the_highest_score(self):
+        merged = IncrementalAnalysisService.merge_findings(
+            [
+                {
+                    "identified_risks": [
+                        {"title": "Cash runway", "risk_score": 6},
+                        {"title": "GDPR audit", "risk_score": 4},
+                    ],
+                    "key_concerns": ["cash"],
+                },
+                {
+                    "identified_risks": [
+                        {"title": "cash  RUNWAY!", "risk_score": 8},
+                        {"title": "Supplier delay", "risk_score": "n/a"},
+                    ],
+                    "key_concerns": ["cash", "supplier"],
+                    "risks_salvaged": 1,
+                },
+            ]
+        )
+        risks = merged["identified_risks"]
+        assert [(risk["title"], risk["risk_id"]) for risk in risks] == [
+            ("cash  RUNWAY!", "RISK_001"),
+            ("GDPR audit", "RISK_002"),
+            ("Supplier delay", "RISK_003"),
+        ]
+        assert merged["key_concerns"] == ["cash", "supplier"]
+        assert merged["risks_salvaged"] == 1
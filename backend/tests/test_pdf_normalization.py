@@ -0,0 +1,129 @@
+import pytest
+
+from app.services.file_processing_service import (
+    _encode_docx_table,
+    _normalize_pdf_pages,
+)
+
+docx = pytest.importorskip("docx")
+
+# Distinct page bodies; numbered ones would look like a running header
+BODIES = ["Revenue grew.", "Costs fell.", "Churn rose.", "Debt is due."]
+
+
+def pages_with_body(bodies, header=None, footer=None):
+    pages = []
+    for body in bodies:
+        lines = [header] if header else []
+        lines.append(body)
+        if footer:
+            lines.append(footer)
+        pages.append("\n".join(lines))
+    return pages
+
+
+class TestRunningHeadersAndFooters:
+    def test_removed_from_three_or_more_pages(self):
+        pages = pages_with_body(
+            ["Revenue grew.", "Costs fell.", "Churn rose."],
+            header="ACME Corp - Confidential",
+            footer="Annual Plan 2025",
+        )
+        assert _normalize_pdf_pages(pages) == [
+            "Revenue grew.",
+            "Costs fell.",
+            "Churn rose.",
+        ]
+
+    def test_kept_on_fewer_pages(self):
+        pages = pages_with_body(["Revenue grew.", "Costs fell."], header="ACME Corp")
+        assert _normalize_pdf_pages(pages) == [
+            "ACME Corp\nRevenue grew.",
+            "ACME Corp\nCosts fell.",
+        ]
+
+    def test_headers_with_changing_numbers_count_as_repeated(self):
+        pages = [f"Section {n} of plan\n{body}" for n, body in enumerate(BODIES, 1)]
+        assert _normalize_pdf_pages(pages) == BODIES
+
+
+class TestPageNumbers:
+    @pytest.mark.parametrize(
+        "label", ["Page 1", "page 1 of 1", "1 of 1", "1/1", "- 1 -", "– 1 –"]
+    )
+    def test_labels_are_removed_even_on_one_page(self, label):
+        pages = [f"Revenue grew.\n{label}"]
+        assert _normalize_pdf_pages(pages) == ["Revenue grew."]
+
+    def test_lone_figure_at_the_edge_is_kept(self):
+        pages = ["Units shipped in Q3:\n42"]
+        assert _normalize_pdf_pages(pages) == ["Units shipped in Q3:\n42"]
+
+    def test_figures_that_do_not_count_up_are_kept(self):
+        pages = ["Headcount\n12", "Offices\n12", "Countries\n7"]
+        assert _normalize_pdf_pages(pages) == pages
+
+    def test_bare_sequence_starting_at_an_offset_is_removed(self):
+        # Front matter is unnumbered, so page 1 of the PDF is printed as 5
+        pages = [f"{body}\n{index + 5}" for index, body in enumerate(BODIES)]
+        assert _normalize_pdf_pages(pages) == BODIES
+
+    def test_number_off_the_sequence_is_kept(self):
+        pages = [f"{body}\n{n}" for n, body in enumerate(BODIES[:3], 1)]
+        assert _normalize_pdf_pages(pages + ["Total\n120"]) == BODIES[:3] + [
+            "Total\n120"
+        ]
+
+    def test_sequence_numbers_away_from_the_edges_are_kept(self):
+        pages = [
+            "\n".join([f"{body} {part}" for part in "abc"] + [str(n)])
+            + "\n"
+            + "\n".join(f"{body} {part}" for part in "def")
+            for n, body in enumerate(BODIES, 1)
+        ]
+        assert _normalize_pdf_pages(pages) == pages
+
+
+class TestLayout:
+    def test_dot_leaders_are_squeezed(self):
+        pages = ["Risk factors ........ 12\nOutlook …… 14"]
+        assert _normalize_pdf_pages(pages) == ["Risk factors 12\nOutlook 14"]
+
+    def test_line_end_hyphen_is_kept(self):
+        assert _normalize_pdf_pages(["A risk-\nbased approach"]) == [
+            "A risk-based approach"
+        ]
+
+    def test_blank_lines_and_spacing_are_squeezed(self):
+        assert _normalize_pdf_pages(["Revenue   grew.\n\n\n\nCosts\t fell."]) == [
+            "Revenue grew.\nCosts fell."
+        ]
+
+
+class TestDocxTable:
+    def make_table(self, rows, columns):
+        return docx.Document().add_table(rows=rows, cols=columns)
+
+    def test_rows_are_pipe_separated(self):
+        table = self.make_table(2, 3)
+        values = [("Risk", "Owner", "Due"), ("Churn", "CFO", "Q3")]
+        for row, row_values in zip(table.rows, values):
+            for cell, value in zip(row.cells, row_values):
+                cell.text = value
+        assert _encode_docx_table(table) == "Risk|Owner|Due\nChurn|CFO|Q3"
+
+    def test_merged_cells_are_listed_once(self):
+        table = self.make_table(2, 3)
+        merged = table.cell(0, 0).merge(table.cell(0, 1))
+        merged.text = "Financial risks"
+        table.cell(0, 2).text = "2025"
+        for cell, value in zip(table.rows[1].cells, ("Churn", "High", "Q3")):
+            cell.text = value
+        assert _encode_docx_table(table) == "Financial risks|2025\nChurn|High|Q3"
+
+    def test_empty_cells_keep_their_place_and_trailing_ones_are_dropped(self):
+        table = self.make_table(3, 4)
+        table.cell(0, 0).text = "Churn"
+        table.cell(0, 2).text = "Q3"
+        table.cell(2, 1).text = "Pipe | inside"
+        assert _encode_docx_table(table) == "Churn||Q3\n|Pipe / inside"
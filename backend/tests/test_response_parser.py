@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+from app.services.response_parser import ModelResponseParser
+
+RISK_A = {"title": "Cash runway", "category": "financial", "risk_score": 7.5}
+RISK_B = {"title": "GDPR audit", "category": "regulatory", "risk_score": 6.0}
+
+
+@pytest.fixture
+def parser():
+    return ModelResponseParser()
+
+
+def full_response(*risks):
+    return json.dumps({"identified_risks": list(risks), "key_concerns": ["runway"]})
+
+
+def truncated_after_first_risk():
+    text = full_response(RISK_A, RISK_B)
+    # Cut in the middle of the second risk's title
+    return text[: text.index("GDPR") + 2]
+
+
+class TestParse:
+    def test_valid_json_is_not_salvaged(self, parser):
+        data, salvaged = parser.parse(full_response(RISK_A))
+        assert data["identified_risks"] == [RISK_A]
+        assert not salvaged
+
+    def test_fences_and_prose_are_dropped(self, parser):
+        content = f"Here you go:\n```json\n{full_response(RISK_A)}\n```"
+        data, salvaged = parser.parse(content)
+        assert data["identified_risks"] == [RISK_A]
+        assert not salvaged
+
+    def test_truncated_response_keeps_complete_risks(self, parser):
+        data, salvaged = parser.parse(truncated_after_first_risk())
+        assert salvaged
+        assert data == {"identified_risks": [RISK_A]}
+
+    def test_truncated_compact_rows_are_kept(self, parser):
+        content = '{"r": [["F", 7, "Cash runway"], ["R", 6, "GDPR au'
+        data, salvaged = parser.parse(content)
+        assert salvaged
+        assert data == {"r": [["F", 7, "Cash runway"]]}
+
+    @pytest.mark.parametrize(
+        "content", [None, "", "no json here", '{"identified_risks": [{"ti']
+    )
+    def test_nothing_to_salvage_raises(self, parser, content):
+        with pytest.raises(json.JSONDecodeError):
+            parser.parse(content)
+
+
+class TestCutPoints:
+    def test_cut_after_each_nested_object_with_open_closers(self, parser):
+        text = '{"identified_risks": [{"a": 1}, {"b": 2}'
+        cuts = parser._cut_points(text)
+        assert cuts == [
+            (text.index("}") + 1, "]}"),
+            (len(text), "]}"),
+        ]
+
+    def test_brackets_inside_strings_are_ignored(self, parser):
+        text = '{"identified_risks": [{"title": "a } ] { [ \\" b"}, {"title": "c'
+        cuts = parser._cut_points(text)
+        assert len(cuts) == 1
+        end, closers = cuts[0]
+        assert json.loads(text[:end] + closers)["identified_risks"][0]["title"] == (
+            'a } ] { [ " b'
+        )
+
+    def test_stops_at_mismatched_closer(self, parser):
+        assert parser._cut_points('{"r": [{"a": 1}}]') == [(15, "]}")]
+
+    def test_stops_when_the_top_level_object_closes(self, parser):
+        text = '{"r": [{"a": 1}]} {"r": [{"b": 2}]}'
+        assert parser._cut_points(text) == [(15, "]}")]
+
+    def test_salvage_skips_cut_points_that_do_not_parse(self, parser):
+        # The second risk closes, but the text before it is not valid JSON
+        text = '{"identified_risks": [{"a": 1}, {"b": 2,}, {"c'
+        assert parser._salvage(text) == {"identified_risks": [{"a": 1}]}
+
+
+class TestStitch:
+    def test_repeated_overlap_is_dropped(self, parser):
+        content = '{"identified_risks": [{"title": "Cash runway is short'
+        continuation = 'runway is short", "risk_score": 7}]}'
+        stitched = parser.stitch(content, continuation)
+        assert json.loads(stitched) == {
+            "identified_risks": [{"title": "Cash runway is short", "risk_score": 7}]
+        }
+
+    def test_plain_continuation_is_appended(self, parser):
+        content = '{"identified_risks": [{"title": "Cash'
+        continuation = ' runway", "risk_score": 7}]}'
+        assert json.loads(parser.stitch(content, continuation)) == {
+            "identified_risks": [{"title": "Cash runway", "risk_score": 7}]
+        }
+
+    def test_short_overlap_is_kept(self, parser):
+        # Fewer than MIN_STITCH_OVERLAP characters repeated is a coincidence
+        assert parser.stitch('{"a": "ab', 'ab"}') == '{"a": "abab"}'
+
+    def test_fences_are_dropped(self, parser):
+        content = '{"identified_risks": [{"title": "Cash'
+        continuation = '```json\n runway"}]}\n```'
+        assert json.loads(parser.stitch(content, continuation)) == {
+            "identified_risks": [{"title": "Cash runway"}]
+        }
+
+    def test_restarted_object_replaces_the_first_part(self, parser):
+        content = '{"identified_risks": [{"title": "Cash'
+        restarted = full_response(RISK_A)
+        assert parser.stitch(content, restarted) == restarted
+
+    def test_leading_whitespace_is_kept(self, parser):
+        content = '{"title": "Cash'
+        assert parser.stitch(content, '  runway"}') == '{"title": "Cash  runway"}'
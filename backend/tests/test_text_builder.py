@@ -0,0 +1,47 @@
+import itertools
+import random
+
+import pytest
+
+from app.services.file_processing_service import _TextBuilder
+
+# Separators are whitespace, so words never run across pieces
+ENDINGS = ["", "\r", "\n", "\r\n", "\x0b", "\u2028", "\n\n", "\r\r"]
+PIECES = [""] + [f"word one{ending}" for ending in ENDINGS] + ["\nlead", "\r", "\n"]
+
+
+def built(pieces, separator="\n\n"):
+    builder = _TextBuilder(separator)
+    for piece in pieces:
+        builder.add(piece)
+    return builder.build(), separator.join(pieces)
+
+
+def assert_counts_match(pieces, separator="\n\n"):
+    result, text = built(pieces, separator)
+    assert result.text == text
+    assert result.word_count == len(text.split())
+    assert result.line_count == len(text.splitlines())
+
+
+@pytest.mark.parametrize("pieces", itertools.product(PIECES, repeat=2))
+def test_counts_match_splitlines_for_each_pair(pieces):
+    assert_counts_match(pieces)
+
+
+@pytest.mark.parametrize("separator", ["\n\n", "\n", " ", "\r"])
+def test_counts_match_splitlines_for_random_pieces(separator):
+    alphabet = ["a", "b c", " ", "\r", "\n", "\r\n", "\x0b", "\x0c", "\x1c", "\u2028"]
+    rng = random.Random(separator)
+    for _ in range(2000):
+        pieces = [
+            "".join(rng.choices(alphabet, k=rng.randint(0, 4)))
+            for _ in range(rng.randint(1, 5))
+        ]
+        assert_counts_match(pieces, separator)
+
+
+def test_trailing_carriage_return_joins_the_separator():
+    result, _ = built(["first\r", "second"])
+    # "first\r\n\nsecond": the "\r\n" is one break, then a blank line
+    assert result.line_count == 3
@@ -0,0 +1,92 @@
+import pytest
+
+from app.services.passage_selector import PassageSelector
+from app.services.transcript_compactor import TranscriptCompactor
+
+
+@pytest.fixture
+def compactor():
+    return TranscriptCompactor()
+
+
+def compacted_lines(compactor, transcript):
+    return compactor.compact(transcript).text.splitlines()
+
+
+def test_answer_to_a_question_is_kept(compactor):
+    transcript = (
+        "CFO: Do we approve the $2M prepayment without a guarantee?\n"
+        "CEO: Yes.\n"
+        "CFO: Then the contract is signed today.\n"
+    )
+    assert compacted_lines(compactor, transcript) == [
+        "CFO: Do we approve the $2M prepayment without a guarantee?",
+        "CEO: Yes.",
+        "CFO: Then the contract is signed today.",
+    ]
+
+
+@pytest.mark.parametrize("answer", ["No.", "Nope.", "Agreed.", "Not yet."])
+def test_negative_and_decision_turns_are_always_kept(compactor, answer):
+    transcript = (
+        "Alice: We sign the supplier contract today.\n"
+        f"Bob: {answer}\n"
+        "Alice: Moving on to hiring.\n"
+    )
+    assert f"Bob: {answer}" in compacted_lines(compactor, transcript)
+
+
+def test_acknowledgement_while_someone_talks_is_dropped(compactor):
+    transcript = (
+        "Alice: Revenue fell 12% in Q3.\n"
+        "Bob: Yeah.\n"
+        "Alice: Churn is up as well.\n"
+    )
+    assert compacted_lines(compactor, transcript) == [
+        "Alice: Revenue fell 12% in Q3. Churn is up as well."
+    ]
+
+
+def test_backchannel_after_a_question_is_dropped(compactor):
+    transcript = (
+        "Alice: Can everyone hear me?\n"
+        "Bob: Mhm.\n"
+        "Carol: Hi all, thanks.\n"
+        "Alice: Revenue fell 12% in Q3.\n"
+    )
+    assert compacted_lines(compactor, transcript) == [
+        "Alice: Can everyone hear me? Revenue fell 12% in Q3."
+    ]
+
+
+def test_measured_reduction(compactor):
+    transcript = (
+        "00:00:01 Alice: Hi everyone, thanks for joining.\n"
+        "00:00:04 Bob: Hello.\n"
+        "00:00:06 Alice: So, um, the, the supplier is, uh, three weeks late.\n"
+        "00:00:11 Bob: Mhm.\n"
+        "00:00:12 Alice: That puts the Q3 launch at risk.\n"
+        "00:00:15 Bob: Can we switch suppliers before the deadline?\n"
+        "00:00:18 Alice: No.\n"
+    )
+    result = compactor.compact(transcript)
+    assert result.text.splitlines() == [
+        "Alice: So the supplier is three weeks late. That puts the Q3 launch at risk.",
+        "Bob: Can we switch suppliers before the deadline?",
+        "Alice: No.",
+    ]
+
+    compaction = result.compaction
+    assert compaction.turns_total == 7
+    assert compaction.turns_kept == 3
+    assert compaction.speakers == 2
+    assert compaction.original_tokens == PassageSelector.estimate_tokens(transcript)
+    assert compaction.compacted_tokens == PassageSelector.estimate_tokens(result.text)
+    assert compaction.token_reduction == round(
+        1 - compaction.compacted_tokens / compaction.original_tokens, 4
+    )
+    assert compaction.token_reduction > 0.3
+
+
+def test_unlabelled_text_is_not_compacted(compactor):
+    assert compactor.compact("Revenue fell 12% in Q3.\nChurn is up.") is None